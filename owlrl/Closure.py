@@ -25,14 +25,22 @@ __author__ = "Ivan Herman"
 __contact__ = "Ivan Herman, ivan@w3.org"
 __license__ = "W3C® SOFTWARE NOTICE AND LICENSE, http://www.w3.org/Consortium/Legal/2002/copyright-software-20021231"
 
-from typing import Union, Any
+import threading
+import time
+import warnings
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Iterable, Union
 
 import rdflib
 from rdflib.namespace import RDF
 from rdflib import BNode, Literal, Graph, Dataset
 
-from owlrl.graph_abstraction import DataGraph
+from owlrl.graph_abstraction import DataGraph, MergedGraph
 from .Namespaces import ERRNS
+from .checkpoint import ClosureCheckpoint
+from .spill import SpilledTripleSet
 
 try:
     from rdflib.graph import ConjunctiveGraph
@@ -42,6 +50,211 @@ except ImportError:
 debugGlobal = False
 offlineGeneration = False
 
+_error_lock = threading.Lock()
+
+ClosureProgress = namedtuple("ClosureProgress", ["cycle", "scanned", "new_triples", "elapsed"])
+ClosureProgress.__doc__ = """
+Progress report of a closure, passed to the :code:`progress` callback of :func:`owlrl.Closure.Core.closure`.
+
+:param cycle: The current cycle, starting with 1 (0 before the cycles start).
+:param scanned: Number of triples scanned so far in the current cycle.
+:param new_triples: Number of new triples found so far in the current cycle.
+:param elapsed: Time since the start of the closure, in seconds.
+"""
+
+
+class ClosureCancelled(Exception):
+    """
+    Raised by :func:`owlrl.Closure.Core.closure` when the closure has been cancelled. The triples inferred until that
+    point have been added to the destination, and the post-processing step has been run on them (unless the closure
+    has a checkpoint, see :func:`owlrl.Closure.Core.closure`).
+
+    :param cycle: The cycle during which the closure was cancelled.
+    :type cycle: int
+    """
+
+    def __init__(self, cycle):
+        Exception.__init__(self, "Closure cancelled in cycle %d" % cycle)
+        self.cycle = cycle
+
+
+def add_triples(graph, triples, batch_size=10000):
+    """
+    Add a set of triples to a graph in bulk: an RDFLib graph gets them in batches, a :class:`.graph_abstraction.DataGraph`
+    at once (on Oxigraph, in a single transaction).
+
+    :param graph: The graph; an RDFLib graph, a :class:`.graph_abstraction.DataGraph`, or an :class:`InferenceRecorder`.
+    :param triples: The triples; the collection may be read more than once.
+    :param batch_size: Number of triples sent at once to an RDFLib graph.
+    :type batch_size: int
+    """
+    if isinstance(graph, Graph):
+        triples = iter(triples)
+        while True:
+            batch = list(islice(triples, batch_size))
+            if not batch:
+                break
+            graph.addN((s, p, o, graph) for (s, p, o) in batch)
+    else:
+        graph.add_many(triples)
+
+
+def remove_triples(graph, triples):
+    """
+    Remove a set of triples from a graph in bulk (see :func:`add_triples`).
+
+    :param graph: The graph; an RDFLib graph, a :class:`.graph_abstraction.DataGraph`, or an :class:`InferenceRecorder`.
+    :param triples: The triples; the collection may be read more than once.
+    """
+    if isinstance(graph, Graph):
+        for t in triples:
+            graph.remove(t)
+    else:
+        graph.remove_many(triples)
+
+
+class _ThreadCandidates:
+    """
+    The new triples found by the threads of a parallel scan (see :func:`owlrl.Closure.Core.closure`), in a separate
+    set per thread; they are merged into the stored triples before the flush.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self.sets = []
+
+    def add(self, t):
+        try:
+            candidates = self._local.candidates
+        except AttributeError:
+            candidates = self._local.candidates = set()
+            self.sets.append(candidates)
+        candidates.add(t)
+
+    def __len__(self):
+        return sum(len(candidates) for candidates in list(self.sets))
+
+
+class ExtentCache:
+    """
+    The extents of the classes (their instances) and of the properties (the subject-object pairs they link) read by the
+    rules during a closure. The rules keep asking for the same ones within a cycle, and from one cycle to the next:
+    every extent is read from the graph the first time it is needed, then kept, and brought up to date with the triples
+    added at the end of every cycle (see :func:`owlrl.Closure.Core.closure`), instead of being read again.
+
+    :param graph: The graph the rules read.
+    :param enabled: Whether the extents are kept; if not (e.g., with a memory budget), they are read from the graph
+        every time. Default: True.
+    :type enabled: bool
+    """
+
+    def __init__(self, graph, enabled: bool = True):
+        self.graph = graph
+        self.enabled = enabled
+        self._instances = {}
+        self._pairs = {}
+
+    def instances(self, c) -> Iterable:
+        """
+        The instances of a class, i.e., the subjects of the :code:`(x, rdf:type, c)` triples.
+
+        :param c: The class.
+        :return: The instances; the list must not be modified.
+        """
+        if not self.enabled:
+            return self.graph.subjects(RDF.type, c)
+        try:
+            return self._instances[c]
+        except KeyError:
+            # the rules may run in several threads: the first extent read is the one kept
+            return self._instances.setdefault(c, list(self.graph.subjects(RDF.type, c)))
+
+    def pairs(self, p) -> Iterable:
+        """
+        The (subject, object) pairs of the triples with a predicate.
+
+        :param p: The predicate.
+        :return: The pairs; the list must not be modified.
+        """
+        if not self.enabled:
+            return self.graph.subject_objects(p)
+        try:
+            return self._pairs[p]
+        except KeyError:
+            return self._pairs.setdefault(p, list(self.graph.subject_objects(p)))
+
+    def update(self, triples):
+        """
+        Add the triples just added to the graph to the extents read so far.
+
+        :param triples: The triples added. Only those actually visible in the graph (which may not be the case if the
+            destination of the closure is elsewhere) are taken into account.
+        """
+        instances, pairs = self._instances, self._pairs
+        if not (instances or pairs):
+            return
+        graph = self.graph
+        for t in triples:
+            s, p, o = t
+            extent = pairs.get(p)
+            in_graph = None
+            if extent is not None:
+                in_graph = t in graph
+                if in_graph:
+                    extent.append((s, o))
+            if p == RDF.type:
+                extent = instances.get(o)
+                if extent is not None and (in_graph or (in_graph is None and t in graph)):
+                    extent.append(s)
+
+    def clear(self):
+        """Forget all the extents."""
+        self._instances = {}
+        self._pairs = {}
+
+
+class InferenceRecorder:
+    """
+    Stand-in for the destination graph of a closure that passes every change on to the destination, and also records
+    the triples that are really new (i.e., neither in the destination nor in the source graph) in a separate sink.
+    Triples removed from the destination are removed from the sink, too.
+
+    :param destination: The real destination graph.
+    :param graph: The source graph of the closure.
+    :param sink: The graph collecting the new triples; anything with :code:`add` and :code:`remove` methods.
+    """
+
+    def __init__(self, destination, graph, sink):
+        self.destination = destination
+        self.graph = graph
+        self.sink = sink
+
+    def add(self, t):
+        if not (t in self.destination or t in self.graph):
+            self.sink.add(t)
+        self.destination.add(t)
+
+    def remove(self, t):
+        self.sink.remove(t)
+        self.destination.remove(t)
+
+    def add_many(self, triples):
+        for t in triples:
+            if not (t in self.destination or t in self.graph):
+                self.sink.add(t)
+        add_triples(self.destination, triples)
+
+    def remove_many(self, triples):
+        for t in triples:
+            self.sink.remove(t)
+        remove_triples(self.destination, triples)
+
+    def __contains__(self, t):
+        return t in self.destination
+
+    def __getattr__(self, name):
+        return getattr(self.destination, name)
+
 
 ######################################################################################################
 # noinspection PyMethodMayBeStatic,PyPep8Naming,PyPep8Naming
@@ -66,7 +279,9 @@ class Core:
     :param rdfs: Whether RDFS inference is also done (used in subclassed only).
     :type rdfs: bool
 
-    :param destination: The destination graph to which the results are written. If None, use the source graph.
+    :param destination: The destination graph to which the results are written. If None, use the source graph. It
+        may be in another store than the graph (e.g., an RDFLib graph in memory for a graph in an Oxigraph store on
+        disk); the rules then read the union of the two (see :class:`.graph_abstraction.MergedGraph`).
     :type destination: :class:`rdflib.graph.Graph`
 
     :var IMaxNum: Maximal index of :code:`rdf:_i` occurrence in the graph.
@@ -92,6 +307,10 @@ class Core:
     :type rdfs: bool
     """
 
+    # Memory budget of the running closure, if any, and the directory of its spill files (see closure)
+    _memory_budget = None
+    _spill_directory = None
+
     # noinspection PyUnusedLocal
     def __init__(self, graph: Union[DataGraph,Graph,Any], axioms, daxioms, rdfs: bool = False, destination: Union[DataGraph,Graph,Any] = None):
         """
@@ -127,24 +346,22 @@ class Core:
                 self.destination = graph.default_context
             else:
                 self.destination = graph
-        elif isinstance(destination, DataGraph):
-            self.destination = destination
-        else:
-            if isinstance(destination, (str, rdflib.URIRef)):
-                if isinstance(graph, (Dataset, ConjunctiveGraph, DataGraph)):
-                    self.destination = graph.get_context(destination)
-                else:
-                    raise ValueError(
-                        "URIRef or string destinations are only supported for Dataset, "
-                        "ConjunctiveGraph, or Oxigraph/DataGraph instances"
-                    )
+        elif isinstance(destination, (str, rdflib.URIRef)):
+            if isinstance(graph, (Dataset, ConjunctiveGraph, DataGraph)):
+                self.destination = graph.get_context(destination)
             else:
-                # destination is a rdflib Graph
-                source_store = self.graph.store
-                dest_store = destination.store
-                if source_store is not dest_store:
-                    raise ValueError("The source and destination graphs must share the same backing store")
-                self.destination = destination
+                raise ValueError(
+                    "URIRef or string destinations are only supported for Dataset, "
+                    "ConjunctiveGraph, or Oxigraph/DataGraph instances"
+                )
+        else:
+            # destination is a rdflib Graph, a DataGraph or an Oxigraph store
+            if not isinstance(destination, (Graph, DataGraph)):
+                destination = DataGraph(destination)
+            self.destination = destination
+            if destination.store is not self.graph.store:
+                # the rules must also see the inferred triples: they read the union of the two stores
+                self.graph = MergedGraph(self.graph, destination)
 
         # Calculate the maximum 'n' value for the '_i' type predicates (see Horst's paper)
         n = 1
@@ -167,6 +384,7 @@ class Core:
 
         self.error_messages = []
         self.empty_stored_triples()
+        self.extents = ExtentCache(self.graph)
 
     def add_error(self, message):
         """
@@ -175,8 +393,33 @@ class Core:
         :param message: Error message.
         :type message: str
         """
-        if message not in self.error_messages:
-            self.error_messages.append(message)
+        # the rules may run in several threads (see closure)
+        with _error_lock:
+            if message not in self.error_messages:
+                self.error_messages.append(message)
+
+    def finish(self):
+        """
+        Report the generalized triples that could not be stored, if any, and add the error messages collected during
+        the closure to the destination, as :code:`err:ErrorMessage` resources.
+        """
+        # The generalized triples an Oxigraph store cannot hold have only been kept in memory; they are reported once
+        generalized = getattr(self.graph, "generalized", None)
+        if generalized:
+            warnings.warn(
+                "%d generalized triple(s) (with a literal subject, or a blank node or literal predicate) cannot be "
+                "stored in Oxigraph; they were used by the inference, but are not in the store" % len(generalized)
+            )
+
+        # Add possible error messages
+        if self.error_messages:
+            # I am not sure this is the right vocabulary to use for this purpose, but I haven't found anything!
+            # I could, of course, come up with my own, but I am not sure that would be kosher...
+            self.destination.bind("err", "http://www.daml.org/2002/03/agents/agent-ont#")
+            for m in self.error_messages:
+                message = BNode()
+                self.destination.add((message, RDF.type, ERRNS.ErrorMessage))
+                self.destination.add((message, ERRNS.error, Literal(m)))
 
     def pre_process(self):
         """
@@ -240,16 +483,30 @@ class Core:
     # noinspection PyAttributeOutsideInit
     def empty_stored_triples(self):
         """
-        Empty the internal store for triples.
+        Empty the internal store for triples. If the closure runs with a memory budget, the store is a
+        :class:`.spill.SpilledTripleSet`.
         """
-        self.added_triples = set()
+        previous = getattr(self, "added_triples", None)
+        if isinstance(previous, SpilledTripleSet):
+            previous.close()
+        if self._memory_budget:
+            self.added_triples = SpilledTripleSet(self._memory_budget, self._spill_directory)
+        else:
+            self.added_triples = set()
+
+    def _add_stored_triples(self):
+        """
+        Send the stored triples to the destination, in bulk (see :func:`add_triples`), and add them to the extents read
+        by the rules.
+        """
+        add_triples(self.destination, self.added_triples)
+        self.extents.update(self.added_triples)
 
     def flush_stored_triples(self):
         """
         Send the stored triples to the graph, and empty the container.
         """
-        for t in self.added_triples:
-            self.destination.add(t)
+        self._add_stored_triples()
         self.empty_stored_triples()
 
     def store_triple(self, t):
@@ -272,8 +529,33 @@ class Core:
                 print(t)
             self.added_triples.add(t)
 
+    def _observe(self, cycle_num, scanned):
+        """
+        Report the progress, if requested, and check whether the closure has been cancelled.
+
+        :return: Whether the closure should stop.
+        :rtype: bool
+        """
+        if self._progress is not None:
+            self._progress(
+                ClosureProgress(
+                    cycle_num, scanned, len(self.added_triples), time.monotonic() - self._start_time
+                )
+            )
+        return self._cancel is not None and self._cancel.is_set()
+
     # noinspection PyAttributeOutsideInit
-    def closure(self):
+    def closure(
+        self,
+        progress=None,
+        cancel=None,
+        progress_interval=10000,
+        inferred=None,
+        checkpoint=None,
+        memory_budget=None,
+        spill_directory=None,
+        threads=None,
+    ):
         """
         Generate the closure the graph. This is the real 'core'.
 
@@ -283,29 +565,171 @@ class Core:
 
         If required, the relevant axiomatic triples are added to the graph before processing in cycles. Similarly
         the exchange of literals against bnodes is also done in this step (and restored after all cycles are over).
+
+        A long closure can be observed and stopped. The :code:`progress` callback and the :code:`cancel` token are
+        looked at at the end of every cycle and every :code:`progress_interval` triples scanned within a cycle. If the
+        closure is cancelled, the triples found so far (all of them sound inferences) are added to the destination, the
+        post-processing step and the error messages are handled as usual (unless there is a checkpoint: they are then
+        left to the run that completes the closure), and :class:`ClosureCancelled` is raised.
+
+        :param progress: Callback invoked with a :class:`ClosureProgress` instance. Default: None.
+        :type progress: callable
+
+        :param cancel: Cancellation token: the closure stops if its :code:`is_set()` method returns True, e.g., a
+            :class:`threading.Event`. Default: None.
+
+        :param progress_interval: Number of triples scanned between two progress reports. Default: 10000.
+        :type progress_interval: int
+
+        :param inferred: If not None, a graph (or any object with :code:`add` and :code:`remove` methods) that
+            collects the inferred triples only, i.e., those that were not in the graph or in the destination before.
+            Default: None.
+        :type inferred: :class:`rdflib.Graph`
+
+        :param checkpoint: If not None, a checkpoint (or the name of its directory) recording the state of the closure
+            at the end of every cycle. If the checkpoint holds the state of an interrupted closure, that closure is
+            resumed instead of starting from scratch. The checkpoint is removed when the closure completes (but not
+            if it is cancelled). Default: None.
+        :type checkpoint: :class:`.checkpoint.ClosureCheckpoint` or str
+
+        :param memory_budget: If not None, the maximum number of new triples kept in memory during a cycle; beyond
+            that, they are spilled to temporary files (see :mod:`.spill`). Default: None.
+        :type memory_budget: int
+
+        :param spill_directory: Directory of the temporary files used with a memory budget. Default: None, i.e., the
+            system default.
+        :type spill_directory: str
+
+        :param threads: If more than 1, the triples of the graph are scanned by that many threads, in batches; the new
+            triples found by each thread are merged at the end of the cycle. Nothing is written to the graph during a
+            scan, so the threads all read the same state. This can only pay off on an Oxigraph store, which releases the
+            GIL while matching patterns; the rules themselves are Python code, and they only run in parallel on a
+            free-threaded Python build. Default: None, i.e., the scan is done in the calling thread.
+        :type threads: int
+
+        :raise ClosureCancelled: If the closure has been cancelled.
+        """
+        if checkpoint is not None and not isinstance(checkpoint, ClosureCheckpoint):
+            checkpoint = ClosureCheckpoint(checkpoint)
+
+        destination = self.destination
+        self._memory_budget = memory_budget
+        self._spill_directory = spill_directory
+        try:
+            if inferred is not None:
+                self.destination = InferenceRecorder(self.destination, self.graph, inferred)
+            resumed = None
+            if checkpoint is not None:
+                resumed = checkpoint.start(self.graph)
+                self.destination = InferenceRecorder(self.destination, self.graph, checkpoint.delta)
+            self._closure(progress, cancel, progress_interval, checkpoint, resumed, threads)
+        finally:
+            self.destination = destination
+            self._memory_budget = None
+            self._spill_directory = None
+            # close the spill files, if any
+            self.empty_stored_triples()
+        if checkpoint is not None:
+            checkpoint.clear()
+
+    def _apply_rules(self, batch, cycle_num):
+        for t in batch:
+            self.rules(t, cycle_num)
+
+    def _parallel_scan(self, cycle_num, progress_interval, threads, batch_size=1000):
+        """
+        Run the rules on all the triples of the graph, in batches handed out to a pool of threads.
+
+        :return: The number of triples scanned, and whether the scan is complete (i.e., it has not been cancelled).
+        :rtype: tuple
+        """
+        stored = self.added_triples
+        self.added_triples = _ThreadCandidates()
+        scanned = 0
+        complete = True
+        try:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                pending = set()
+                triples = iter(self.graph.triples((None, None, None)))
+                while True:
+                    batch = list(islice(triples, batch_size))
+                    if not batch:
+                        break
+                    # the scan does not read ahead more than a few batches per thread
+                    if len(pending) >= 2 * threads:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    pending.add(executor.submit(self._apply_rules, batch, cycle_num))
+                    previous, scanned = scanned, scanned + len(batch)
+                    if scanned // progress_interval > previous // progress_interval and self._observe(
+                        cycle_num, scanned
+                    ):
+                        complete = False
+                        break
+                for future in pending:
+                    future.result()
+        finally:
+            candidates, self.added_triples = self.added_triples, stored
+            for part in candidates.sets:
+                for t in part:
+                    stored.add(t)
+        return scanned, complete
+
+    def _save_checkpoint(self, checkpoint, cycle_num, finished):
+        if checkpoint is not None:
+            checkpoint.save(cycle_num, finished, self.error_messages, getattr(self, "bnodes", None))
+
+    # noinspection PyAttributeOutsideInit
+    def _closure(self, progress, cancel, progress_interval, checkpoint=None, resumed=None, threads=None):
         """
+        The closure itself, see :func:`owlrl.Closure.Core.closure`; if :code:`resumed` is not None, the closure goes on
+        from that checkpoint state, instead of starting from scratch.
+        """
+
+        self._progress = progress
+        self._cancel = cancel
+        self._start_time = time.monotonic()
+
         self.pre_process()
 
-        # Handling the axiomatic triples. In general, this means adding all tuples in the list that
-        # forwarded, and those include RDF or RDFS. In both cases the relevant parts of the container axioms should also
-        # be added.
-        if self.axioms:
-            self.add_axioms()
+        if resumed is None:
+            # Handling the axiomatic triples. In general, this means adding all tuples in the list that
+            # forwarded, and those include RDF or RDFS. In both cases the relevant parts of the container axioms should
+            # also be added.
+            if self.axioms:
+                self.add_axioms()
 
-        # Add the datatype axioms, if needed (note that this makes use of the literal proxies, the order of the call
-        # is important!
-        if self.daxioms:
-            self.add_d_axioms()
+            # Add the datatype axioms, if needed (note that this makes use of the literal proxies, the order of the call
+            # is important!
+            if self.daxioms:
+                self.add_d_axioms()
 
-        self.flush_stored_triples()
+            self.flush_stored_triples()
 
-        # Get first the 'one-time rules', ie, those that do not need an extra round in cycles down the line
-        self.one_time_rules()
-        self.flush_stored_triples()
+            # Get first the 'one-time rules', ie, those that do not need an extra round in cycles down the line
+            self.one_time_rules()
+            self.flush_stored_triples()
+
+            cycle_num = 0
+            new_cycle = True
+            self._save_checkpoint(checkpoint, cycle_num, False)
+        else:
+            # The axiomatic triples, the one-time rules and the cycles until the checkpoint have already been done
+            add_triples(self.destination, resumed.triples)
+            checkpoint.delta.clear()
+            self.error_messages = list(resumed.errors)
+            if resumed.bnodes is not None:
+                self.bnodes = resumed.bnodes
+            cycle_num = resumed.cycle
+            new_cycle = not resumed.finished
+
+        # The extents read by the rules are kept from here on (they count against the memory budget, too)
+        self.extents = ExtentCache(self.graph, enabled=not self._memory_budget)
 
         # Go cyclically through all rules until no change happens
-        new_cycle = True
-        cycle_num = 0
+        cancelled = self._observe(cycle_num, 0)
+        new_cycle = new_cycle and not cancelled
         while new_cycle:
             # yes, there was a change, let us go again
             cycle_num += 1
@@ -320,25 +744,49 @@ class Core:
             self.empty_stored_triples()
 
             # Execute all the rules; these might fill up the added triples array
-            for t in self.graph.triples((None, None, None)):
-                self.rules(t, cycle_num)
+            scanned = 0
+            complete = True
+            if threads is not None and threads > 1:
+                scanned, complete = self._parallel_scan(cycle_num, progress_interval, threads)
+                cancelled = not complete
+            else:
+                for t in self.graph.triples((None, None, None)):
+                    self.rules(t, cycle_num)
+                    scanned += 1
+                    if scanned % progress_interval == 0 and self._observe(cycle_num, scanned):
+                        cancelled = True
+                        complete = False
+                        break
 
             # Add the tuples to the graph (if necessary, that is). If any new triple has been generated, a new cycle
             # will be necessary...
             new_cycle = len(self.added_triples) > 0
 
-            for t in self.added_triples:
-                self.destination.add(t)
+            self._add_stored_triples()
+
+            # An interrupted cycle is recorded as not done: a resumed closure runs it again (the first cycle also
+            # collects the bnodes of the graph)
+            if complete:
+                self._save_checkpoint(checkpoint, cycle_num, not new_cycle)
+            else:
+                self._save_checkpoint(checkpoint, cycle_num - 1, False)
+
+            # Report the end of the cycle; a cancellation only matters if there is another cycle to do
+            if self._observe(cycle_num, scanned) and new_cycle:
+                cancelled = True
+            if cancelled:
+                break
+
+        self.extents.clear()
+        if cancelled and checkpoint is not None:
+            # The run that completes the closure does the post-processing and adds the error messages; done here, they
+            # would be in the destination of that run, and the rules would reason over them
+            raise ClosureCancelled(cycle_num)
 
         self.post_process()
         self.flush_stored_triples()
 
-        # Add possible error messages
-        if self.error_messages:
-            # I am not sure this is the right vocabulary to use for this purpose, but I haven't found anything!
-            # I could, of course, come up with my own, but I am not sure that would be kosher...
-            self.destination.bind("err", "http://www.daml.org/2002/03/agents/agent-ont#")
-            for m in self.error_messages:
-                message = BNode()
-                self.destination.add((message, RDF.type, ERRNS.ErrorMessage))
-                self.destination.add((message, ERRNS.error, Literal(m)))
+        self.finish()
+
+        if cancelled:
+            raise ClosureCancelled(cycle_num)
@@ -31,6 +31,8 @@ __author__ = "Ivan Herman"
 __contact__ = "Ivan Herman, ivan@w3.org"
 __license__ = "W3C® SOFTWARE NOTICE AND LICENSE, http://www.w3.org/Consortium/Legal/2002/copyright-software-20021231"
 
+import threading
+import warnings
 from collections import defaultdict
 from typing import Union
 
@@ -38,7 +40,7 @@ import rdflib
 from rdflib import BNode, Graph
 from rdflib.namespace import OWL, RDF, RDFS
 
-from owlrl.Closure import Core
+from owlrl.Closure import Core, remove_triples
 from owlrl.AxiomaticTriples import OWLRL_Axiomatic_Triples, OWLRL_D_Axiomatic_Triples
 from owlrl.AxiomaticTriples import OWLRL_Datatypes_Disjointness
 
@@ -61,6 +63,343 @@ from .DatatypeHandling import AltXSDToPYTHON
 identity = lambda v: v
 
 
+class RestrictionIndex:
+    """
+    The restrictions of the graph, i.e., the subjects of the :code:`owl:onProperty`, :code:`owl:onClass`,
+    :code:`owl:someValuesFrom`, :code:`owl:allValuesFrom`, :code:`owl:hasValue`, :code:`owl:maxCardinality` and
+    :code:`owl:maxQualifiedCardinality` triples. The cls-* and scm-* rules on restrictions keep looking up the property
+    of a restriction, the restrictions on a property, or those with a given filler; with the index, these are direct
+    lookups instead of graph queries.
+
+    The index is built from the graph the first time it is used, and brought up to date with the triples added at the
+    end of every cycle (see :func:`owlrl.Closure.Core.closure`); the instance data do not change it.
+
+    :param graph: The graph the rules read.
+    """
+
+    #: The predicates describing a restriction
+    predicates = frozenset(
+        (
+            OWL.onProperty,
+            OWL.onClass,
+            OWL.someValuesFrom,
+            OWL.allValuesFrom,
+            OWL.hasValue,
+            OWL.maxCardinality,
+            OWL.maxQualifiedCardinality,
+        )
+    )
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        # restriction -> predicate -> values, and (predicate, value) -> restrictions
+        self._objects = None
+        self._subjects = None
+
+    def _build(self):
+        objects, subjects = {}, {}
+        for p in self.predicates:
+            for s, o in self.graph.subject_objects(p):
+                self._add(objects, subjects, s, p, o)
+        # the rules may run in several threads: whichever index is built is complete
+        self._subjects = subjects
+        self._objects = objects
+
+    @staticmethod
+    def _add(objects, subjects, s, p, o):
+        values = objects.setdefault(s, {}).setdefault(p, [])
+        if o not in values:
+            values.append(o)
+            subjects.setdefault((p, o), []).append(s)
+
+    def objects(self, restriction, p) -> list:
+        """
+        The values of a restriction for a predicate, e.g., its property for :code:`owl:onProperty`.
+
+        :param restriction: The restriction.
+        :param p: One of the :attr:`predicates`.
+        :return: The values; the list must not be modified.
+        """
+        if self._objects is None:
+            self._build()
+        return self._objects.get(restriction, {}).get(p, [])
+
+    def subjects(self, p, value) -> list:
+        """
+        The restrictions with a value for a predicate, e.g., the restrictions on a property for :code:`owl:onProperty`,
+        or those with a filler for :code:`owl:someValuesFrom`.
+
+        :param p: One of the :attr:`predicates`.
+        :param value: The value.
+        :return: The restrictions; the list must not be modified.
+        """
+        if self._objects is None:
+            self._build()
+        return self._subjects.get((p, value), [])
+
+    def update(self, triples):
+        """
+        Add the triples just added to the graph to the index, if it has been built.
+
+        :param triples: The triples added. Only those actually visible in the graph are taken into account.
+        """
+        objects, subjects = self._objects, self._subjects
+        if objects is None:
+            return
+        predicates, graph = self.predicates, self.graph
+        for t in triples:
+            if t[1] in predicates and t in graph:
+                self._add(objects, subjects, *t)
+
+    def clear(self):
+        """Forget the index; it is built again if it is used."""
+        self._objects = None
+        self._subjects = None
+
+
+class ListCache:
+    """
+    The rdf:List structures read by the rules (e.g., for :code:`owl:intersectionOf`, :code:`owl:oneOf` or
+    :code:`owl:propertyChainAxiom`), decoded once and kept as tuples, keyed by their head. A list is only decoded again
+    if an :code:`rdf:first` or :code:`rdf:rest` triple is added on one of its nodes at the end of a cycle (see
+    :func:`owlrl.Closure.Core.closure`).
+
+    The lists are decoded like :meth:`rdflib.Graph.items` does: if a node has several :code:`rdf:first` or
+    :code:`rdf:rest` values, the first one is used (several members on a node are expected once :code:`owl:sameAs`
+    has been applied). A malformed list is not an error: what is wrong with it is recorded in :attr:`problems`, and the
+    members found up to that point are returned. This includes a cycle of :code:`rdf:rest` links, for which
+    :meth:`rdflib.Graph.items` raises an exception.
+
+    :param graph: The graph the rules read.
+    """
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        self._lists = {}
+        #: What is wrong with the malformed lists decoded so far, keyed by their head
+        self.problems = {}
+        # node -> heads of the decoded lists going through it
+        self._heads = {}
+
+    def items(self, head) -> tuple:
+        """
+        The members of a list.
+
+        :param head: The head of the rdf:List.
+        :return: The members.
+        :rtype: tuple
+        """
+        try:
+            return self._lists[head]
+        except KeyError:
+            pass
+        graph = self.graph
+        members = []
+        problems = []
+        node = head
+        seen = set()
+        while node != RDF.nil:
+            seen.add(node)
+            self._heads.setdefault(node, set()).add(head)
+            first = list(graph.objects(node, RDF.first))
+            rest = list(graph.objects(node, RDF.rest))
+            if first:
+                members.append(first[0])
+            else:
+                problems.append("%s has no rdf:first" % node)
+            if len(rest) > 1:
+                problems.append("%s has several rdf:rest values" % node)
+            if not rest:
+                problems.append("%s has no rdf:rest, the list does not end with rdf:nil" % node)
+                break
+            if rest[0] in seen:
+                problems.append("the rdf:rest of %s goes back to %s, the list is cyclic" % (node, rest[0]))
+                break
+            node = rest[0]
+        if problems:
+            self.problems[head] = "; ".join(problems)
+        # the rules may run in several threads: the first list decoded is the one kept
+        return self._lists.setdefault(head, tuple(members))
+
+    def update(self, triples):
+        """
+        Forget the lists on which :code:`rdf:first` or :code:`rdf:rest` triples have just been added to the graph.
+
+        :param triples: The triples added. Only those actually visible in the graph are taken into account.
+        """
+        if not self._lists:
+            return
+        graph = self.graph
+        for t in triples:
+            if (t[1] == RDF.first or t[1] == RDF.rest) and t[0] in self._heads and t in graph:
+                for head in self._heads.pop(t[0]):
+                    self._lists.pop(head, None)
+                    self.problems.pop(head, None)
+
+    def clear(self):
+        """Forget all the lists, and their problems."""
+        self._lists = {}
+        self.problems = {}
+        self._heads = {}
+
+
+class _Relation:
+    """The pairs of a property, or of a chain of properties, indexed in both directions."""
+
+    __slots__ = ("forward", "backward")
+
+    def __init__(self):
+        self.forward = {}
+        self.backward = {}
+
+    def add(self, u, v) -> bool:
+        objects = self.forward.setdefault(u, set())
+        if v in objects:
+            return False
+        objects.add(v)
+        self.backward.setdefault(v, set()).add(u)
+        return True
+
+    def pairs(self):
+        return [(u, v) for u, objects in self.forward.items() for v in objects]
+
+
+class PropertyChains:
+    """
+    The links of the :code:`owl:propertyChainAxiom` chains (rule prp-spo2), evaluated as a sequence of hash joins: the
+    pairs of :code:`p1 o ... o pk` are joined with those of :code:`pk+1` on the node they share. Every prefix of a chain
+    is kept, indexed in both directions, and shared by the chains starting with the same properties.
+
+    The evaluation is semi-naive: at the end of every cycle (see :func:`owlrl.Closure.Core.closure`), the triples added
+    on the properties of the chains are joined with the prefixes kept so far, instead of evaluating the chains again;
+    in the next cycle, a chain only gives its new links.
+
+    :param graph: The graph the rules read.
+    """
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        # property -> pairs, chain prefix -> pairs, and the pairs added to them by the last update
+        self._properties = {}
+        self._prefixes = {}
+        self._new = {}
+        # (property, chain) -> the cycle the axiom has been evaluated first
+        self._cycles = {}
+        self._lock = threading.Lock()
+
+    def _property(self, p) -> _Relation:
+        try:
+            return self._properties[p]
+        except KeyError:
+            relation = _Relation()
+            for u, v in self.graph.subject_objects(p):
+                relation.add(u, v)
+            self._properties[p] = relation
+            return relation
+
+    def _join(self, prefix: _Relation, p) -> _Relation:
+        relation = _Relation()
+        objects = self._property(p).forward
+        for u, vs in prefix.forward.items():
+            for v in vs:
+                for w in objects.get(v, ()):
+                    relation.add(u, w)
+        return relation
+
+    def evaluate(self, chain: tuple) -> list:
+        """
+        All the links of a chain, evaluated from the graph; nothing is kept.
+
+        :param chain: The properties of the chain.
+        :return: The (subject, object) pairs linked by the chain.
+        """
+        if not chain:
+            return []
+        chains = PropertyChains(self.graph)
+        relation = chains._property(chain[0])
+        for p in chain[1:]:
+            relation = chains._join(relation, p)
+        return relation.pairs()
+
+    def links(self, p, chain: tuple, cycle_num: int) -> list:
+        """
+        The links of a chain axiom: all of them in the first cycle the axiom is evaluated, the new ones in the next
+        cycles.
+
+        :param p: The property the chain is an axiom of.
+        :param chain: The properties of the chain.
+        :param cycle_num: The current cycle.
+        :return: The (subject, object) pairs linked by the chain.
+        """
+        if not chain:
+            return []
+        with self._lock:
+            # several properties may have the same chain, and their axioms be found in different cycles
+            first = self._cycles.setdefault((p, chain), cycle_num)
+            if chain not in self._prefixes:
+                relation = self._property(chain[0])
+                for k in range(1, len(chain) + 1):
+                    prefix = chain[:k]
+                    if prefix in self._prefixes:
+                        relation = self._prefixes[prefix]
+                    else:
+                        if k > 1:
+                            relation = self._join(relation, chain[k - 1])
+                        self._prefixes[prefix] = relation
+            if first == cycle_num:
+                return self._prefixes[chain].pairs()
+            return self._new.get(chain, [])
+
+    def update(self, triples):
+        """
+        Join the triples just added to the graph with the chain prefixes kept so far.
+
+        :param triples: The triples added. Only those actually visible in the graph are taken into account.
+        """
+        self._new = {}
+        properties = self._properties
+        if not properties:
+            return
+        graph = self.graph
+        added = {}
+        for t in triples:
+            s, p, o = t
+            relation = properties.get(p)
+            if relation is not None and o not in relation.forward.get(s, ()) and t in graph:
+                relation.add(s, o)
+                added.setdefault(p, []).append((s, o))
+        if not added:
+            return
+        # a prefix is brought up to date after the shorter ones: the new pairs of p1 o ... o pk come from the new
+        # pairs of p1 o ... o pk-1 joined with pk, and from p1 o ... o pk-1 joined with the new pairs of pk
+        for prefix in sorted(self._prefixes, key=len):
+            p = prefix[-1]
+            if len(prefix) == 1:
+                if p in added:
+                    self._new[prefix] = added[p]
+                continue
+            previous, relation = self._prefixes[prefix[:-1]], self._prefixes[prefix]
+            new = []
+            objects = properties[p].forward
+            for u, v in self._new.get(prefix[:-1], ()):
+                for w in objects.get(v, ()):
+                    if relation.add(u, w):
+                        new.append((u, w))
+            for v, w in added.get(p, ()):
+                for u in previous.backward.get(v, ()):
+                    if relation.add(u, w):
+                        new.append((u, w))
+            if new:
+                self._new[prefix] = new
+
+    def clear(self):
+        """Forget all the chains."""
+        self._properties = {}
+        self._prefixes = {}
+        self._new = {}
+        self._cycles = {}
+
+
 #######################################################################################################################
 
 
@@ -114,28 +453,46 @@ class OWLRL_Semantics(Core):
         """
         Core.__init__(self, graph, axioms, daxioms, rdfs=rdfs, destination=destination)
         self.bnodes = []
+        self.restrictions = RestrictionIndex(self.graph)
+        self.lists = ListCache(self.graph)
+        self.chains = PropertyChains(self.graph)
 
     def _list(self, l):
         """
         Shorthand to get a list of values (ie, from an rdf:List structure) starting at a head
 
         @param l: RDFLib resource, should be the head of an rdf:List
-        @return: array of resources
+        @return: tuple of resources
+        """
+        return self.lists.items(l)
+
+    def _add_stored_triples(self):
         """
-        return [ch for ch in self.graph.items(l)]
+        Send the stored triples to the destination, and add them to the extents, the restrictions, the lists and the
+        property chains read by the rules.
+        """
+        Core._add_stored_triples(self)
+        self.restrictions.update(self.added_triples)
+        self.lists.update(self.added_triples)
+        self.chains.update(self.added_triples)
 
     def post_process(self):
         """
-        Remove triples with Bnode predicates. The Bnodes in the graph are collected in the first cycle run.
+        Remove triples with Bnode predicates. The Bnodes in the graph are collected in the first cycle run. The
+        malformed lists met by the rules are reported as warnings.
         """
+        for head, problem in self.lists.problems.items():
+            warnings.warn("Malformed rdf:List %s: %s" % (head, problem))
+        self.restrictions.clear()
+        self.lists.clear()
+        self.chains.clear()
         to_be_removed = []
         for b in self.bnodes:
             for t in self.graph.triples((None, b, None)):
                 if t not in to_be_removed:
                     to_be_removed.append(t)
-        for t in to_be_removed:
-            self.destination.remove(t)
-            self.graph.remove(t)
+        remove_triples(self.destination, to_be_removed)
+        remove_triples(self.graph, to_be_removed)
 
     def add_axioms(self):
         """
@@ -337,37 +694,18 @@ class OWLRL_Semantics(Core):
         self._class_axioms(t, cycle_num)
         self._schema_vocabulary(t, cycle_num)
 
-    def _property_chain(self, p, x):
+    def _property_chain(self, p, x, cycle_num):
         """
         Implementation of the property chain axiom, invoked from inside the property axiom handler. This is the
-        implementation of rule prp-spo2, taken aside for an easier readability of the code."""
+        implementation of rule prp-spo2, taken aside for an easier readability of the code. The chains are evaluated
+        by :class:`PropertyChains`; with a memory budget, they are evaluated again in every cycle instead."""
         chain = self._list(x)
-        # The complication is that, at each step of the chain, there may be spawns, leading to a multitude
-        # of 'sub' chains:-(
-        if len(chain) > 0:
-            for (u1, _y, _z) in self.graph.triples((None, chain[0], None)):
-                # At least the chain can be started, because the leftmost property has at least
-                # one element in its extension
-                finalList = [(u1, _z)]
-                chainExists = True
-                for pi in chain[1:]:
-                    newList = []
-                    for (_u, ui) in finalList:
-                        for u in self.graph.objects(ui, pi):
-                            # what is stored is only last entry with u1, the intermediate results
-                            # are not of interest
-                            newList.append((u1, u))
-                    # I have now, in new list, all the intermediate results
-                    # until pi
-                    # if new list is empty, that means that is a blind alley
-                    if len(newList) == 0:
-                        chainExists = False
-                        break
-                    else:
-                        finalList = newList
-                if chainExists:
-                    for (_u, un) in finalList:
-                        self.store_triple((u1, p, un))
+        if self.extents.enabled:
+            links = self.chains.links(p, chain, cycle_num)
+        else:
+            links = self.chains.evaluate(chain)
+        for u1, un in links:
+            self.store_triple((u1, p, un))
 
     def _equality(self, triple, cycle_num):
         """
@@ -396,7 +734,7 @@ class OWLRL_Semantics(Core):
             for pp, oo in self.graph.predicate_objects(s):
                 self.store_triple((o, pp, oo))
             # RULE eq-rep-p
-            for ss, oo in self.graph.subject_objects(s):
+            for ss, oo in self.extents.pairs(s):
                 self.store_triple((ss, o, oo))
             # RULE eq-rep-o
             for ss, pp in self.graph.subject_predicates(o):
@@ -454,19 +792,19 @@ class OWLRL_Semantics(Core):
 
         # RULE prp-dom
         if t == RDFS.domain:
-            for x, y in self.graph.subject_objects(p):
+            for x, y in self.extents.pairs(p):
                 self.store_triple((x, RDF.type, o))
 
         # RULE prp-rng
         elif t == RDFS.range:
-            for x, y in self.graph.subject_objects(p):
+            for x, y in self.extents.pairs(p):
                 self.store_triple((y, RDF.type, o))
 
         elif t == RDF.type:
             # RULE prp-fp
             if o == OWL.FunctionalProperty:
                 # Property axiom #3
-                for x, y1 in self.graph.subject_objects(p):
+                for x, y1 in self.extents.pairs(p):
                     for y2 in self.graph.objects(x, p):
                         # Optimization: if the two resources are identical, the samAs is already
                         # taken place somewhere else, unnecessary to add it here
@@ -475,7 +813,7 @@ class OWLRL_Semantics(Core):
 
             # RULE prp-ifp
             elif o == OWL.InverseFunctionalProperty:
-                for x1, y in self.graph.subject_objects(p):
+                for x1, y in self.extents.pairs(p):
                     for x2 in self.graph.subjects(p, y):
                         # Optimization: if the two resources are identical, the samAs is already
                         # taken place somewhere else, unnecessary to add it here
@@ -484,7 +822,7 @@ class OWLRL_Semantics(Core):
 
             # RULE prp-irp
             elif o == OWL.IrreflexiveProperty:
-                for x, y in self.graph.subject_objects(p):
+                for x, y in self.extents.pairs(p):
                     if x == y:
                         self.add_error(
                             "Irreflexive property used on %s with %s" % (x, p)
@@ -492,12 +830,12 @@ class OWLRL_Semantics(Core):
 
             # RULE prp-symp
             elif o == OWL.SymmetricProperty:
-                for x, y in self.graph.subject_objects(p):
+                for x, y in self.extents.pairs(p):
                     self.store_triple((y, p, x))
 
             # RULE prp-asyp
             elif o == OWL.AsymmetricProperty:
-                for x, y in self.graph.subject_objects(p):
+                for x, y in self.extents.pairs(p):
                     if (y, p, x) in self.graph:
                         self.add_error(
                             "Erroneous usage of asymmetric property %s on %s and %s"
@@ -506,7 +844,7 @@ class OWLRL_Semantics(Core):
 
             # RULE prp-trp
             elif o == OWL.TransitiveProperty:
-                for x, y in self.graph.subject_objects(p):
+                for x, y in self.extents.pairs(p):
                     for z in self.graph.objects(y, p):
                         self.store_triple((x, p, z))
 
@@ -522,7 +860,7 @@ class OWLRL_Semantics(Core):
                         pi = pis[i]
                         for j in range(i + 1, len(pis) - 1):
                             pj = pis[j]
-                            for x, y in self.graph.subject_objects(pi):
+                            for x, y in self.extents.pairs(pi):
                                 if (x, pj, y) in self.graph:
                                     self.add_error(
                                         "Disjoint properties in an 'AllDisjointProperties' are not really "
@@ -533,12 +871,12 @@ class OWLRL_Semantics(Core):
         # RULE prp-spo1
         elif t == RDFS.subPropertyOf:
             p1, p2 = p, o
-            for x, y in self.graph.subject_objects(p1):
+            for x, y in self.extents.pairs(p1):
                 self.store_triple((x, p2, y))
 
         # RULE prp-spo2
         elif t == OWL.propertyChainAxiom:
-            self._property_chain(p, o)
+            self._property_chain(p, o, cycle_num)
 
         # RULES prp-eqp1 and prp-eqp2
         elif t == OWL.equivalentProperty:
@@ -549,16 +887,16 @@ class OWLRL_Semantics(Core):
             # properties, too...)
             if p1 != p2:
                 # RULE prp-eqp1
-                for x, y in self.graph.subject_objects(p1):
+                for x, y in self.extents.pairs(p1):
                     self.store_triple((x, p2, y))
                 # RULE prp-eqp2
-                for x, y in self.graph.subject_objects(p2):
+                for x, y in self.extents.pairs(p2):
                     self.store_triple((x, p1, y))
 
         # RULE prp-pdw
         elif t == OWL.propertyDisjointWith:
             p1, p2 = p, o
-            for x, y in self.graph.subject_objects(p1):
+            for x, y in self.extents.pairs(p1):
                 if (x, p2, y) in self.graph:
                     self.add_error(
                         "Erroneous usage of disjoint properties %s and %s on %s and %s"
@@ -569,10 +907,10 @@ class OWLRL_Semantics(Core):
         elif t == OWL.inverseOf:
             p1, p2 = p, o
             # RULE prp-inv1
-            for x, y in self.graph.subject_objects(p1):
+            for x, y in self.extents.pairs(p1):
                 self.store_triple((y, p2, x))
             # RULE prp-inv2
-            for x, y in self.graph.subject_objects(p2):
+            for x, y in self.extents.pairs(p2):
                 self.store_triple((y, p1, x))
 
         # RULE prp-key
@@ -580,7 +918,7 @@ class OWLRL_Semantics(Core):
             c, u = p, o
             pis = self._list(u)
             if len(pis) > 0:
-                for x in self.graph.subjects(RDF.type, c):
+                for x in self.extents.instances(c):
                     # "Calculate" the keys for 'x'. The complication is that there can be various combinations
                     # of the keys, and that is the structure one has to build up here...
                     #
@@ -600,7 +938,7 @@ class OWLRL_Semantics(Core):
                     valueList = [l for l in finalList if len(l) == len(pis)]
 
                     # Now we can look for the y-s, to see if they have the same key values
-                    for y in self.graph.subjects(RDF.type, c):
+                    for y in self.extents.instances(c):
                         # rule out the existing equivalences
                         if not (
                             y == x
@@ -664,26 +1002,26 @@ class OWLRL_Semantics(Core):
             # I am not sure how empty lists are sanctioned, so having an extra check
             # on that does not hurt..
             if len(classes) > 0:
-                for y in self.graph.subjects(RDF.type, classes[0]):
+                for y in self.extents.instances(classes[0]):
                     if False not in [
                         (y, RDF.type, cl) in self.graph for cl in classes[1:]
                     ]:
                         self.store_triple((y, RDF.type, c))
             # RULE cls-int2
-            for y in self.graph.subjects(RDF.type, c):
+            for y in self.extents.instances(c):
                 for cl in classes:
                     self.store_triple((y, RDF.type, cl))
 
         # RULE cls-uni
         elif p == OWL.unionOf:
             for cl in self._list(x):
-                for y in self.graph.subjects(RDF.type, cl):
+                for y in self.extents.instances(cl):
                     self.store_triple((y, RDF.type, c))
 
         # RULE cls-comm
         elif p == OWL.complementOf:
             c1, c2 = c, x
-            for x1 in self.graph.subjects(RDF.type, c1):
+            for x1 in self.extents.instances(c1):
                 if (x1, RDF.type, c2) in self.graph:
                     self.add_error(
                         "Violation of complementarity for classes %s and %s on element %s"
@@ -695,16 +1033,16 @@ class OWLRL_Semantics(Core):
             xx, y = c, x
             # RULE cls-svf1
             # RULE cls-svf2
-            for pp in self.graph.objects(xx, OWL.onProperty):
-                for u, v in self.graph.subject_objects(pp):
+            for pp in self.restrictions.objects(xx, OWL.onProperty):
+                for u, v in self.extents.pairs(pp):
                     if y == OWL.Thing or (v, RDF.type, y) in self.graph:
                         self.store_triple((u, RDF.type, xx))
 
         # RULE cls-avf
         elif p == OWL.allValuesFrom:
             xx, y = c, x
-            for pp in self.graph.objects(xx, OWL.onProperty):
-                for u in self.graph.subjects(RDF.type, xx):
+            for pp in self.restrictions.objects(xx, OWL.onProperty):
+                for u in self.extents.instances(xx):
                     for v in self.graph.objects(u, pp):
                         if self.restriction_typing_check(v, y):
                             self.store_triple((v, RDF.type, y))
@@ -717,9 +1055,9 @@ class OWLRL_Semantics(Core):
         # RULES cls-hv1 and cls-hv2
         elif p == OWL.hasValue:
             xx, y = c, x
-            for pp in self.graph.objects(xx, OWL.onProperty):
+            for pp in self.restrictions.objects(xx, OWL.onProperty):
                 # RULE cls-hv1
-                for u in self.graph.subjects(RDF.type, xx):
+                for u in self.extents.instances(xx):
                     self.store_triple((u, pp, y))
                 # RULE cls-hv2
                 for u in self.graph.subjects(pp, y):
@@ -735,8 +1073,8 @@ class OWLRL_Semantics(Core):
             xx = c
             if x.value == 0:
                 # RULE cls-maxc1
-                for pp in self.graph.objects(xx, OWL.onProperty):
-                    for u, y in self.graph.subject_objects(pp):
+                for pp in self.restrictions.objects(xx, OWL.onProperty):
+                    for u, y in self.extents.pairs(pp):
                         # This should not occur:
                         if (u, RDF.type, xx) in self.graph:
                             self.add_error(
@@ -745,8 +1083,8 @@ class OWLRL_Semantics(Core):
                             )
             elif x.value == 1:
                 # RULE cls-maxc2
-                for pp in self.graph.objects(xx, OWL.onProperty):
-                    for u, y1 in self.graph.subject_objects(pp):
+                for pp in self.restrictions.objects(xx, OWL.onProperty):
+                    for u, y1 in self.extents.pairs(pp):
                         if (u, RDF.type, xx) in self.graph:
                             for y2 in self.graph.objects(u, pp):
                                 if y1 != y2:
@@ -762,9 +1100,9 @@ class OWLRL_Semantics(Core):
             xx = c
             if x.value == 0:
                 # RULES cls-maxqc1 and cls-maxqc2 folded in one
-                for pp in self.graph.objects(xx, OWL.onProperty):
-                    for cc in self.graph.objects(xx, OWL.onClass):
-                        for u, y in self.graph.subject_objects(pp):
+                for pp in self.restrictions.objects(xx, OWL.onProperty):
+                    for cc in self.restrictions.objects(xx, OWL.onClass):
+                        for u, y in self.extents.pairs(pp):
                             # This should not occur:
                             if (
                                 (y, RDF.type, cc) in self.graph or cc == OWL.Thing
@@ -775,9 +1113,9 @@ class OWLRL_Semantics(Core):
                                 )
             elif x.value == 1:
                 # RULE cls-maxqc3 and cls-maxqc4 folded in one
-                for pp in self.graph.objects(xx, OWL.onProperty):
-                    for cc in self.graph.objects(xx, OWL.onClass):
-                        for u, y1 in self.graph.subject_objects(pp):
+                for pp in self.restrictions.objects(xx, OWL.onProperty):
+                    for cc in self.restrictions.objects(xx, OWL.onClass):
+                        for u, y1 in self.extents.pairs(pp):
                             if (u, RDF.type, xx) in self.graph:
                                 if cc == OWL.Thing:
                                     for y2 in self.graph.objects(u, pp):
@@ -816,22 +1154,22 @@ class OWLRL_Semantics(Core):
         if p == RDFS.subClassOf:
             # Other axioms sets classes to be subclasses of themselves, to one can optimize the trivial case
             if c1 != c2:
-                for x in self.graph.subjects(RDF.type, c1):
+                for x in self.extents.instances(c1):
                     self.store_triple((x, RDF.type, c2))
 
         # RULES cax-eqc1 and cax-eqc1
         # Other axioms set classes to be equivalent to themselves, one can optimize the trivial case
         elif p == OWL.equivalentClass and c1 != c2:
             # RULE cax-eqc1
-            for x in self.graph.subjects(RDF.type, c1):
+            for x in self.extents.instances(c1):
                 self.store_triple((x, RDF.type, c2))
             # RULE cax-eqc1
-            for x in self.graph.subjects(RDF.type, c2):
+            for x in self.extents.instances(c2):
                 self.store_triple((x, RDF.type, c1))
 
         # RULE cax-dw
         elif p == OWL.disjointWith:
-            for x in self.graph.subjects(RDF.type, c1):
+            for x in self.extents.instances(c1):
                 if (x, RDF.type, c2) in self.graph:
                     self.add_error(
                         "Disjoint classes %s and %s have a common individual %s"
@@ -846,7 +1184,7 @@ class OWLRL_Semantics(Core):
                 if len(classes) > 0:
                     for i in range(0, len(classes) - 1):
                         cl1 = classes[i]
-                        for z in self.graph.subjects(RDF.type, cl1):
+                        for z in self.extents.instances(cl1):
                             for cl2 in classes[(i + 1) :]:
                                 if (z, RDF.type, cl2) in self.graph:
                                     self.add_error(
@@ -956,45 +1294,48 @@ class OWLRL_Semantics(Core):
         # RULE scm-hv
         elif p == OWL.hasValue:
             c1, i = s, o
-            for p1 in self.graph.objects(c1, OWL.onProperty):
-                for c2 in self.graph.subjects(OWL.hasValue, i):
-                    for p2 in self.graph.objects(c2, OWL.onProperty):
+            restrictions = self.restrictions
+            for p1 in restrictions.objects(c1, OWL.onProperty):
+                for c2 in restrictions.subjects(OWL.hasValue, i):
+                    for p2 in restrictions.objects(c2, OWL.onProperty):
                         if (p1, RDFS.subPropertyOf, p2) in self.graph:
                             self.store_triple((c1, RDFS.subClassOf, c2))
 
         # RULES scm-svf1 and scm-svf2
         elif p == OWL.someValuesFrom:
+            restrictions = self.restrictions
             # RULE scm-svf1
             c1, y1 = s, o
-            for pp in self.graph.objects(c1, OWL.onProperty):
-                for c2 in self.graph.subjects(OWL.onProperty, pp):
-                    for y2 in self.graph.objects(c2, OWL.someValuesFrom):
+            for pp in restrictions.objects(c1, OWL.onProperty):
+                for c2 in restrictions.subjects(OWL.onProperty, pp):
+                    for y2 in restrictions.objects(c2, OWL.someValuesFrom):
                         if (y1, RDFS.subClassOf, y2) in self.graph:
                             self.store_triple((c1, RDFS.subClassOf, c2))
 
             # RULE scm-svf2
             c1, y = s, o
-            for p1 in self.graph.objects(c1, OWL.onProperty):
-                for c2 in self.graph.subjects(OWL.someValuesFrom, y):
-                    for p2 in self.graph.objects(c2, OWL.onProperty):
+            for p1 in restrictions.objects(c1, OWL.onProperty):
+                for c2 in restrictions.subjects(OWL.someValuesFrom, y):
+                    for p2 in restrictions.objects(c2, OWL.onProperty):
                         if (p1, RDFS.subPropertyOf, p2) in self.graph:
                             self.store_triple((c1, RDFS.subClassOf, c2))
 
         # RULES scm-avf1 and scm-avf2
         elif p == OWL.allValuesFrom:
+            restrictions = self.restrictions
             # RULE scm-avf1
             c1, y1 = s, o
-            for pp in self.graph.objects(c1, OWL.onProperty):
-                for c2 in self.graph.subjects(OWL.onProperty, pp):
-                    for y2 in self.graph.objects(c2, OWL.allValuesFrom):
+            for pp in restrictions.objects(c1, OWL.onProperty):
+                for c2 in restrictions.subjects(OWL.onProperty, pp):
+                    for y2 in restrictions.objects(c2, OWL.allValuesFrom):
                         if (y1, RDFS.subClassOf, y2) in self.graph:
                             self.store_triple((c1, RDFS.subClassOf, c2))
 
             # RULE scm-avf2
             c1, y = s, o
-            for p1 in self.graph.objects(c1, OWL.onProperty):
-                for c2 in self.graph.subjects(OWL.allValuesFrom, y):
-                    for p2 in self.graph.objects(c2, OWL.onProperty):
+            for p1 in restrictions.objects(c1, OWL.onProperty):
+                for c2 in restrictions.subjects(OWL.allValuesFrom, y):
+                    for p2 in restrictions.objects(c2, OWL.onProperty):
                         if (p1, RDFS.subPropertyOf, p2) in self.graph:
                             self.store_triple((c2, RDFS.subClassOf, c1))
 
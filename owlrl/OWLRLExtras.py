@@ -48,6 +48,7 @@ from rdflib.namespace import RDF, RDFS, OWL, XSD
 from fractions import Fraction as Rational
 
 from .DatatypeHandling import AltXSDToPYTHON
+from .Closure import remove_triples
 
 
 # noinspection PyPep8Naming
@@ -143,7 +144,7 @@ class OWLRL_Extension(RDFS_OWLRL_Semantics):
             subsumption_list=[OWL.rational],
         )
 
-        self.restricted_datatypes = extract_faceted_datatypes(self, graph)
+        self.restricted_datatypes = extract_faceted_datatypes(self, self.graph)
         for dt in self.restricted_datatypes:
             self.add_new_datatype(
                 dt.datatype,
@@ -247,10 +248,10 @@ class OWLRL_Extension(RDFS_OWLRL_Semantics):
         RDFS_OWLRL_Semantics.rules(self, t, cycle_num)
         z, q, x = t
         if q == OWL.hasSelf:
-            for p in self.graph.objects(z, OWL.onProperty):
-                for y in self.graph.subjects(RDF.type, z):
+            for p in self.restrictions.objects(z, OWL.onProperty):
+                for y in self.extents.instances(z):
                     self.store_triple((y, p, y))
-                for y1, y2 in self.graph.subject_objects(p):
+                for y1, y2 in self.extents.pairs(p):
                     if y1 == y2:
                         self.store_triple((y1, RDF.type, z))
 
@@ -344,7 +345,7 @@ class OWLRL_Extension_Trimming(OWLRL_Extension):
                     to_be_removed.add(t)
 
         for an in OWLRL_Annotation_properties:
-            self.destination.remove((an, RDF.type, OWL.AnnotationProperty))
+            to_be_removed.add((an, RDF.type, OWL.AnnotationProperty))
 
         to_be_removed.add((OWL.Nothing, RDF.type, OWL.Class))
         to_be_removed.add((OWL.Nothing, RDF.type, RDFS.Class))
@@ -361,5 +362,4 @@ class OWLRL_Extension_Trimming(OWLRL_Extension):
         to_be_removed.add((OWL.DataRange, RDFS.subClassOf, OWL.DatatypeProperty))
         to_be_removed.add((OWL.DataRange, OWL.equivalentClass, OWL.DatatypeProperty))
 
-        for t in to_be_removed:
-            self.destination.remove(t)
+        remove_triples(self.destination, to_be_removed)
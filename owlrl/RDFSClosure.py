@@ -164,18 +164,18 @@ class RDFS_Semantics(Core):
             self.store_triple((o, RDF.type, RDFS.Resource))
         if p == RDFS.domain:
             # rdfs2
-            for uuu, Y, yyy in self.graph.triples((None, s, None)):
+            for uuu, yyy in self.extents.pairs(s):
                 self.store_triple((uuu, RDF.type, o))
         if p == RDFS.range:
             # rdfs3
-            for uuu, Y, vvv in self.graph.triples((None, s, None)):
+            for uuu, vvv in self.extents.pairs(s):
                 self.store_triple((vvv, RDF.type, o))
         if p == RDFS.subPropertyOf:
             # rdfs5
             for Z, Y, xxx in self.graph.triples((o, RDFS.subPropertyOf, None)):
                 self.store_triple((s, RDFS.subPropertyOf, xxx))
             # rdfs7
-            for zzz, Z, www in self.graph.triples((None, s, None)):
+            for zzz, www in self.extents.pairs(s):
                 self.store_triple((zzz, o, www))
         if p == RDF.type and o == RDF.Property:
             # rdfs6
@@ -187,7 +187,7 @@ class RDFS_Semantics(Core):
             self.store_triple((s, RDFS.subClassOf, s))
         if p == RDFS.subClassOf:
             # rdfs9
-            for vvv, Y, Z in self.graph.triples((None, RDF.type, s)):
+            for vvv in self.extents.instances(s):
                 self.store_triple((vvv, RDF.type, o))
             # rdfs11
             for Z, Y, xxx in self.graph.triples((o, RDFS.subClassOf, None)):
@@ -55,6 +55,7 @@ __contact__ = "Ivan Herman, ivan@w3.org"
 __license__ = "W3C® SOFTWARE NOTICE AND LICENSE, http://www.w3.org/Consortium/Legal/2002/copyright-software-20021231"
 
 import re
+from functools import partial
 
 from rdflib.namespace import OWL, RDF, RDFS, XSD
 from rdflib import Literal as rdflibLiteral, Graph
@@ -124,8 +125,8 @@ def _lit_to_value(dt, v):
     The method is the equivalent of all the methods in the :mod:`.DatatypeHandling` module, and is registered
     to the system run time, as new restricted datatypes are discovered.
 
-    (Technically, the registration is done via a :code:`lambda v: _lit_to_value(self,v)` setting from within a
-    :class:`.RestrictedDatatype` instance).
+    (Technically, the registration is done via a :code:`functools.partial(_lit_to_value, self)` setting from within a
+    :class:`.RestrictedDatatype` instance, which keeps the instance picklable).
 
     :param dt: Faceted datatype.
     :type dt: :class:`RestrictedDatatype`
@@ -340,8 +341,8 @@ class RestrictedDatatype(RestrictedDatatypeCore):
         value if a facet is around.
     :ivar check_methods: List of class methods that are relevant for the given :code:`base_type`.
 
-    :ivar toPython: Function to convert a Literal of the specified type to a Python value. Is defined by :code:`lambda v:
-        _lit_to_value(self, v)`, see :py:func:`._lit_to_value`.
+    :ivar toPython: Function to convert a Literal of the specified type to a Python value. Is defined by
+        :code:`functools.partial(_lit_to_value, self)`, see :py:func:`._lit_to_value`.
     """
 
     def __init__(self, type_uri, base_type, facets):
@@ -427,7 +428,17 @@ class RestrictedDatatype(RestrictedDatatypeCore):
             if self.base_type in Datatypes_per_facets[cat]:
                 self.check_methods = facet_to_method[cat]
                 break
-        self.toPython = lambda v: _lit_to_value(self, v)
+        self.toPython = partial(_lit_to_value, self)
+
+    def __getstate__(self):
+        # The converter may be a lambda from DatatypeHandling.AltXSDToPYTHON; it is looked up again on unpickling
+        state = self.__dict__.copy()
+        del state["converter"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.converter = AltXSDToPYTHON[self.base_type]
 
     def checkValue(self, value):
         """
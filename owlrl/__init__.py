@@ -160,17 +160,34 @@ __author__ = "Ivan Herman"
 __contact__ = "Ivan Herman, ivan@w3.org"
 __license__ = "W3C® SOFTWARE NOTICE AND LICENSE, http://www.w3.org/Consortium/Legal/2002/copyright-software-20021231"
 
-from typing import Union
+import io
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.util import Finalize
+from typing import Iterable, Iterator, Tuple, Union
 
 # noinspection PyPackageRequirements,PyPackageRequirements,PyPackageRequirements
 import rdflib
 from rdflib import Graph, Literal
+from rdflib.graph import ConjunctiveGraph
 
 from . import DatatypeHandling, Closure
+from .Closure import ClosureCancelled, ClosureProgress
 from .OWLRLExtras import OWLRL_Extension, OWLRL_Extension_Trimming
 from .OWLRL import OWLRL_Semantics
 from .RDFSClosure import RDFS_Semantics
 from .CombinedClosure import RDFS_OWLRL_Semantics
+from .encoded_store import EncodedStore, OverlayStore, SharedTripleTable
+from .checkpoint import ClosureCheckpoint
+from .closure_cache import ClosureCache, canonical_bnodes
+from .import_cache import ImportCache
+from .memory_store import STORE_PLUGIN, ReasonerMemory
+from .ntriples import load_ntriples
+from .serializer import NQUADS, NTRIPLES, STREAMING_FORMATS, TURTLE_STREAM, open_output, stream_serialize
+from .snapshot import SNAPSHOT, Snapshot, save_snapshot
+from .sparql_engine import SPARQLClosure
+from .sqlite_engine import SQLiteClosure
 from rdflib.namespace import OWL
 
 RDFXML = "xml"
@@ -180,26 +197,24 @@ AUTO = "auto"
 RDFA = "rdfa"
 
 
-# noinspection PyShadowingBuiltins
-def __parse_input(iformat, inp, graph):
-    """Parse the input into the graph, possibly checking the suffix for the format.
-
-    @param iformat: input format; can be one of L{AUTO}, L{TURTLE}, or L{RDFXML}. L{AUTO} means that the suffix of the
-    file name or URI will decide: '.ttl' means Turtle, RDF/XML otherwise.
-    @param inp: input file; anything that RDFLib accepts in that position (URI, file name, file object). If '-',
-    standard input is used.
-    @param graph: the RDFLib Graph instance to parse into.
-    """
+def _input_format(iformat, inp):
+    """Return the RDFLib parser name for an input, possibly checking the suffix for the format."""
     if iformat == AUTO:
         if inp == "-":
             format = "turtle"
         else:
             if inp.endswith(".ttl") or inp.endswith(".n3"):
                 format = "turtle"
+            elif inp.endswith(".nt"):
+                format = "nt"
+            elif inp.endswith(".nq"):
+                format = "nquads"
             elif inp.endswith(".json") or inp.endswith(".jsonld"):
                 format = "json-ld"
             elif inp.endswith(".html"):
                 format = "rdfa1.1"
+            elif inp.endswith(".tt"):
+                format = SNAPSHOT
             else:
                 format = "xml"
     elif iformat == TURTLE:
@@ -210,8 +225,29 @@ def __parse_input(iformat, inp, graph):
         format = "xml"
     elif iformat == JSON:
         format = "json-ld"
+    elif iformat == NTRIPLES:
+        format = "nt"
+    elif iformat == NQUADS:
+        format = "nquads"
+    elif iformat == SNAPSHOT:
+        format = SNAPSHOT
     else:
         raise Exception("Unknown input syntax")
+    return format
+
+
+# noinspection PyShadowingBuiltins
+def __parse_input(iformat, inp, graph, workers=None):
+    """Parse the input into the graph, possibly checking the suffix for the format.
+
+    @param iformat: input format; can be one of L{AUTO}, L{TURTLE}, L{RDFXML}, L{NTRIPLES}, L{NQUADS} or L{SNAPSHOT}.
+    L{AUTO} means that the suffix of the file name or URI will decide: '.ttl' means Turtle, RDF/XML otherwise.
+    @param inp: input file; anything that RDFLib accepts in that position (URI, file name, file object). If '-',
+    standard input is used.
+    @param graph: the RDFLib Graph instance to parse into.
+    @param workers: number of processes used to parse a local N-Triples or N-Quads file (see L{load_ntriples}).
+    """
+    format = _input_format(iformat, inp)
 
     if inp == "-":
         # standard input is used
@@ -220,10 +256,140 @@ def __parse_input(iformat, inp, graph):
         source = sys.stdin
     else:
         source = inp
-    graph.parse(source, format=format)
+
+    if format == SNAPSHOT:
+        # binary snapshots are local files only
+        if source is not inp:
+            raise Exception("A snapshot cannot be read from the standard input")
+        with Snapshot(inp) as snapshot:
+            graph.addN((s, p, o, graph) for (s, p, o) in snapshot.table.triples((None, None, None)))
+    elif format in ("nt", "nquads") and (source is not inp or os.path.isfile(inp)):
+        # line oriented formats from a local file or the standard input bypass the RDFLib parser
+        load_ntriples(source, graph, quads=(format == "nquads"), workers=workers)
+    else:
+        graph.parse(source, format=format)
+
+
+# Double underscore names are mangled within a class body; this alias is used by the methods of DeductiveClosure
+_parse_input = __parse_input
+
+
+def _input_location(inp):
+    """Resolve a source to an absolute file name or URI, to recognize that two references point to the same source."""
+    inp = str(inp)
+    if inp == "-":
+        return inp
+    if "://" in inp or inp.startswith("file:"):
+        from urllib.parse import unquote, urldefrag, urlparse
+
+        inp = urldefrag(inp)[0]
+        parsed = urlparse(inp)
+        if parsed.scheme != "file":
+            return inp
+        inp = unquote(parsed.path)
+    return os.path.abspath(inp)
+
+
+def _load_source(iformat, inp, owl_imports, workers=None, cache=None):
+    """Parse one source on its own; return its triples and, if requested, its (removed) import targets."""
+    if cache is not None and cache.is_cacheable(inp) and _input_format(iformat, inp) != SNAPSHOT:
+        triples = cache.triples(inp, _input_format(iformat, inp))
+    else:
+        graph = Graph()
+        __parse_input(iformat, inp, graph, workers)
+        triples = list(graph)
+    imports = []
+    if owl_imports:
+        kept = []
+        for t in triples:
+            if t[1] == OWL.imports:
+                # this is not 100% kosher. The expected object for an import statement is a URI. However,
+                # on local usage, a string would also make sense, so I do that one, too
+                imports.append(str(t[2]) if isinstance(t[2], Literal) else t[2])
+            else:
+                kept.append(t)
+        triples = kept
+    return triples, imports
 
 
-def interpret_owl_imports(iformat, graph):
+def load_sources(iformat, sources, graph, owl_imports=False, workers=None, cache=None):
+    """
+    Parse several sources, and possibly the transitive closure of their :code:`owl:imports`, into a graph.
+
+    Every source is parsed into a separate graph; with several workers, this is done concurrently in a pool of
+    processes, and the imported ontologies are scheduled as soon as the import statements are found. A source is
+    parsed only once, even if it is referred to (e.g., imported) several times: the references are compared after
+    resolving file names and URIs to absolute locations. The results are merged into the graph in one bulk step at the
+    end.
+
+    :param iformat: Input format; see :func:`interpret_owl_imports`.
+    :type iformat: str
+    :param sources: File names or URIs.
+    :type sources: iterable of str
+    :param graph: The RDFLib Graph instance to parse into.
+    :type graph: :class:`rdflib.graph.Graph`
+    :param owl_imports: Whether the :code:`owl:imports` statements are interpreted, i.e., the imported ontologies are
+        loaded and the statements removed. The import statements already in the graph are also interpreted.
+    :type owl_imports: bool
+    :param workers: Number of processes. Default: None, i.e., all the sources are parsed in the calling process.
+    :type workers: int
+    :param cache: Cache of the parsed imported ontologies (the sources themselves are always parsed). Default: None.
+    :type cache: :class:`.import_cache.ImportCache`
+    """
+    seen = set()
+    pending = []
+
+    def schedule(inp, imported):
+        location = _input_location(inp)
+        if location not in seen:
+            seen.add(location)
+            pending.append((location, cache if imported else None))
+
+    for inp in sources:
+        schedule(inp, False)
+    if owl_imports:
+        for t in list(graph.triples((None, OWL.imports, None))):
+            graph.remove(t)
+            schedule(str(t[2]) if isinstance(t[2], Literal) else t[2], True)
+
+    results = []
+    if workers is None or workers <= 1:
+        while pending:
+            inp, source_cache = pending.pop(0)
+            triples, imports = _load_source(iformat, inp, owl_imports, cache=source_cache)
+            results.append(triples)
+            for i in imports:
+                schedule(i, True)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            running = set()
+            while pending or running:
+                while pending:
+                    inp, source_cache = pending.pop(0)
+                    line_oriented = iformat in (NTRIPLES, NQUADS) or (
+                        iformat == AUTO and inp.endswith((".nt", ".nq"))
+                    )
+                    if inp == "-" or (line_oriented and source_cache is None):
+                        # the standard input is only readable here, and N-Triples files are cut into chunks for the
+                        # pool by the parser itself; meanwhile, the pool goes on with the other sources
+                        triples, imports = _load_source(iformat, inp, owl_imports, workers)
+                        results.append(triples)
+                        for i in imports:
+                            schedule(i, True)
+                    else:
+                        running.add(executor.submit(_load_source, iformat, inp, owl_imports, None, source_cache))
+                if running:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        triples, imports = future.result()
+                        results.append(triples)
+                        for i in imports:
+                            schedule(i, True)
+
+    graph.addN((s, p, o, graph) for triples in results for (s, p, o) in triples)
+
+
+def interpret_owl_imports(iformat, graph, workers=None, cache=None):
     """
     Interpret the owl import statements. Essentially, recursively merge with all the objects in the owl import
     statement, and remove the corresponding triples from the graph.
@@ -235,25 +401,12 @@ def interpret_owl_imports(iformat, graph):
     :type iformat: str
     :param graph: The RDFLib Graph instance to parse into.
     :type graph: :class:`rdflib.graph.Graph`
+    :param workers: Number of processes the imported ontologies are parsed in (see :func:`load_sources`).
+    :type workers: int
+    :param cache: Cache of the parsed imported ontologies. Default: None.
+    :type cache: :class:`.import_cache.ImportCache`
     """
-    while True:
-        # 1. collect the import statements:
-        all_imports = [t for t in graph.triples((None, OWL.imports, None))]
-        if len(all_imports) == 0:
-            # no import statement whatsoever, we can go on...
-            return
-        # 2. remove all the import statements from the graph
-        for t in all_imports:
-            graph.remove(t)
-        # 3. get all the imported vocabularies and import them
-        for (s, p, uri) in all_imports:
-            # this is not 100% kosher. The expected object for an import statement is a URI. However,
-            # on local usage, a string would also make sense, so I do that one, too
-            if isinstance(uri, Literal):
-                __parse_input(iformat, str(uri), graph)
-            else:
-                __parse_input(iformat, uri, graph)
-            # 4. start all over again to see if import statements have been imported
+    load_sources(iformat, [], graph, owl_imports=True, workers=workers, cache=cache)
 
 
 def return_closure_class(owl_closure, rdfs_closure, owl_extras, trimming=False):
@@ -381,29 +534,263 @@ class DeductiveClosure:
         self.rdfs_closure = rdfs_closure
         self.improved_datatypes = improved_datatypes
 
-    def expand(self, graph: Graph, destination: Union[None, Graph] = None):
+    def expand(
+        self,
+        graph: Graph,
+        destination: Union[None, Graph] = None,
+        progress=None,
+        cancel=None,
+        progress_interval: int = 10000,
+        inferred_only: Union[bool, Graph] = False,
+        cache: Union[None, str, ClosureCache] = None,
+        checkpoint: Union[None, str, ClosureCheckpoint] = None,
+        memory_budget: Union[None, int] = None,
+        spill_directory: Union[None, str] = None,
+        engine: str = "python",
+        threads: Union[None, int] = None,
+    ) -> Union[None, Graph]:
         """
         Expand the graph using forward chaining, and with the relevant closure type.
 
+        The inferred triples can also be collected separately, without copying the graph: with :code:`inferred_only`
+        set, the method returns a graph with only those triples that were not in the graph (or the destination)
+        before the expansion. (The graph, or the destination, is expanded as usual.)
+
         :param graph: The RDF graph.
         :type graph: :class:`rdflib.Graph`
         :param destination: The RDF graph to which the results are written. If not specified, the graph is modified in-place.
+            The destination may be in another store than the graph, e.g., an Oxigraph store for an RDFLib graph.
         :type destination: :class:`rdflib.Graph`
+        :param progress: Callback invoked with a :class:`.Closure.ClosureProgress` at the end of every cycle and every
+            :code:`progress_interval` triples scanned. Default: None.
+        :type progress: callable
+        :param cancel: Cancellation token (e.g., a :class:`threading.Event`), checked at the same points as the
+            progress is reported. If it is set, the expansion stops with a :class:`.Closure.ClosureCancelled`
+            exception, leaving the sound inferences found so far in the destination. Default: None.
+        :param progress_interval: Number of triples scanned between two progress reports. Default: 10000.
+        :type progress_interval: int
+        :param inferred_only: If True, a new graph collecting the inferred triples is returned. A graph (or any object
+            with :code:`add` and :code:`remove` methods) can also be passed, to be used instead. Default: False.
+        :type inferred_only: bool or :class:`rdflib.Graph`
+        :param cache: A cache of closure results, or the name of its directory (see :mod:`.closure_cache`). If the same
+            graph has already been expanded with the same settings, the cached result is loaded instead of running the
+            rules (no progress is then reported). The cache can only be used to expand an RDFLib graph in place.
+            Default: None.
+        :type cache: :class:`.closure_cache.ClosureCache` or str
+        :param checkpoint: A checkpoint, or the name of its directory, to record the state of the closure at the end of
+            every cycle and to resume an interrupted closure (see :mod:`.checkpoint`). Default: None.
+        :type checkpoint: :class:`.checkpoint.ClosureCheckpoint` or str
+        :param memory_budget: Maximum number of new triples kept in memory during a cycle; beyond that, they are
+            spilled to temporary files in :code:`spill_directory` (see :mod:`.spill`). Default: None, i.e., no limit.
+        :type memory_budget: int
+        :param spill_directory: Directory of the temporary files. Default: None, i.e., the system default.
+        :type spill_directory: str
+        :param engine: How the rules are evaluated: "python" (the rules of the closure class, in Python), "sqlite"
+            (SQL joins run in a temporary SQLite database, for graphs too large for memory, see :mod:`.sqlite_engine`;
+            the :code:`cache`, :code:`checkpoint`, :code:`memory_budget` and :code:`threads` options are then not
+            available), or, for an Oxigraph store, "sparql" (SPARQL updates run inside the store, see
+            :mod:`.sparql_engine`; the :code:`inferred_only` option is not available either). Default: "python".
+        :type engine: str
+        :param threads: Number of threads scanning the graph in every cycle of the Python engine; this can only pay off
+            with an Oxigraph store, and mostly on a free-threaded Python build (see :meth:`.Closure.Core.closure`).
+            Default: None, i.e., the scan is done in the calling thread.
+        :type threads: int
+        :return: The graph of the inferred triples if :code:`inferred_only` is set, None otherwise.
+        :rtype: :class:`rdflib.Graph`
         """
+        if engine == "sparql":
+            if (
+                inferred_only is not False
+                or cache is not None
+                or checkpoint is not None
+                or memory_budget is not None
+                or threads is not None
+            ):
+                raise ValueError("The SPARQL engine does not support the inferred_only, cache, checkpoint, "
+                                 "memory_budget and threads options")
+            if self.closure_class is not None:
+                SPARQLClosure(
+                    graph, self.closure_class, self.axiomatic_triples, self.datatype_axioms, destination=destination
+                ).closure(progress=progress, cancel=cancel)
+            return None
+        elif engine == "sqlite":
+            if cache is not None or checkpoint is not None or memory_budget is not None or threads is not None:
+                raise ValueError("The SQLite engine does not support the cache, checkpoint, memory_budget and threads "
+                                 "options")
+        elif engine != "python":
+            raise ValueError("Unknown closure engine: %s" % engine)
+
+        if inferred_only is True:
+            inferred = Graph()
+        elif inferred_only is False:
+            inferred = None
+        else:
+            inferred = inferred_only
+
+        if cache is not None and self.closure_class is not None:
+            if destination is not None or not isinstance(graph, Graph) or isinstance(graph, ConjunctiveGraph):
+                raise ValueError("The closure cache can only be used to expand an RDFLib graph in place")
+            if isinstance(cache, str):
+                cache = ClosureCache(cache)
+            bnodes = canonical_bnodes(graph)
+            key = cache.key(graph, self._cache_settings(), bnodes)
+            result = cache.get(key, bnodes)
+            if result is not None:
+                result = set(result)
+                removed = [t for t in graph if t not in result]
+                added = [t for t in result if t not in graph]
+                for t in removed:
+                    graph.remove(t)
+                graph.addN((s, p, o, graph) for (s, p, o) in added)
+                if inferred is not None:
+                    for t in added:
+                        inferred.add(t)
+                return inferred
+
         if (not DeductiveClosure.improved_datatype_generic) and self.improved_datatypes:
             DatatypeHandling.use_Alt_lexical_conversions()
 
-        if self.closure_class is not None:
-            self.closure_class(
-                graph,
-                self.axiomatic_triples,
-                self.datatype_axioms,
-                rdfs=self.rdfs_closure,
-                destination=destination
-            ).closure()
+        try:
+            if self.closure_class is not None and engine == "sqlite":
+                SQLiteClosure(
+                    self.closure_class(
+                        graph,
+                        self.axiomatic_triples,
+                        self.datatype_axioms,
+                        rdfs=self.rdfs_closure,
+                        destination=destination
+                    )
+                ).closure(progress=progress, cancel=cancel, inferred=inferred)
+            elif self.closure_class is not None:
+                self.closure_class(
+                    graph,
+                    self.axiomatic_triples,
+                    self.datatype_axioms,
+                    rdfs=self.rdfs_closure,
+                    destination=destination
+                ).closure(
+                    progress=progress,
+                    cancel=cancel,
+                    progress_interval=progress_interval,
+                    inferred=inferred,
+                    checkpoint=checkpoint,
+                    memory_budget=memory_budget,
+                    spill_directory=spill_directory,
+                    threads=threads,
+                )
+        finally:
+            if (not DeductiveClosure.improved_datatype_generic) and self.improved_datatypes:
+                DatatypeHandling.use_RDFLib_lexical_conversions()
+
+        if cache is not None and self.closure_class is not None:
+            cache.put(key, graph, bnodes)
+        return inferred
+
+    def _cache_settings(self):
+        """Everything, besides the graph, that the result of :meth:`expand` depends on."""
+        return (
+            __version__,
+            "%s.%s" % (self.closure_class.__module__, self.closure_class.__qualname__),
+            bool(self.axiomatic_triples),
+            bool(self.datatype_axioms),
+            bool(self.rdfs_closure),
+            bool(self.improved_datatypes),
+        )
+
+    def expand_many(
+        self,
+        sources: Iterable[Union[Graph, str]],
+        ontology: Union[None, Graph, str] = None,
+        workers: Union[None, int] = None,
+        ordered: bool = True,
+        iformat: str = "auto",
+        shared_ontology: bool = True,
+    ) -> Iterator[Tuple[int, Graph]]:
+        """
+        Expand a (possibly very long) series of graphs, each together with a common ontology, fanning the work out to
+        a pool of worker processes.
+
+        The ontology is closed only once. By default, this is done in the calling process and the closed ontology is
+        placed, in the compact form of an :class:`.encoded_store.TripleTable`, into a shared memory block that every
+        worker attaches to read-only: starting a worker requires neither parsing nor closing the ontology, and the
+        memory it uses does not grow with the number of workers. Otherwise (i.e., if :code:`shared_ontology` is False)
+        every worker loads and closes its own copy of the ontology in the pool initializer.
 
-        if (not DeductiveClosure.improved_datatype_generic) and self.improved_datatypes:
-            DatatypeHandling.use_RDFLib_lexical_conversions()
+        Each source is then expanded against that closed ontology; the ontology triples themselves are never copied
+        into, or modified by, the per-source expansions. The result for a source is a new graph with the triples of
+        the source and all the inferred triples that are not already in the closed ontology.
+
+        :param sources: Graphs, or file names/URIs to parse (see :code:`iformat`). Graphs are sent to the workers as
+            a list of triples, file names are parsed by the workers themselves.
+        :type sources: iterable of :class:`rdflib.Graph` or str
+
+        :param ontology: The ontology (graph, file name or URI) each source is expanded against. Default: None.
+        :type ontology: :class:`rdflib.Graph` or str
+
+        :param workers: Number of worker processes; defaults to the number of CPUs. With a value of 0 all the work is
+            done in the calling process, which can be useful for debugging.
+        :type workers: int
+
+        :param ordered: If True, the results are yielded in the order of the sources, otherwise as they are completed.
+        :type ordered: bool
+
+        :param iformat: Input format for the file names, as for :func:`owlrl.convert_graph`. Default: "auto".
+        :type iformat: str
+
+        :param shared_ontology: Whether the closed ontology is shared by the workers via shared memory. Default: True.
+        :type shared_ontology: bool
+
+        :return: Iterator of :code:`(index, graph)` pairs, where :code:`index` is the position of the source.
+        :rtype: iterator of tuple
+        """
+        if isinstance(ontology, Graph):
+            ontology = list(ontology)
+
+        if workers == 0:
+            global _worker_state
+            _expand_many_init(self, ontology, iformat)
+            try:
+                for index, source in enumerate(sources):
+                    yield index, _triples_to_graph(_expand_many_task(_source_to_task(source)))
+            finally:
+                _worker_state = None
+            return
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        shared = None
+        if shared_ontology and ontology is not None:
+            closed_ontology = Graph()
+            if isinstance(ontology, list):
+                closed_ontology.addN((s, p, o, closed_ontology) for (s, p, o) in ontology)
+            else:
+                _parse_input(iformat, ontology, closed_ontology)
+            self.expand(closed_ontology)
+            shared = SharedTripleTable.create(closed_ontology)
+            del closed_ontology
+            initargs = (self, None, iformat, shared.name)
+        else:
+            initargs = (self, ontology, iformat)
+
+        # Keep a bounded number of sources in flight, so that a long stream of sources is not pickled up front
+        max_pending = 2 * workers
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_expand_many_init, initargs=initargs
+            ) as executor:
+                pending = deque()
+                for index, source in enumerate(sources):
+                    pending.append((index, executor.submit(_expand_many_task, _source_to_task(source))))
+                    if len(pending) >= max_pending:
+                        for result in _collect_expand_many(pending, ordered):
+                            yield result
+                while pending:
+                    for result in _collect_expand_many(pending, ordered):
+                        yield result
+        finally:
+            if shared is not None:
+                shared.close()
 
     @staticmethod
     def use_improved_datatypes_conversions():
@@ -422,6 +809,82 @@ class DeductiveClosure:
         DatatypeHandling.use_RDFLib_lexical_conversions()
 
 
+###############################################################################################################
+# Helpers for DeductiveClosure.expand_many. These must be module level functions to be usable in worker processes.
+
+# State of a worker process, set up once by the pool initializer: the DeductiveClosure instance, the input format, and
+# the read-only store with the closed ontology
+_worker_state = None
+
+
+def _expand_many_init(deductive_closure, ontology, iformat, shared_name=None):
+    """
+    Pool initializer: attach to the shared closed ontology if the name of its shared memory block is given, or load
+    and close the ontology otherwise.
+    """
+    global _worker_state
+    if shared_name is not None:
+        shared = SharedTripleTable.attach(shared_name)
+        # detach cleanly when the worker ends, the views on the block must be released before it is closed
+        Finalize(shared, shared.close, exitpriority=10)
+        base = EncodedStore(shared.table)
+    else:
+        ontology_graph = Graph()
+        if isinstance(ontology, list):
+            ontology_graph.addN((s, p, o, ontology_graph) for (s, p, o) in ontology)
+        elif ontology is not None:
+            __parse_input(iformat, ontology, ontology_graph)
+        if ontology is not None:
+            deductive_closure.expand(ontology_graph)
+        base = ontology_graph.store
+    _worker_state = (deductive_closure, iformat, base)
+
+
+def _source_to_task(source):
+    """Turn a source into something that can be cheaply sent over to a worker."""
+    if isinstance(source, Graph):
+        return list(source)
+    return str(source)
+
+
+def _expand_many_task(source):
+    """Expand one source against the closed ontology of the worker; return the resulting triples."""
+    deductive_closure, iformat, base = _worker_state
+    if not isinstance(source, list):
+        parsed = Graph()
+        __parse_input(iformat, source, parsed)
+        source = list(parsed)
+    store = OverlayStore(base)
+    graph = Graph(store=store)
+    graph.addN((s, p, o, graph) for (s, p, o) in source)
+    deductive_closure.expand(graph)
+    # The source triples that are also in the closed ontology are not in the overlay
+    result = set(store.overlay_triples())
+    result.update(t for t in source if t in graph)
+    return list(result)
+
+
+def _triples_to_graph(triples):
+    graph = Graph()
+    graph.addN((s, p, o, graph) for (s, p, o) in triples)
+    return graph
+
+
+def _collect_expand_many(pending, ordered):
+    """Yield the finished results from the pending (index, future) pairs, waiting for at least one of them."""
+    if ordered:
+        index, future = pending.popleft()
+        yield index, _triples_to_graph(future.result())
+        while pending and pending[0][1].done():
+            index, future = pending.popleft()
+            yield index, _triples_to_graph(future.result())
+    else:
+        done, _ = wait([future for (_, future) in pending], return_when=FIRST_COMPLETED)
+        for index, future in [entry for entry in pending if entry[1] in done]:
+            pending.remove((index, future))
+            yield index, _triples_to_graph(future.result())
+
+
 ###############################################################################################################
 
 
@@ -467,16 +930,43 @@ def convert_graph(options, closureClass=None):
         "yes" or "no").
     :type options.daxioms: bool
 
-    :param options.format: Output format, can be "turtle" or "rdfxml".
+    :param options.format: Output format, can be "turtle", "json" or "rdfxml", one of the streaming formats "nt",
+        "nq" or "turtle-stream" (see :mod:`.serializer`), or "snapshot", a binary file that can be read back without
+        parsing (see :mod:`.snapshot`; an output file is then required).
     :type options.format: str
 
-    :param options.iformat: Input format, can be "turtle", "rdfa", "json", "rdfxml", or "auto". "auto" means that the
-        suffix of the file is considered: '.ttl'. '.html', 'json' or '.jsonld' respectively with 'xml' as a fallback.
+    :param options.iformat: Input format, can be "turtle", "rdfa", "json", "rdfxml", "nt", "nq", "snapshot" or
+        "auto". "auto" means that the suffix of the file is considered: '.ttl'. '.html', 'json' or '.jsonld', '.nt',
+        '.nq', '.tt' respectively with 'xml' as a fallback.
     :type options.iformat: str
 
+    :param options.importCache: Directory of the persistent cache of the parsed imported ontologies (see
+        :class:`.import_cache.ImportCache`). Default: None, i.e., no cache.
+    :type options.importCache: str
+
+    :param options.closureCache: Directory of the cache of closure results (see :class:`.closure_cache.ClosureCache`).
+        Default: None, i.e., no cache.
+    :type options.closureCache: str
+
+    :param options.jobs: Number of processes used to parse the sources and the imported ontologies concurrently, and
+        to parse each local N-Triples or N-Quads source. Default: 1.
+    :type options.jobs: int
+
     :param options.trimming: Whether the extension to OWLRL should also include trimming.
     :type options.trimming: bool
 
+    :param options.inferredOnly: Whether only the inferred triples (i.e., not those of the sources) are serialized
+        (can be a boolean, or the strings "yes" or "no").
+    :type options.inferredOnly: bool
+
+    :param options.output: File name the result is written to ("-" for the standard output). If it is set, nothing is
+        returned; the streaming formats are then written out in chunks, without building the serialization in memory.
+    :type options.output: str
+
+    :param options.compress: Whether the output file is compressed with gzip (can be a boolean, or the strings "yes"
+        or "no"); a file name ending with ".gz" is always compressed.
+    :type options.compress: bool
+
     :param closureClass: Explicit class reference. If set, this overrides the various different other options to be
         used as an extension.
     :type closureClass: TODO(edmond.chuc@csiro.au): What class is this supposed to be?
@@ -499,6 +989,12 @@ def convert_graph(options, closureClass=None):
     #   - options.iformat: input format, can be "turtle", "rdfa", "json", "rdfxml", or "auto". "auto" means that the
     #     suffix of the file is considered: '.ttl'. '.html', 'json' or '.jsonld' respectively with 'xml' as a fallback
     #   - options.trimming: whether the extension to OWLRL should also include trimming
+    #   - options.importCache: directory of the persistent cache of the parsed imported ontologies
+    #   - options.closureCache: directory of the cache of closure results
+    #   - options.jobs: number of processes used to parse the sources (and each N-Triples or N-Quads source)
+    #   - options.inferredOnly: whether only the inferred triples are serialized
+    #   - options.output: file name the result is written to, instead of being returned
+    #   - options.compress: whether the output file is compressed with gzip
     # @param closureClass: explicit class reference. If set, this overrides the various different other options to be
     #     used as an extension.
 
@@ -530,6 +1026,25 @@ def convert_graph(options, closureClass=None):
         # exception can be raised if that attribute is not used at all, true for older versions
         pass
 
+    jobs = None
+    try:
+        jobs = int(options.jobs)
+    except:
+        pass
+
+    cache = None
+    try:
+        if options.importCache is not None:
+            cache = ImportCache(options.importCache)
+    except AttributeError:
+        pass
+
+    closure_cache = None
+    try:
+        closure_cache = options.closureCache
+    except AttributeError:
+        pass
+
     # similar measure with the possible usage of the 'source' options
     try:
         if options.source is not None:
@@ -538,11 +1053,6 @@ def convert_graph(options, closureClass=None):
         # exception can be raised if that attribute is not used at all, true for newer versions
         pass
 
-    # Get the sources first. Note that a possible error is filtered out, namely to process the same file twice. This is
-    # done by turning the input arguments into a set...
-    for inp in set(options.sources):
-        __parse_input(iformat, inp, graph)
-
     # add the possible extra text (ie, the text input on the HTML page)
     if options.text is not None:
         graph.parse(data=options.text, format="n3")
@@ -558,11 +1068,24 @@ def convert_graph(options, closureClass=None):
         trimming = __check_yes_or_true(options.trimming)
     except:
         trimming = False
+    try:
+        inferred_only = __check_yes_or_true(options.inferredOnly)
+    except:
+        inferred_only = False
+    try:
+        output = options.output
+    except:
+        output = None
+    try:
+        compress = __check_yes_or_true(options.compress)
+    except:
+        compress = False
     axioms = __check_yes_or_true(options.axioms)
     daxioms = __check_yes_or_true(options.daxioms)
 
-    if owlClosure:
-        interpret_owl_imports(iformat, graph)
+    # Get the sources, and the imported ontologies if OWL 2 RL processing is required. Note that a possible error is
+    # filtered out, namely to process the same file twice: every location is only parsed once.
+    load_sources(iformat, options.sources, graph, owl_imports=owlClosure, workers=jobs, cache=cache)
 
     # @@@@ some smarter choice should be used later to decide what the closure class is!!! That should
     # also control the import management. Eg, if the superclass includes OWL...
@@ -573,17 +1096,42 @@ def convert_graph(options, closureClass=None):
             owlClosure, rdfsClosure, owlExtras, trimming
         )
 
-    DeductiveClosure(
+    inferred = DeductiveClosure(
         closure_class,
         improved_datatypes=True,
         rdfs_closure=rdfsClosure,
         axiomatic_triples=axioms,
         datatype_axioms=daxioms,
-    ).expand(graph)
+    ).expand(graph, inferred_only=inferred_only, cache=closure_cache)
+
+    if inferred_only:
+        # keep the prefixes of the sources for a readable output
+        for prefix, namespace in graph.namespaces():
+            inferred.bind(prefix, namespace, override=False)
+        graph = inferred
+
+    if options.format == SNAPSHOT:
+        if output is None or output == "-":
+            raise Exception("A snapshot can only be written to a file")
+        save_snapshot(graph, output)
+        return None
+
+    if options.format in STREAMING_FORMATS:
+        if output is None:
+            stream = io.StringIO()
+            stream_serialize(graph, stream, options.format)
+            return stream.getvalue()
+        stream_serialize(graph, output, options.format, compress=compress)
+        return None
 
     if options.format == "rdfxml":
-        return graph.serialize(format="pretty-xml")
+        serialized = graph.serialize(format="pretty-xml")
     elif options.format == "json":
-        return graph.serialize(format="json-ld")
+        serialized = graph.serialize(format="json-ld")
     else:
-        return graph.serialize(format="turtle")
+        serialized = graph.serialize(format="turtle")
+    if output is None:
+        return serialized
+    with open_output(output, compress) as stream:
+        stream.write(serialized)
+    return None
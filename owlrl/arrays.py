@@ -0,0 +1,217 @@
+"""
+Export of graphs and closures as NumPy integer arrays, for analytics and machine learning jobs.
+
+The triples are returned as an :code:`(N, 3)` array of integer ids (subject, predicate, object) together with a
+:class:`TermDictionary`, mapping the ids to the RDF terms and back. The arrays are produced without going through the
+RDFLib graph API:
+
+- :func:`table_arrays` gives a view of the id arrays of an :class:`.encoded_store.TripleTable` (e.g., a
+  :class:`.snapshot.Snapshot`, or a closure kept in a :class:`.closure_cache.ClosureCache`), without copying them;
+- :func:`closure_arrays` runs a closure and encodes the triples as they are produced (see :class:`ArrayCollector`);
+  with :code:`inferred_only`, only the inferred triples are kept.
+
+Both can be restricted to a set of predicates.
+
+This module requires NumPy (e.g., :code:`pip install "owlrl[numpy]"`).
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from rdflib.term import Node
+
+try:
+    import numpy as np
+
+    has_numpy = True
+except ImportError:
+    np = None
+    has_numpy = False
+
+from .encoded_store import TripleTable
+
+
+def _require_numpy():
+    if not has_numpy:
+        raise ImportError('The array export requires NumPy; install it with: pip install "owlrl[numpy]"')
+
+
+class TermDictionary:
+    """
+    Mapping between the integer ids of an array export and the RDF terms.
+
+    :param table: The triple table the ids refer to. Default: None, i.e., the ids are given as the terms are added
+        (see :meth:`add`).
+    :type table: :class:`.encoded_store.TripleTable`
+    """
+
+    def __init__(self, table: Optional[TripleTable] = None):
+        self.table = table
+        self._terms: List[Node] = []
+        self._ids: Dict[Node, int] = {}
+
+    def __len__(self) -> int:
+        return self.table.n_terms if self.table is not None else len(self._terms)
+
+    def __getitem__(self, i: int) -> Node:
+        if self.table is not None:
+            if not 0 <= i < self.table.n_terms:
+                raise IndexError(i)
+            return self.table.term(int(i))
+        return self._terms[i]
+
+    def id(self, term: Node) -> Optional[int]:
+        """
+        The id of a term.
+
+        :param term: The RDF term.
+        :return: The id, or None if the term is not in the dictionary.
+        :rtype: int
+        """
+        if self.table is not None:
+            return self.table.term_id(term)
+        return self._ids.get(term)
+
+    def add(self, term: Node) -> int:
+        """
+        Add a term to a dictionary that is not on a triple table, if it is not there yet.
+
+        :param term: The RDF term.
+        :return: Its id.
+        :rtype: int
+        """
+        try:
+            return self._ids[term]
+        except KeyError:
+            if self.table is not None:
+                raise ValueError("Terms cannot be added to the dictionary of a triple table")
+            i = self._ids[term] = len(self._terms)
+            self._terms.append(term)
+            return i
+
+    def terms(self) -> List[Node]:
+        """All the terms, in the order of their ids."""
+        return [self[i] for i in range(len(self))]
+
+
+class ArrayCollector:
+    """
+    Collects triples as integer ids. It can be passed as the :code:`inferred_only` argument of
+    :meth:`.DeductiveClosure.expand` to encode the inferred triples as they are found.
+
+    :param dictionary: The term dictionary to use. Default: None, i.e., a new one.
+    :type dictionary: :class:`TermDictionary`
+    """
+
+    def __init__(self, dictionary: Optional[TermDictionary] = None):
+        self.dictionary = dictionary if dictionary is not None else TermDictionary()
+        # a dictionary keeps the triples in the order they have been found
+        self._rows: Dict[Tuple[int, int, int], None] = {}
+
+    def add(self, t: Tuple[Node, Node, Node]):
+        add = self.dictionary.add
+        self._rows[(add(t[0]), add(t[1]), add(t[2]))] = None
+
+    def update(self, triples: Iterable[Tuple[Node, Node, Node]]):
+        for t in triples:
+            self.add(t)
+
+    def remove(self, t: Tuple[Node, Node, Node]):
+        ids = tuple(self.dictionary.id(r) for r in t)
+        self._rows.pop(ids, None)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def array(self, predicates: Optional[Iterable[Node]] = None) -> "np.ndarray":
+        """
+        The collected triples.
+
+        :param predicates: Only keep the triples with one of these predicates. Default: None, i.e., all triples.
+        :return: An :code:`(N, 3)` array of unsigned 32 bit integers.
+        :rtype: :class:`numpy.ndarray`
+        """
+        _require_numpy()
+        array = np.fromiter(
+            (i for row in self._rows for i in row), dtype=np.uint32, count=3 * len(self._rows)
+        ).reshape(-1, 3)
+        if predicates is not None:
+            array = array[np.isin(array[:, 1], _predicate_ids(self.dictionary, predicates))]
+        return array
+
+
+def _predicate_ids(dictionary: TermDictionary, predicates: Iterable[Node]) -> "np.ndarray":
+    ids = [dictionary.id(p) for p in predicates]
+    return np.array(sorted({i for i in ids if i is not None}), dtype=np.uint32)
+
+
+def _rows(array: "np.ndarray") -> "np.ndarray":
+    # one opaque 12 byte value per triple, to compare whole rows
+    return np.ascontiguousarray(array).view(np.dtype((np.void, array.dtype.itemsize * 3))).ravel()
+
+
+def table_arrays(
+    table: TripleTable, predicates: Optional[Iterable[Node]] = None, exclude: Optional[TripleTable] = None
+) -> Tuple["np.ndarray", TermDictionary]:
+    """
+    The triples of a triple table as an array. Without any restriction, the array is a read-only view of the SPO
+    index of the table, sorted by subject, predicate and object: it is only valid as long as the table is (e.g., until
+    the :class:`.snapshot.Snapshot` is closed), and must be copied to outlive it.
+
+    :param table: The triple table.
+    :type table: :class:`.encoded_store.TripleTable`
+    :param predicates: Only keep the triples with one of these predicates; they are found via the POS index of the
+        table. Default: None, i.e., all triples.
+    :param exclude: Leave out the triples of another table (e.g., the triples of the source, to keep only the inferred
+        ones out of a closure). Default: None.
+    :type exclude: :class:`.encoded_store.TripleTable`
+    :return: An :code:`(N, 3)` array of unsigned 32 bit integers, and the term dictionary of the table.
+    :rtype: tuple
+    """
+    _require_numpy()
+    dictionary = TermDictionary(table)
+    if predicates is None:
+        array = np.frombuffer(table._spo, dtype=np.uint32).reshape(-1, 3)
+    else:
+        pos = np.frombuffer(table._pos, dtype=np.uint32).reshape(-1, 3)
+        parts = []
+        for p in _predicate_ids(dictionary, predicates):
+            start = np.searchsorted(pos[:, 0], p, side="left")
+            end = np.searchsorted(pos[:, 0], p, side="right")
+            parts.append(pos[start:end][:, [2, 0, 1]])
+        array = np.concatenate(parts) if parts else np.empty((0, 3), dtype=np.uint32)
+
+    if exclude is not None and len(array) and len(exclude):
+        # the ids of the other table are mapped to the ids of this one; its triples with unknown terms cannot match
+        mapping = np.array(
+            [-1 if i is None else i for i in (table.term_id(exclude.term(j)) for j in range(exclude.n_terms))],
+            dtype=np.int64,
+        )
+        other = mapping[np.frombuffer(exclude._spo, dtype=np.uint32).reshape(-1, 3)]
+        other = other[(other >= 0).all(axis=1)].astype(np.uint32)
+        array = array[~np.isin(_rows(array), _rows(other))]
+    return array, dictionary
+
+
+def closure_arrays(
+    closure, graph, inferred_only: bool = False, predicates: Optional[Iterable[Node]] = None, **kwargs
+) -> Tuple["np.ndarray", TermDictionary]:
+    """
+    Expand a graph, and return the result as an array. The triples are encoded as they are produced by the closure,
+    not read back from the expanded graph.
+
+    :param closure: The closure to run.
+    :type closure: :class:`.DeductiveClosure`
+    :param graph: The graph; it is expanded in place.
+    :param inferred_only: Only keep the inferred triples, not those of the graph. Default: False.
+    :type inferred_only: bool
+    :param predicates: Only keep the triples with one of these predicates. Default: None, i.e., all triples.
+    :param kwargs: Further arguments of :meth:`.DeductiveClosure.expand` (e.g., :code:`progress`).
+    :return: An :code:`(N, 3)` array of unsigned 32 bit integers, and the term dictionary.
+    :rtype: tuple
+    """
+    _require_numpy()
+    collector = ArrayCollector()
+    if not inferred_only:
+        collector.update(graph.triples((None, None, None)))
+    closure.expand(graph, inferred_only=collector, **kwargs)
+    return collector.array(predicates), collector.dictionary
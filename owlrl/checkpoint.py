@@ -0,0 +1,182 @@
+"""
+Checkpoints of a running closure, to resume it after an interruption.
+
+A closure runs in cycles; at the end of every cycle, a :class:`ClosureCheckpoint` records in a directory:
+
+- the triples added to the destination since the previous checkpoint (in the binary form of an
+  :class:`.encoded_store.TripleTable`, one file per checkpoint);
+- the number of the last completed cycle, and whether the closure has converged;
+- the error messages and, for the OWL 2 RL closures, the blank nodes collected in the first cycle.
+
+If the closure is interrupted (it crashes, is killed or cancelled), running it again with the same checkpoint directory
+adds the recorded triples to the destination again, restores the state, and goes on with the next cycle. The
+directory is removed once the closure has completed.
+
+The graph must be the same as in the interrupted run. Its blank nodes are, in general, different if it has been
+parsed again; they are therefore recorded with canonical labels (see :func:`.closure_cache.canonical_bnodes`) and mapped
+back to the blank nodes of the new graph. A graph whose blank nodes cannot be given canonical labels (e.g., a very long
+chain of blank nodes) can only be used with a durable checkpoint. With a *durable* destination (e.g., an Oxigraph store
+on disk), the triples added before the interruption are still there: the recorded triples are then not added again, the
+blank nodes are recorded with their own labels, and the graph is not checked.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from typing import List, Optional
+
+from rdflib import BNode
+
+from .closure_cache import canonical_bnodes, graph_hash
+from .encoded_store import TripleTable, decode_term, encode_term
+
+_STATE = "state.json"
+
+
+class CheckpointState:
+    """
+    State of a closure, as read from a checkpoint.
+
+    :ivar cycle: The last completed cycle (0 if only the axiomatic and one-time rules have been run).
+    :ivar finished: Whether the last completed cycle has not found any new triple.
+    :ivar triples: The triples added to the destination until then.
+    :ivar errors: The error messages.
+    :ivar bnodes: The blank nodes collected in the first cycle, or None.
+    """
+
+    def __init__(self, cycle: int, finished: bool, triples: list, errors: List[str], bnodes: Optional[list]):
+        self.cycle = cycle
+        self.finished = finished
+        self.triples = triples
+        self.errors = errors
+        self.bnodes = bnodes
+
+
+class _Delta(set):
+    """Set of triples that can be used as the sink of an :class:`.Closure.InferenceRecorder`."""
+
+    def remove(self, t):
+        self.discard(t)
+
+
+class ClosureCheckpoint:
+    """
+    A checkpoint directory (see the module description).
+
+    :param directory: The checkpoint directory; it is created if needed.
+    :type directory: str
+    :param durable: Whether the destination keeps its triples across runs (e.g., an Oxigraph store on disk).
+    :type durable: bool
+    """
+
+    def __init__(self, directory: str, durable: bool = False):
+        self.directory = directory
+        self.durable = durable
+        self.delta = _Delta()
+        self._labels = {}
+        self._input = None
+        self._files = []
+
+    def _relabel(self, term):
+        return self._labels.get(term, term) if isinstance(term, BNode) else term
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _write(self, name: str, data: bytes):
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(name))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def start(self, graph) -> Optional[CheckpointState]:
+        """
+        Prepare the checkpoints of a closure, and read the state of an interrupted one, if any.
+
+        :param graph: The source graph of the closure.
+        :return: The state to resume from, or None if the closure starts from scratch.
+        :rtype: :class:`CheckpointState`
+        :raises ValueError: If the checkpoint has been made for a different graph, or if the blank nodes of the graph
+            cannot be given canonical labels (for a checkpoint that is not durable).
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.delta.clear()
+        if not self.durable:
+            labels = canonical_bnodes(graph.triples((None, None, None)))
+            if labels is None:
+                raise ValueError(
+                    "The blank nodes of the graph cannot be given canonical labels; only a durable checkpoint can be "
+                    "used for it"
+                )
+            self._labels = labels
+            self._input = graph_hash(
+                tuple(self._relabel(r) for r in t) for t in graph.triples((None, None, None))
+            )
+
+        try:
+            with open(self._path(_STATE), encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            self._files = []
+            return None
+        if state["input"] != self._input:
+            raise ValueError("The checkpoint in %s has been made for a different graph" % self.directory)
+        self._files = state["files"]
+
+        # map the recorded blank nodes back to those of the graph
+        inverse = {c: b for (b, c) in self._labels.items()}
+
+        def term(r):
+            return inverse.get(r, r) if isinstance(r, BNode) else r
+
+        triples = []
+        if not self.durable:
+            for name in self._files:
+                with open(self._path(name), "rb") as f:
+                    table = TripleTable(f.read())
+                triples.extend(tuple(term(r) for r in t) for t in table.triples((None, None, None)))
+        bnodes = state["bnodes"]
+        if bnodes is not None:
+            bnodes = [term(decode_term(b)) for b in bnodes]
+        return CheckpointState(state["cycle"], state["finished"], triples, state["errors"], bnodes)
+
+    def save(self, cycle: int, finished: bool, errors: List[str], bnodes: Optional[list] = None):
+        """
+        Record the state of the closure, together with the triples added to the destination since the previous
+        checkpoint (i.e., collected in :attr:`delta`, which is emptied).
+
+        :param cycle: The last completed cycle.
+        :type cycle: int
+        :param finished: Whether the last completed cycle has not found any new triple.
+        :type finished: bool
+        :param errors: The error messages.
+        :type errors: list
+        :param bnodes: The blank nodes collected in the first cycle, if relevant.
+        :type bnodes: list
+        """
+        if self.delta:
+            name = "delta-%06d.tt" % len(self._files)
+            self._write(name, TripleTable.build(tuple(self._relabel(r) for r in t) for t in self.delta))
+            self._files.append(name)
+            self.delta.clear()
+        state = {
+            "cycle": cycle,
+            "finished": finished,
+            "input": self._input,
+            "files": self._files,
+            "errors": [str(e) for e in errors],
+            "bnodes": None if bnodes is None else [encode_term(self._relabel(b)) for b in bnodes],
+        }
+        # the state is replaced atomically, and only refers to complete files
+        self._write(_STATE, json.dumps(state).encode("utf-8"))
+
+    def clear(self):
+        """Remove the checkpoint directory."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._files = []
+        self.delta.clear()
@@ -0,0 +1,235 @@
+"""
+Cache of closure results, keyed by the input graph and the closure settings.
+
+The same closure is often recomputed on unchanged inputs (e.g., in continuous integration or in data pipelines). A
+:class:`ClosureCache` keeps the result of an expansion in a local directory, in the binary form of an
+:class:`.encoded_store.TripleTable`; when the same input is expanded again with the same settings, the result is
+loaded instead of running the rules.
+
+The key is a hash of the input triples that does not depend on their order (the sum, modulo 2^128, of a hash of every
+triple), combined with the closure class, the flags of the :class:`.DeductiveClosure` and the version of the package.
+The same document parsed twice has, in general, different blank node labels; the blank nodes are therefore given
+canonical labels first, computed from their neighbourhoods (see :func:`canonical_bnodes`), and the cached results are
+stored with these labels and mapped back to the blank nodes of the graph being expanded.
+
+The total size of the cache directory is kept under a limit by removing the least recently used results.
+"""
+
+import hashlib
+import os
+import tempfile
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from rdflib import BNode
+from rdflib.term import Node
+
+from .encoded_store import TripleTable, encode_term
+
+_SUFFIX = ".closure"
+
+
+def _refine(edges, colors, max_rounds):
+    """
+    Refine the colors of the blank nodes until the number of distinct colors does not increase any more; return the
+    refined colors, or None if this takes more than :code:`max_rounds` rounds.
+    """
+    distinct = len(set(colors.values()))
+    for _ in range(max_rounds):
+        refined = {}
+        for b, neighbours in edges.items():
+            signature = sorted(
+                "%d\x00%s\x00%s" % (direction, encode_term(p), colors[n] if isinstance(n, BNode) else encode_term(n))
+                for (direction, p, n) in neighbours
+            )
+            refined[b] = hashlib.blake2b(
+                ("\x01".join(signature) + "\x02" + colors[b]).encode("utf-8"), digest_size=16
+            ).hexdigest()
+        count = len(set(refined.values()))
+        if count == distinct or count == len(refined):
+            return refined
+        colors, distinct = refined, count
+    return None
+
+
+def canonical_bnodes(triples: Iterable[Tuple[Node, Node, Node]], max_rounds: int = 32) -> Optional[Dict[BNode, BNode]]:
+    """
+    Give canonical labels to the blank nodes of a set of triples.
+
+    The label of a blank node is refined, round after round, from the labels of the terms it is connected to, until
+    the number of distinct labels does not increase any more (i.e., a color refinement). The labels do not depend on
+    the original blank node labels, so two isomorphic graphs get the same canonical form. If some blank nodes still
+    share a label (e.g., they are symmetric), one of them gets a label of its own, and the labels are refined again,
+    until all of them are different. Which one is picked does not matter if the blank nodes are symmetric; if they are
+    not (color refinement cannot tell some graphs apart), two isomorphic graphs may get different canonical forms.
+    Either way, two graphs with the same canonical form are isomorphic.
+
+    :param triples: The triples.
+    :param max_rounds: Maximum number of rounds of a refinement.
+    :type max_rounds: int
+    :return: The canonical blank node for every blank node or, if a refinement takes more than :code:`max_rounds`
+        rounds (e.g., for a long chain of blank nodes), None.
+    :rtype: dict
+    """
+    edges = defaultdict(list)
+    for s, p, o in triples:
+        if isinstance(s, BNode):
+            edges[s].append((0, p, o))
+        if isinstance(o, BNode):
+            edges[o].append((1, p, s))
+    if not edges:
+        return {}
+
+    colors = dict.fromkeys(edges, "")
+    while True:
+        colors = _refine(edges, colors, max_rounds)
+        if colors is None:
+            return None
+        classes = defaultdict(list)
+        for b, color in colors.items():
+            classes[color].append(b)
+        if len(classes) == len(colors):
+            return {b: BNode("c" + color) for (b, color) in colors.items()}
+        # break the tie of the smallest label shared by several blank nodes
+        tied = min(color for (color, members) in classes.items() if len(members) > 1)
+        colors[classes[tied][0]] = hashlib.blake2b((tied + "\x03").encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _relabel(triples, mapping):
+    for t in triples:
+        yield tuple(mapping.get(r, r) if isinstance(r, BNode) else r for r in t)
+
+
+def graph_hash(triples: Iterable[Tuple[Node, Node, Node]]) -> str:
+    """
+    Compute an order independent hash of a set of triples.
+
+    :param triples: The triples (e.g., a :class:`rdflib.Graph`).
+    :return: A hexadecimal digest.
+    :rtype: str
+    """
+    total = 0
+    count = 0
+    for t in triples:
+        encoded = "\x00".join(encode_term(r) for r in t).encode("utf-8")
+        total += int.from_bytes(hashlib.blake2b(encoded, digest_size=16).digest(), "little")
+        count += 1
+    total %= 1 << 128
+    return "%032x%x" % (total, count)
+
+
+class ClosureCache:
+    """
+    Directory of closure results, with a least recently used eviction.
+
+    :param directory: The cache directory; it is created if needed.
+    :type directory: str
+    :param max_size: Maximum total size of the cached results, in bytes. Default: 1 GiB.
+    :type max_size: int
+    :ivar hits: Number of results found in the cache.
+    :ivar misses: Number of results not found in the cache.
+    """
+
+    def __init__(self, directory: str, max_size: int = 1 << 30):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(
+        triples: Iterable[Tuple[Node, Node, Node]], settings: Iterable, bnodes: Optional[Dict[BNode, BNode]] = None
+    ) -> str:
+        """
+        Compute the key of a closure.
+
+        :param triples: The input triples.
+        :param settings: Everything else the result depends on (closure class, flags, etc.); their :func:`repr` is used.
+        :param bnodes: The canonical labels of the blank nodes (see :func:`canonical_bnodes`). Default: None, i.e.,
+            the blank nodes are hashed with their own labels.
+        :type bnodes: dict
+        :return: The key.
+        :rtype: str
+        """
+        digest = hashlib.sha256(graph_hash(_relabel(triples, bnodes or {})).encode("ascii"))
+        for setting in settings:
+            digest.update(b"\x00" + repr(setting).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str, bnodes: Optional[Dict[BNode, BNode]] = None) -> Optional[List[Tuple[Node, Node, Node]]]:
+        """
+        Get a cached result, and mark it as recently used.
+
+        :param key: The key (see :meth:`key`).
+        :type key: str
+        :param bnodes: The canonical labels of the blank nodes of the input, as used for the key; the canonical blank
+            nodes of the result are mapped back to the blank nodes of the input, the others to new blank nodes.
+            Default: None, i.e., the key has been computed on the labels of the input (e.g., because they could not be
+            given canonical labels), and the blank nodes of the result keep their labels.
+        :type bnodes: dict
+        :return: The triples of the result, or None if it is not in the cache.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                table = TripleTable(f.read())
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        # the modification time is used as the time of the last use
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        if bnodes is None:
+            return list(table.triples((None, None, None)))
+        mapping = defaultdict(BNode)
+        mapping.update((c, b) for (b, c) in bnodes.items())
+        return [tuple(mapping[r] if isinstance(r, BNode) else r for r in t) for t in table.triples((None, None, None))]
+
+    def put(
+        self, key: str, triples: Iterable[Tuple[Node, Node, Node]], bnodes: Optional[Dict[BNode, BNode]] = None
+    ):
+        """
+        Store a result, and evict the least recently used ones if the cache has become too large.
+
+        :param key: The key (see :meth:`key`).
+        :type key: str
+        :param triples: The triples of the result.
+        :param bnodes: The canonical labels of the blank nodes of the input, as used for the key.
+        :type bnodes: dict
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(TripleTable.build(_relabel(triples, bnodes or {})))
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used results until the cache fits in its maximum size."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(_SUFFIX):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+        total = sum(size for (_, size, _) in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.unlink(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,420 @@
+"""
+Compact, dictionary-encoded representation of a set of triples, and RDFLib stores built on top of it.
+
+A :class:`TripleTable` is a single binary buffer holding a sorted term dictionary and the triples as integer ids,
+sorted in three orders (SPO, POS and OSP). Because everything is stored in one flat buffer, a table can be placed in
+shared memory (see :class:`SharedTripleTable`) and used by several processes without copying it; the terms are only
+decoded when they are actually read. Layout of the buffer (all integers are little-endian):
+
+- header: magic :code:`b"OWLRLTT1"`, then the number of terms, the number of triples and the length of the term blob
+  (unsigned 64 bit integers);
+- term offsets: :code:`n_terms + 1` unsigned 64 bit integers into the term blob;
+- term blob: the UTF-8 encoded terms (see :func:`encode_term`), sorted, padded to a multiple of 8 bytes;
+- the SPO, POS and OSP indexes: :code:`3 * n_triples` unsigned 32 bit integers each.
+
+:class:`EncodedStore` is a read-only RDFLib store on a table, and :class:`OverlayStore` makes any read-only store
+writable by keeping the changes in a separate in-memory store. A typical use is to share a closed ontology among
+worker processes, each of them expanding its own data on top of it::
+
+    table = SharedTripleTable.create(closed_ontology)     # in the parent process
+    ...
+    base = EncodedStore(SharedTripleTable.attach(table.name).table)  # in a worker
+    graph = Graph(store=OverlayStore(base))
+"""
+
+import struct
+from array import array
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Iterable, Iterator, Optional, Tuple
+
+from rdflib import BNode, Literal, URIRef
+from rdflib.graph import ModificationException
+from rdflib.plugins.stores.memory import SimpleMemory
+from rdflib.store import Store
+from rdflib.term import Node
+
+_MAGIC = b"OWLRLTT1"
+_HEADER = struct.Struct("<8sQQQ")
+
+# Order of the (s, p, o) positions in the three indexes
+_SPO = (0, 1, 2)
+_POS = (1, 2, 0)
+_OSP = (2, 0, 1)
+
+
+def encode_term(term: Node) -> str:
+    """
+    Encode an RDF term as a string: a one character tag followed by the value. The lexical form of a literal comes
+    last, after a NUL separator, so that it can contain any character.
+
+    :param term: A URIRef, BNode or Literal.
+    :return: The encoded term.
+    :rtype: str
+    """
+    if isinstance(term, Literal):
+        if term.language is not None:
+            return "G%s\x00%s" % (term.language, term)
+        elif term.datatype is not None:
+            return "D%s\x00%s" % (term.datatype, term)
+        else:
+            return "P" + str(term)
+    elif isinstance(term, BNode):
+        return "B" + str(term)
+    elif isinstance(term, URIRef):
+        return "I" + str(term)
+    else:
+        raise ValueError("Term %r cannot be encoded" % (term,))
+
+
+def decode_term(value: str) -> Node:
+    """
+    Decode a term encoded by :func:`encode_term`.
+
+    :param value: The encoded term.
+    :return: The RDFLib term.
+    """
+    tag = value[0]
+    if tag == "I":
+        return URIRef(value[1:])
+    elif tag == "B":
+        return BNode(value[1:])
+    elif tag == "P":
+        return Literal(value[1:])
+    elif tag == "D":
+        datatype, lexical = value[1:].split("\x00", 1)
+        return Literal(lexical, datatype=URIRef(datatype))
+    elif tag == "G":
+        language, lexical = value[1:].split("\x00", 1)
+        return Literal(lexical, lang=language)
+    else:
+        raise ValueError("Invalid encoded term %r" % value)
+
+
+def _bounds(index, n, first, second=None):
+    """
+    Binary search in a (flat) index of n triples for the range whose first element is :code:`first` and, if
+    given, the second element is :code:`second`. Returns the (start, end) triple positions.
+    """
+    lo, hi = 0, n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        k = index[3 * mid]
+        if k < first or (k == first and second is not None and index[3 * mid + 1] < second):
+            lo = mid + 1
+        else:
+            hi = mid
+    start = lo
+    hi = n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        k = index[3 * mid]
+        if k < first or (k == first and (second is None or index[3 * mid + 1] <= second)):
+            lo = mid + 1
+        else:
+            hi = mid
+    return start, lo
+
+
+class TripleTable:
+    """
+    Read access to a triple table held in a buffer (bytes, mmap, shared memory, ...). Nothing is copied from the
+    buffer; decoded terms and term lookups are kept in bounded caches.
+
+    :param buffer: An object supporting the buffer protocol, in the format produced by :meth:`TripleTable.build`.
+
+    :param cache_size: Size of the term decoding and lookup caches.
+    :type cache_size: int
+    """
+
+    def __init__(self, buffer, cache_size: int = 1 << 16):
+        view = memoryview(buffer)
+        magic, n_terms, n_triples, blob_length = _HEADER.unpack_from(view, 0)
+        if magic != _MAGIC:
+            raise ValueError("Not an encoded triple table")
+        self.n_terms = n_terms
+        self.n_triples = n_triples
+
+        position = _HEADER.size
+        self._offsets = view[position : position + 8 * (n_terms + 1)].cast("Q")
+        position += 8 * (n_terms + 1)
+        self._blob = view[position : position + blob_length]
+        position += blob_length + (-blob_length % 8)
+        size = 12 * n_triples
+        self._spo = view[position : position + size].cast("I")
+        self._pos = view[position + size : position + 2 * size].cast("I")
+        self._osp = view[position + 2 * size : position + 3 * size].cast("I")
+        self._view = view
+
+        self.term = lru_cache(maxsize=cache_size)(self._decode)
+        self.term_id = lru_cache(maxsize=cache_size)(self._lookup)
+
+    @staticmethod
+    def build(triples: Iterable[Tuple[Node, Node, Node]]) -> bytes:
+        """
+        Encode a set of triples into the binary table format.
+
+        :param triples: The triples (e.g., a :class:`rdflib.Graph`). Duplicates are removed.
+        :return: The encoded table.
+        :rtype: bytes
+        """
+        encoded = set()
+        for t in triples:
+            encoded.add(tuple(encode_term(r).encode("utf-8") for r in t))
+        terms = sorted({r for t in encoded for r in t})
+        ids = {r: i for i, r in enumerate(terms)}
+        rows = [(ids[s], ids[p], ids[o]) for (s, p, o) in encoded]
+
+        offsets = array("Q", [0])
+        for r in terms:
+            offsets.append(offsets[-1] + len(r))
+        blob = b"".join(terms)
+
+        parts = [_HEADER.pack(_MAGIC, len(terms), len(rows), len(blob)), offsets.tobytes(), blob]
+        parts.append(b"\x00" * (-len(blob) % 8))
+        for order in (_SPO, _POS, _OSP):
+            index = array("I")
+            for row in sorted(tuple(row[i] for i in order) for row in rows):
+                index.extend(row)
+            parts.append(index.tobytes())
+        return b"".join(parts)
+
+    def _raw(self, i: int) -> bytes:
+        return bytes(self._blob[self._offsets[i] : self._offsets[i + 1]])
+
+    def _decode(self, i: int) -> Node:
+        return decode_term(self._raw(i).decode("utf-8"))
+
+    def _lookup(self, term: Node) -> Optional[int]:
+        try:
+            key = encode_term(term).encode("utf-8")
+        except ValueError:
+            return None
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._raw(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_terms and self._raw(lo) == key:
+            return lo
+        return None
+
+    def match_ids(
+        self, s: Optional[int], p: Optional[int], o: Optional[int]
+    ) -> Iterator[Tuple[int, int, int]]:
+        """
+        Iterate over the (s, p, o) id triples matching a pattern of ids, None being a wildcard.
+        """
+        n = self.n_triples
+        if s is not None:
+            index = self._spo
+            start, end = _bounds(index, n, s, p)
+            for i in range(3 * start, 3 * end, 3):
+                if o is None or index[i + 2] == o:
+                    yield index[i], index[i + 1], index[i + 2]
+        elif p is not None:
+            index = self._pos
+            start, end = _bounds(index, n, p, o)
+            for i in range(3 * start, 3 * end, 3):
+                yield index[i + 2], index[i], index[i + 1]
+        elif o is not None:
+            index = self._osp
+            start, end = _bounds(index, n, o)
+            for i in range(3 * start, 3 * end, 3):
+                yield index[i + 1], index[i + 2], index[i]
+        else:
+            index = self._spo
+            for i in range(0, 3 * n, 3):
+                yield index[i], index[i + 1], index[i + 2]
+
+    def triples(self, pattern) -> Iterator[Tuple[Node, Node, Node]]:
+        """
+        Iterate over the triples matching an (s, p, o) pattern, None being a wildcard.
+        """
+        ids = []
+        for r in pattern:
+            if r is None:
+                ids.append(None)
+            else:
+                i = self.term_id(r)
+                if i is None:
+                    # A term that is not in the dictionary cannot match anything
+                    return
+                ids.append(i)
+        term = self.term
+        for s, p, o in self.match_ids(*ids):
+            yield term(s), term(p), term(o)
+
+    def __len__(self) -> int:
+        return self.n_triples
+
+    def __contains__(self, triple) -> bool:
+        return next(self.triples(triple), None) is not None
+
+    def release(self):
+        """
+        Release the views on the underlying buffer (needed, e.g., before closing a shared memory block).
+        """
+        self.term.cache_clear()
+        self.term_id.cache_clear()
+        for view in (self._spo, self._pos, self._osp, self._offsets, self._blob, self._view):
+            view.release()
+
+
+class SharedTripleTable:
+    """
+    A :class:`TripleTable` placed in a :class:`multiprocessing.shared_memory.SharedMemory` block. The process
+    creating the block owns it and must eventually :meth:`unlink` it; other processes :meth:`attach` to it by name.
+
+    :param shm: The shared memory block.
+    :param owner: Whether this process created (and should unlink) the block.
+
+    :ivar table: The :class:`TripleTable` on the shared memory.
+    :ivar name: The name of the shared memory block.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+        self.table = TripleTable(shm.buf)
+
+    @classmethod
+    def create(cls, triples: Iterable[Tuple[Node, Node, Node]]) -> "SharedTripleTable":
+        """
+        Encode the triples into a new shared memory block.
+        """
+        data = TripleTable.build(triples)
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        shm.buf[: len(data)] = data
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedTripleTable":
+        """
+        Attach to an existing shared memory block. Processes started by :mod:`multiprocessing` share the resource
+        tracker of their parent, so the block is not removed when an attached process ends.
+        """
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 has no 'track' argument
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, owner=False)
+
+    def close(self):
+        """
+        Detach from the shared memory block (and remove it, if this process created it).
+        """
+        self.table.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class EncodedStore(Store):
+    """
+    Read-only RDFLib store on a :class:`TripleTable`. It is not context aware: all triples belong to the graph
+    using the store.
+
+    :param table: The triple table.
+    :type table: :class:`TripleTable`
+    """
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(self, table: TripleTable, identifier=None):
+        super().__init__(identifier=identifier)
+        self.table = table
+
+    def add(self, triple, context, quoted=False):
+        raise ModificationException()
+
+    def remove(self, triple_pattern, context=None):
+        raise ModificationException()
+
+    def triples(self, triple_pattern, context=None):
+        for t in self.table.triples(triple_pattern):
+            yield t, iter(())
+
+    def __len__(self, context=None) -> int:
+        return len(self.table)
+
+    def contexts(self, triple=None):
+        return iter(())
+
+
+class OverlayStore(Store):
+    """
+    Writable RDFLib store on top of a read-only one. Added triples that are not in the base store are kept in an
+    in-memory overlay; removed base triples are hidden. The base store is never modified, so the same base can be
+    shared by many overlays.
+
+    :param base: The read-only store.
+    :type base: :class:`rdflib.store.Store`
+    """
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(self, base: Store, identifier=None):
+        super().__init__(identifier=identifier)
+        self.base = base
+        self.overlay = SimpleMemory()
+        self.hidden = set()
+
+    def _in_base(self, triple) -> bool:
+        return next(self.base.triples(triple), None) is not None
+
+    def add(self, triple, context, quoted=False):
+        if triple in self.hidden:
+            self.hidden.discard(triple)
+        elif not self._in_base(triple):
+            self.overlay.add(triple, context, quoted)
+
+    def remove(self, triple_pattern, context=None):
+        for triple, _ in list(self.triples(triple_pattern)):
+            if self._in_base(triple):
+                self.hidden.add(triple)
+            else:
+                self.overlay.remove(triple)
+
+    def triples(self, triple_pattern, context=None):
+        hidden = self.hidden
+        for triple, _ in self.base.triples(triple_pattern):
+            if not hidden or triple not in hidden:
+                yield triple, iter(())
+        for triple, _ in self.overlay.triples(triple_pattern):
+            yield triple, iter(())
+
+    def overlay_triples(self) -> Iterator[Tuple[Node, Node, Node]]:
+        """
+        The triples added on top of the base store.
+        """
+        for triple, _ in self.overlay.triples((None, None, None)):
+            yield triple
+
+    def __len__(self, context=None) -> int:
+        return len(self.base) - len(self.hidden) + len(self.overlay)
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def bind(self, prefix, namespace, override=True):
+        self.overlay.bind(prefix, namespace, override=override)
+
+    def prefix(self, namespace):
+        return self.overlay.prefix(namespace)
+
+    def namespace(self, prefix):
+        return self.overlay.namespace(prefix)
+
+    def namespaces(self):
+        return self.overlay.namespaces()
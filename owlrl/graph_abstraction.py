@@ -19,6 +19,8 @@ except ImportError:
     ox_NamedNode = None
 
 from collections.abc import Generator
+from functools import lru_cache
+from itertools import islice
 from rdflib import Graph as rdf_Graph, Dataset as rdf_Dataset
 from rdflib.term import (
     IdentifiedNode as rdf_IdentifiedNode,
@@ -27,11 +29,117 @@ from rdflib.term import (
     URIRef as rdf_URIRef,
 )
 from rdflib.namespace import RDF
-from typing import Union, Any, Tuple
-import warnings
+from rdflib.plugins.stores.memory import Memory as rdf_Memory, SimpleMemory as rdf_SimpleMemory
+from typing import Union, Any, Iterable, Tuple
+
+from .memory_store import ReasonerMemory
 
 ALLOWED_GRAPH_TYPES = Union[rdf_Graph, rdf_Dataset, ox_Store]
 
+# The same (vocabulary) terms are converted over and over between RDFLib and Oxigraph: the conversions go through
+# caches of the most recently used terms, so that each of them is only built once
+TERM_CACHE_SIZE = 1 << 16
+
+# Number of quads read from Oxigraph and converted at once
+BATCH_SIZE = 1024
+
+
+def _convert_to_ox(term: Union[rdf_IdentifiedNode, rdf_Literal]) -> Union[ox_NamedNode, ox_BlankNode, ox_Literal]:
+    if isinstance(term, rdf_BNode):
+        return ox_BlankNode(str(term))
+    elif isinstance(term, rdf_Literal):
+        if term.language is not None:
+            return ox_Literal(str(term), language=term.language)
+        data_type = term.datatype
+        if data_type is not None:
+            data_type = _ox_term(data_type)
+        return ox_Literal(str(term), datatype=data_type)
+    else:
+        return ox_NamedNode(str(term))
+
+
+def _convert_to_rdf(term: Union[ox_NamedNode, ox_BlankNode, ox_Literal]) -> Union[rdf_IdentifiedNode, rdf_Literal]:
+    if isinstance(term, ox_NamedNode):
+        return rdf_URIRef(term.value)
+    elif isinstance(term, ox_BlankNode):
+        return rdf_BNode(term.value)
+    elif isinstance(term, ox_Literal):
+        if term.language is not None:
+            return rdf_Literal(term.value, lang=term.language)
+        data_type = term.datatype
+        if data_type is not None:
+            data_type = _rdf_term(data_type)
+        return rdf_Literal(term.value, datatype=data_type)
+    else:
+        return rdf_URIRef(term.value)
+
+
+_ox_term = lru_cache(maxsize=TERM_CACHE_SIZE)(_convert_to_ox)
+_rdf_term = lru_cache(maxsize=TERM_CACHE_SIZE)(_convert_to_rdf)
+
+
+def _generalized(triple) -> bool:
+    # Oxigraph cannot hold a literal subject, or a blank node or literal predicate
+    return isinstance(triple[0], rdf_Literal) or isinstance(triple[1], (rdf_BNode, rdf_Literal))
+
+
+class GeneralizedTriples:
+    """
+    In-memory side table of the generalized triples (literal subjects, blank node or literal predicates) that an
+    Oxigraph store cannot hold. The triples are indexed by subject, predicate and object, and kept with the name of
+    the (Oxigraph) graph they have been added to.
+    """
+
+    def __init__(self):
+        self._quads = set()
+        self._by_s = {}
+        self._by_p = {}
+        self._by_o = {}
+
+    def __len__(self) -> int:
+        return len(self._quads)
+
+    def add(self, triple: tuple, graph_name):
+        quad = (triple[0], triple[1], triple[2], graph_name)
+        if quad not in self._quads:
+            self._quads.add(quad)
+            for index, term in ((self._by_s, triple[0]), (self._by_p, triple[1]), (self._by_o, triple[2])):
+                index.setdefault(term, set()).add(quad)
+
+    def remove(self, triple: tuple, graph_name):
+        """Remove a triple from a graph, or, if :code:`graph_name` is None, from all the graphs."""
+        for quad in list(self.quads(triple, graph_name)):
+            self._quads.discard(quad)
+            for index, term in ((self._by_s, quad[0]), (self._by_p, quad[1]), (self._by_o, quad[2])):
+                matches = index[term]
+                matches.discard(quad)
+                if not matches:
+                    del index[term]
+
+    def quads(self, pattern: tuple, graph_name) -> Generator[tuple, None, None]:
+        """The quads matching a triple pattern in a graph, or, if :code:`graph_name` is None, in any graph."""
+        s, p, o = pattern
+        candidates = self._quads
+        for index, term in ((self._by_s, s), (self._by_p, p), (self._by_o, o)):
+            if term is not None:
+                matches = index.get(term)
+                if not matches:
+                    return
+                if len(matches) < len(candidates):
+                    candidates = matches
+        for quad in list(candidates):
+            if (
+                (s is None or quad[0] == s)
+                and (p is None or quad[1] == p)
+                and (o is None or quad[2] == o)
+                and (graph_name is None or quad[3] == graph_name)
+            ):
+                yield quad
+
+    def triples(self, pattern: tuple, graph_name) -> Generator[tuple, None, None]:
+        for quad in self.quads(pattern, graph_name):
+            yield quad[:3]
+
 
 class DataGraph:
 
@@ -42,16 +150,24 @@ class DataGraph:
         cls,
         store: ALLOWED_GRAPH_TYPES,
         locked_context: Union[rdf_Graph, str, None] = None,
+        generalized: Union[GeneralizedTriples, None] = None,
     ):
         self = super().__new__(cls)
         self.is_oxigraph = has_oxigraph and isinstance(store, ox_Store)
         self.impl = store
+        # the generalized triples an Oxigraph store cannot hold; shared with the contexts of the graph
+        if self.is_oxigraph:
+            self.generalized = generalized if generalized is not None else GeneralizedTriples()
+        else:
+            self.generalized = None
 
         self._default_union = False
         if self.is_oxigraph:
             self.triples = self.triples_in_oxigraph
             self.add = self.add_to_oxigraph
             self.remove = self.remove_from_oxigraph
+            self.add_many = self.add_many_to_oxigraph
+            self.remove_many = self.remove_many_from_oxigraph
             self.subject_objects = self.subject_objects_in_oxigraph
             self.subjects = self.subjects_in_oxigraph
             self.objects = self.objects_in_oxigraph
@@ -67,6 +183,8 @@ class DataGraph:
             self.triples = self.triples_in_rdflib
             self.add = self.add_to_rdflib
             self.remove = self.remove_from_rdflib
+            self.add_many = self.add_many_to_rdflib
+            self.remove_many = self.remove_many_from_rdflib
             self.subject_objects = self.subject_objects_in_rdflib
             self.subjects = self.subjects_in_rdflib
             self.objects = self.objects_in_rdflib
@@ -90,41 +208,15 @@ class DataGraph:
         ],
     ):
         in_s, in_p, in_o = triple
-
-        if in_s is None:
-            out_s = None
-        elif isinstance(in_s, rdf_BNode):
-            out_s = ox_BlankNode(str(in_s))
-        elif isinstance(in_s, rdf_Literal):
-            if in_s.language is not None:
-                out_s = ox_Literal(str(in_s), language=in_s.language)
-            else:
-                data_type = in_s.datatype
-                if data_type is not None:
-                    data_type = ox_NamedNode(str(data_type))
-                out_s = ox_Literal(str(in_s), datatype=data_type)
-        else:
-            out_s = ox_NamedNode(str(in_s))
+        to_ox = _ox_term
+        out_s = None if in_s is None else to_ox(in_s)
         if in_p is None:
             out_p = None
-        elif isinstance(in_p, rdf_BNode):
-            out_p = ox_BlankNode(str(in_p))
-        else:
+        elif isinstance(in_p, rdf_Literal):
             out_p = ox_NamedNode(str(in_p))
-        if in_o is None:
-            out_o = None
-        elif isinstance(in_o, rdf_BNode):
-            out_o = ox_BlankNode(str(in_o))
-        elif isinstance(in_o, rdf_Literal):
-            if in_o.language is not None:
-                out_o = ox_Literal(str(in_o), language=in_o.language)
-            else:
-                data_type = in_o.datatype
-                if data_type is not None:
-                    data_type = ox_NamedNode(str(data_type))
-                out_o = ox_Literal(str(in_o), datatype=data_type)
         else:
-            out_o = ox_NamedNode(str(in_o))
+            out_p = to_ox(in_p)
+        out_o = None if in_o is None else to_ox(in_o)
         return out_s, out_p, out_o
 
     @classmethod
@@ -133,18 +225,7 @@ class DataGraph:
     ) -> Union[ox_NamedNode, ox_BlankNode, ox_Literal, None]:
         if term is None:
             return None
-        elif isinstance(term, rdf_BNode):
-            return ox_BlankNode(str(term))
-        elif isinstance(term, rdf_Literal):
-            if term.language is not None:
-                return ox_Literal(str(term), language=term.language)
-            else:
-                data_type = term.datatype
-                if data_type is not None:
-                    data_type = ox_NamedNode(str(data_type))
-                return ox_Literal(str(term), datatype=data_type)
-        else:
-            return ox_NamedNode(str(term))
+        return _ox_term(term)
 
     @classmethod
     def to_rdf(
@@ -152,65 +233,39 @@ class DataGraph:
     ) -> Union[rdf_IdentifiedNode, rdf_Literal, None]:
         if term is None:
             return None
-        elif isinstance(term, ox_BlankNode):
-            return rdf_BNode(term.value)
-        elif isinstance(term, ox_Literal):
-            if term.language is not None:
-                return rdf_Literal(term.value, lang=term.language)
-            data_type = term.datatype
-            if data_type is not None:
-                data_type = rdf_URIRef(data_type.value)
-            return rdf_Literal(term.value, datatype=data_type)
-        else:
-            return rdf_URIRef(term.value)
+        return _rdf_term(term)
 
     @classmethod
     def convert_quad_to_rdflib(cls, quad: ox_Quad):
         s, p, o, g = quad
-        if s is None:
-            out_s = None
-        elif isinstance(s, ox_BlankNode):
-            out_s = rdf_BNode(s.value)
-        elif isinstance(s, ox_Literal):
-            # Technically a subject can never be a Literal
-            # in Oxigraph, but this is here for completeness
-            if s.language is not None:
-                out_s = rdf_Literal(s.value, lang=s.language)
-            else:
-                data_type = s.datatype
-                if data_type is not None:
-                    data_type = rdf_URIRef(data_type.value)
-                out_s = rdf_Literal(s.value, datatype=data_type)
-        else:
-            out_s = rdf_URIRef(s.value)
-        if p is None:
-            out_p = None
-        elif isinstance(p, ox_BlankNode):
-            out_p = rdf_BNode(p.value)
-        else:
-            out_p = rdf_URIRef(p.value)
-        if o is None:
-            out_o = None
-        elif isinstance(o, ox_Literal):
-            if o.language is not None:
-                out_o = rdf_Literal(o.value, lang=o.language)
-            else:
-                data_type = o.datatype
-                if data_type is not None:
-                    data_type = rdf_URIRef(data_type.value)
-                out_o = rdf_Literal(o.value, datatype=data_type)
-        elif isinstance(o, ox_BlankNode):
-            out_o = rdf_BNode(o.value)
-        else:
-            out_o = rdf_URIRef(o.value)
-        if g is None:
-            out_g = None
-        elif isinstance(g, ox_DefaultGraph):
+        to_rdf = _rdf_term
+        out_s = None if s is None else to_rdf(s)
+        out_p = None if p is None else to_rdf(p)
+        out_o = None if o is None else to_rdf(o)
+        if g is None or isinstance(g, ox_DefaultGraph):
             out_g = None
         else:
-            out_g = rdf_URIRef(g.value)
+            out_g = to_rdf(g)
         return out_s, out_p, out_o, out_g
 
+    @staticmethod
+    def set_term_cache_size(maxsize: int):
+        """
+        Change the size of the caches of converted terms (in both directions), and empty them.
+
+        :param maxsize: The maximal number of terms kept in each cache; 0 disables the caches.
+        :type maxsize: int
+        """
+        global _ox_term, _rdf_term
+        _ox_term = lru_cache(maxsize=maxsize)(_convert_to_ox)
+        _rdf_term = lru_cache(maxsize=maxsize)(_convert_to_rdf)
+
+    @staticmethod
+    def clear_term_cache():
+        """Empty the caches of converted terms."""
+        _ox_term.cache_clear()
+        _rdf_term.cache_clear()
+
     @property
     def default_union(self) -> bool:
         return self._default_union
@@ -238,19 +293,9 @@ class DataGraph:
             Union[rdf_Literal, rdf_IdentifiedNode],
         ],
     ):
-        if isinstance(triple[1], rdf_BNode) or isinstance(triple[1], rdf_Literal):
-            # Oxigraph does not support BNode or Literal in the predicate position
-            # Cannot add the triple
-            warnings.warn(
-                "OWL-RL inferencer tried to add a triple with a BNode or Literal in the predicate position",
-            )
-            return
-        if isinstance(triple[0], rdf_Literal):
-            # Oxigraph does not support Literal in the subject position
-            # Cannot add the triple
-            warnings.warn(
-                "OWL-RL inferencer tried to add a triple with a Literal in the subject position",
-            )
+        if _generalized(triple):
+            # Oxigraph does not support it; it is kept in the side table
+            self.generalized.add(triple, self._storage_graph_name())
             return
         ox_s, ox_p, ox_o = self.convert_triple_to_oxigraph(triple)
         if self.locked_context is not None:
@@ -259,6 +304,23 @@ class DataGraph:
             ox_g = None
         return self.impl.add(ox_Quad(ox_s, ox_p, ox_o, ox_g))
 
+    def add_many_to_oxigraph(self, triples: Iterable[tuple]):
+        """
+        Add a set of triples in a single Oxigraph transaction: either all of them are added, or none. The generalized
+        triples go to the side table.
+
+        :param triples: The (RDFLib) triples.
+        """
+        ox_g = self._storage_graph_name()
+        convert = self.convert_triple_to_oxigraph
+        quads = []
+        for t in triples:
+            if _generalized(t):
+                self.generalized.add(t, ox_g)
+            else:
+                quads.append(ox_Quad(*convert(t), ox_g))
+        self.impl.extend(quads)
+
     def remove_from_oxigraph(
         self,
         triple: Tuple[
@@ -267,33 +329,62 @@ class DataGraph:
             Union[rdf_Literal, rdf_IdentifiedNode],
         ],
     ):
-        ox_triples = self.convert_triple_to_oxigraph(triple)
-        if isinstance(ox_triples[1], ox_BlankNode) or isinstance(
-            ox_triples[1], ox_Literal
-        ):
-            return
-        if isinstance(ox_triples[0], ox_Literal):
+        if _generalized(triple):
+            self.generalized.remove(triple, self._graph_name())
             return
+        ox_triples = self.convert_triple_to_oxigraph(triple)
+        to_remove = list(
+            self.impl.quads_for_pattern(ox_triples[0], ox_triples[1], ox_triples[2], self._graph_name())
+        )
+        for q in to_remove:
+            self.impl.remove(q)
+
+    def _storage_graph_name(self) -> Union[ox_NamedNode, ox_DefaultGraph]:
+        # the graph the new triples are added to
+        return self.locked_context if self.locked_context is not None else ox_DefaultGraph()
+
+    def _graph_name(self) -> Union[ox_NamedNode, ox_DefaultGraph, None]:
+        # the graph name of the quad patterns: the locked context, all the graphs, or the default graph
         if self.locked_context is not None:
-            to_remove = list(
-                self.impl.quads_for_pattern(
-                    ox_triples[0], ox_triples[1], ox_triples[2], self.locked_context
-                )
-            )
+            return self.locked_context
         elif self._default_union:
-            to_remove = list(
-                self.impl.quads_for_pattern(
-                    ox_triples[0], ox_triples[1], ox_triples[2], None
-                )
-            )
+            return None
         else:
-            to_remove = list(
-                self.impl.quads_for_pattern(
-                    ox_triples[0], ox_triples[1], ox_triples[2], ox_DefaultGraph()
-                )
-            )
-        for q in to_remove:
-            self.impl.remove(q)
+            return ox_DefaultGraph()
+
+    def remove_many_from_oxigraph(self, triples: Iterable[tuple]):
+        """
+        Remove a set of triples. The quads without blank nodes are removed in a single Oxigraph transaction (a SPARQL
+        :code:`DELETE DATA` update); the others cannot be written in SPARQL, and are removed one by one.
+
+        :param triples: The (RDFLib) triples.
+        """
+        graph_name = self._graph_name()
+        quads = []
+        for triple in triples:
+            if _generalized(triple):
+                self.generalized.remove(triple, graph_name)
+                continue
+            quads.extend(self.impl.quads_for_pattern(*self.convert_triple_to_oxigraph(triple), graph_name))
+        data = []
+        for q in quads:
+            if isinstance(q.subject, ox_BlankNode) or isinstance(q.object, ox_BlankNode):
+                self.impl.remove(q)
+            elif isinstance(q.graph_name, ox_DefaultGraph):
+                data.append("%s %s %s ." % (q.subject, q.predicate, q.object))
+            else:
+                data.append("GRAPH %s { %s %s %s }" % (q.graph_name, q.subject, q.predicate, q.object))
+        if data:
+            self.impl.update("DELETE DATA { %s }" % " ".join(data))
+
+    def _batches(self, s, p, o) -> Generator[list, None, None]:
+        """The quads matching an (Oxigraph) pattern, in lists of :data:`BATCH_SIZE` quads converted at once."""
+        quads = self.impl.quads_for_pattern(s, p, o, self._graph_name())
+        while True:
+            batch = list(islice(quads, BATCH_SIZE))
+            if not batch:
+                return
+            yield batch
 
     def triples_in_oxigraph(
         self,
@@ -311,33 +402,12 @@ class DataGraph:
         None,
         None,
     ]:
-        ox_triples = self.convert_triple_to_oxigraph(triple)
-        if isinstance(ox_triples[1], ox_BlankNode) or isinstance(
-            ox_triples[1], ox_Literal
-        ):
-            # Oxigraph does not support BNode or Literal in the predicate position
-            # Cannot yield any results
-            return
-        if isinstance(ox_triples[0], ox_Literal):
-            # Oxigraph does not support Literal in the subject position
-            # Cannot yield any results
-            return
-        if self.locked_context is not None:
-            for q in self.impl.quads_for_pattern(
-                ox_triples[0], ox_triples[1], ox_triples[2], self.locked_context
-            ):
-                yield self.convert_quad_to_rdflib(q)[:3]
-        elif self._default_union:
-            for q in self.impl.quads_for_pattern(
-                ox_triples[0], ox_triples[1], ox_triples[2], None
-            ):
-                yield self.convert_quad_to_rdflib(q)[:3]
-        else:
-            default_graph = ox_DefaultGraph()
-            for q in self.impl.quads_for_pattern(
-                ox_triples[0], ox_triples[1], ox_triples[2], default_graph
-            ):
-                yield self.convert_quad_to_rdflib(q)[:3]
+        if not _generalized(triple):
+            to_rdf = _rdf_term
+            for batch in self._batches(*self.convert_triple_to_oxigraph(triple)):
+                yield from [(to_rdf(q.subject), to_rdf(q.predicate), to_rdf(q.object)) for q in batch]
+        if self.generalized:
+            yield from self.generalized.triples(triple, self._graph_name())
 
     def subject_objects_in_oxigraph(
         self, predicate: Union[rdf_IdentifiedNode, None]
@@ -349,22 +419,12 @@ class DataGraph:
         None,
         None,
     ]:
-        if isinstance(predicate, rdf_BNode) or isinstance(predicate, rdf_Literal):
-            # Oxigraph does not support BNode or Literal in the predicate position
-            # Cannot yield any results
-            return
-        _p = self.to_ox(predicate)
-        if self.locked_context is not None:
-            for q in self.impl.quads_for_pattern(None, _p, None, self.locked_context):
-                s, _, o, _ = self.convert_quad_to_rdflib(q)
-                yield s, o
-        elif self._default_union:
-            for q in self.impl.quads_for_pattern(None, _p, None, None):
-                s, _, o, _ = self.convert_quad_to_rdflib(q)
-                yield s, o
-        else:
-            for q in self.impl.quads_for_pattern(None, _p, None, ox_DefaultGraph()):
-                s, _, o, _ = self.convert_quad_to_rdflib(q)
+        if not isinstance(predicate, (rdf_BNode, rdf_Literal)):
+            to_rdf = _rdf_term
+            for batch in self._batches(None, self.to_ox(predicate), None):
+                yield from [(to_rdf(q.subject), to_rdf(q.object)) for q in batch]
+        if self.generalized:
+            for s, _, o in self.generalized.triples((None, predicate, None), self._graph_name()):
                 yield s, o
 
     def subject_predicates_in_oxigraph(
@@ -372,18 +432,11 @@ class DataGraph:
     ) -> Generator[
         Tuple[Union[rdf_IdentifiedNode, rdf_Literal], rdf_IdentifiedNode], None, None
     ]:
-        _o = self.to_ox(object_)
-        if self.locked_context is not None:
-            for q in self.impl.quads_for_pattern(None, None, _o, self.locked_context):
-                s, p, _, _ = self.convert_quad_to_rdflib(q)
-                yield s, p
-        elif self._default_union:
-            for q in self.impl.quads_for_pattern(None, None, _o, None):
-                s, p, _, _ = self.convert_quad_to_rdflib(q)
-                yield s, p
-        else:
-            for q in self.impl.quads_for_pattern(None, None, _o, ox_DefaultGraph()):
-                s, p, _, _ = self.convert_quad_to_rdflib(q)
+        to_rdf = _rdf_term
+        for batch in self._batches(None, None, self.to_ox(object_)):
+            yield from [(to_rdf(q.subject), to_rdf(q.predicate)) for q in batch]
+        if self.generalized:
+            for s, p, _ in self.generalized.triples((None, None, object_), self._graph_name()):
                 yield s, p
 
     def predicate_objects_in_oxigraph(
@@ -391,18 +444,12 @@ class DataGraph:
     ) -> Generator[
         Tuple[rdf_IdentifiedNode, Union[rdf_IdentifiedNode, rdf_Literal]], None, None
     ]:
-        _s = self.to_ox(subject)
-        if self.locked_context is not None:
-            for q in self.impl.quads_for_pattern(_s, None, None, self.locked_context):
-                _, p, o, _ = self.convert_quad_to_rdflib(q)
-                yield p, o
-        elif self._default_union:
-            for q in self.impl.quads_for_pattern(_s, None, None, None):
-                _, p, o, _ = self.convert_quad_to_rdflib(q)
-                yield p, o
-        else:
-            for q in self.impl.quads_for_pattern(_s, None, None, ox_DefaultGraph()):
-                _, p, o, _ = self.convert_quad_to_rdflib(q)
+        if not isinstance(subject, rdf_Literal):
+            to_rdf = _rdf_term
+            for batch in self._batches(self.to_ox(subject), None, None):
+                yield from [(to_rdf(q.predicate), to_rdf(q.object)) for q in batch]
+        if self.generalized:
+            for _, p, o in self.generalized.triples((subject, None, None), self._graph_name()):
                 yield p, o
 
     def subjects_in_oxigraph(
@@ -410,42 +457,26 @@ class DataGraph:
         predicate: rdf_IdentifiedNode,
         object_: Union[rdf_IdentifiedNode, rdf_Literal, None],
     ) -> Generator[Union[rdf_IdentifiedNode, rdf_Literal], None, None]:
-        _p = self.to_ox(predicate)
-        _o = self.to_ox(object_)
-        if self.locked_context is not None:
-            for s, _, _, _ in self.impl.quads_for_pattern(
-                None, _p, _o, self.locked_context
-            ):
-                yield self.to_rdf(s)
-        elif self._default_union:
-            for s, _, _, _ in self.impl.quads_for_pattern(None, _p, _o, None):
-                yield self.to_rdf(s)
-        else:
-            for s, _, _, _ in self.impl.quads_for_pattern(
-                None, _p, _o, ox_DefaultGraph()
-            ):
-                yield self.to_rdf(s)
+        if not isinstance(predicate, (rdf_BNode, rdf_Literal)):
+            to_rdf = _rdf_term
+            for batch in self._batches(None, self.to_ox(predicate), self.to_ox(object_)):
+                yield from [to_rdf(q.subject) for q in batch]
+        if self.generalized:
+            for s, _, _ in self.generalized.triples((None, predicate, object_), self._graph_name()):
+                yield s
 
     def objects_in_oxigraph(
         self,
         subject: Union[rdf_IdentifiedNode, rdf_Literal],
         predicate: Union[rdf_IdentifiedNode, None],
     ) -> Generator[Union[rdf_IdentifiedNode, rdf_Literal], None, None]:
-        _s = self.to_ox(subject)
-        _p = self.to_ox(predicate)
-        if self.locked_context is not None:
-            for _, _, o, _ in self.impl.quads_for_pattern(
-                _s, _p, None, self.locked_context
-            ):
-                yield self.to_rdf(o)
-        elif self._default_union:
-            for _, _, o, _ in self.impl.quads_for_pattern(_s, _p, None, None):
-                yield self.to_rdf(o)
-        else:
-            for _, _, o, _ in self.impl.quads_for_pattern(
-                _s, _p, None, ox_DefaultGraph()
-            ):
-                yield self.to_rdf(o)
+        if not _generalized((subject, predicate, None)):
+            to_rdf = _rdf_term
+            for batch in self._batches(self.to_ox(subject), self.to_ox(predicate), None):
+                yield from [to_rdf(q.object) for q in batch]
+        if self.generalized:
+            for _, _, o in self.generalized.triples((subject, predicate, None), self._graph_name()):
+                yield o
 
     def add_to_rdflib(
         self,
@@ -475,6 +506,17 @@ class DataGraph:
         else:
             return self.impl.remove((triple[0], triple[1], triple[2]))
 
+    def add_many_to_rdflib(self, triples: Iterable[tuple]):
+        if self.locked_context is not None:
+            self.impl.addN((s, p, o, self.locked_context) for (s, p, o) in triples)
+        else:
+            for t in triples:
+                self.impl.add(t)
+
+    def remove_many_from_rdflib(self, triples: Iterable[tuple]):
+        for t in triples:
+            self.remove_from_rdflib(t)
+
     def triples_in_rdflib(
         self,
         triple: Tuple[
@@ -556,7 +598,7 @@ class DataGraph:
 
     def get_context(self, identifier: Union[rdf_URIRef, str]) -> "DataGraph":
         if self.is_oxigraph:
-            return DataGraph(self.impl, str(identifier))
+            return DataGraph(self.impl, str(identifier), self.generalized)
         else:
             return DataGraph(self.impl, self.impl.get_context(rdf_URIRef(identifier)))
 
@@ -569,13 +611,14 @@ class DataGraph:
         ],
     ) -> bool:
         if self.is_oxigraph:
+            if _generalized(triple):
+                return next(self.generalized.quads(triple, self._graph_name()), None) is not None
             triple_ = self.convert_triple_to_oxigraph(triple)
-            if self.locked_context is not None:
-                quad = ox_Quad(triple_[0], triple_[1], triple_[2], self.locked_context)
-            elif self._default_union:
-                quad = ox_Quad(triple_[0], triple_[1], triple_[2], None)
-            else:
-                quad = ox_Quad(triple_[0], triple_[1], triple_[2], ox_DefaultGraph())
+            graph_name = self._graph_name()
+            if graph_name is None:
+                # the union of the graphs: a quad without graph name would only be looked up in the default one
+                return next(self.impl.quads_for_pattern(triple_[0], triple_[1], triple_[2], None), None) is not None
+            quad = ox_Quad(triple_[0], triple_[1], triple_[2], graph_name)
             return quad in self.impl
         else:
             if self.locked_context is not None:
@@ -627,3 +670,78 @@ class DataGraph:
             pass
         else:
             self.impl.bind(prefix, namespace, **kwargs)
+
+
+def _lookup_cost(graph) -> int:
+    # rough cost of a lookup: the in-memory RDFLib stores first, then Oxigraph, then the other (persistent) stores
+    if isinstance(graph, DataGraph):
+        if graph.is_oxigraph:
+            return 1
+        graph = graph.impl
+    return 0 if isinstance(getattr(graph, "store", None), (rdf_Memory, rdf_SimpleMemory, ReasonerMemory)) else 2
+
+
+class MergedGraph:
+    """
+    Read view of the union of several graphs in different stores, e.g., the source graph of a closure in an Oxigraph
+    store on disk, and the destination of the inferred triples in an RDFLib graph in memory. The rules read all the
+    graphs through it; the membership checks look at the cheapest store first.
+
+    A triple that is in several graphs is yielded once for each of them.
+
+    :param graphs: The graphs: RDFLib graphs or :class:`DataGraph` instances.
+    """
+
+    def __init__(self, *graphs):
+        self.graphs = sorted(graphs, key=_lookup_cost)
+
+    def triples(self, triple: tuple) -> Generator[tuple, None, None]:
+        for graph in self.graphs:
+            yield from graph.triples(triple)
+
+    def subjects(self, predicate=None, object_=None) -> Generator[Any, None, None]:
+        for graph in self.graphs:
+            yield from graph.subjects(predicate, object_)
+
+    def objects(self, subject=None, predicate=None) -> Generator[Any, None, None]:
+        for graph in self.graphs:
+            yield from graph.objects(subject, predicate)
+
+    def subject_objects(self, predicate=None) -> Generator[tuple, None, None]:
+        for graph in self.graphs:
+            yield from graph.subject_objects(predicate)
+
+    def subject_predicates(self, object_=None) -> Generator[tuple, None, None]:
+        for graph in self.graphs:
+            yield from graph.subject_predicates(object_)
+
+    def predicate_objects(self, subject=None) -> Generator[tuple, None, None]:
+        for graph in self.graphs:
+            yield from graph.predicate_objects(subject)
+
+    def __contains__(self, triple: tuple) -> bool:
+        return any(triple in graph for graph in self.graphs)
+
+    def items(self, list_: rdf_IdentifiedNode) -> Generator[Any, None, None]:
+        """Generator over all items of an RDF collection, whose elements may be in any of the graphs."""
+        chain = {list_}
+        while list_ is not None:
+            item = next(self.objects(list_, RDF.first), None)
+            if item is not None:
+                yield item
+            list_ = next(self.objects(list_, RDF.rest), None)
+            if list_ in chain:
+                raise ValueError("List contains a recursive rdf:rest reference")
+            chain.add(list_)
+
+    def remove(self, triple: tuple):
+        for graph in self.graphs:
+            graph.remove(triple)
+
+    def remove_many(self, triples: Iterable[tuple]):
+        for graph in self.graphs:
+            if isinstance(graph, DataGraph):
+                graph.remove_many(triples)
+            else:
+                for t in triples:
+                    graph.remove(t)
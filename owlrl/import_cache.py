@@ -0,0 +1,273 @@
+"""
+Persistent, on-disk cache of parsed ontologies.
+
+The same vocabularies are imported (via :code:`owl:imports`) over and over again; parsing them is often a large part of
+the running time of a small closure. An :class:`ImportCache` keeps every parsed document in a directory, in the binary
+form of an :class:`.encoded_store.TripleTable`, which is loaded back without any RDF parser. The directory holds two
+kinds of files:
+
+- :code:`data/<digest>.tt`: the parsed triples; the digest is the SHA-256 hash of the raw document, of its format and,
+  except for N-Triples and N-Quads, of its location, against which the relative IRIs are resolved. An N-Triples
+  document is thus only parsed once, whatever its location;
+- :code:`meta/<digest>.json`: for every location (file name or URI), the content digest it was last seen with, together
+  with the validators used to check whether it has changed: modification time and size for a local file, the
+  :code:`ETag` and :code:`Last-Modified` headers for an HTTP resource.
+
+Local files are re-read (and hashed) only if their modification time or size have changed. HTTP resources are
+re-fetched with conditional requests (:code:`If-None-Match`, :code:`If-Modified-Since`), through a small pool of
+persistent connections (see :class:`HTTPPool`).
+"""
+
+import hashlib
+import http.client
+import io
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from rdflib import Graph
+from rdflib.term import Node
+
+from .encoded_store import TripleTable
+from .ntriples import load_ntriples
+
+# Media types of the responses, mapped to RDFLib parser names
+_MEDIA_TYPES = {
+    "text/turtle": "turtle",
+    "application/x-turtle": "turtle",
+    "text/n3": "n3",
+    "application/rdf+xml": "xml",
+    "application/n-triples": "nt",
+    "application/n-quads": "nquads",
+    "application/ld+json": "json-ld",
+    "application/json": "json-ld",
+    "text/html": "rdfa1.1",
+    "application/xhtml+xml": "rdfa1.1",
+}
+
+_ACCEPT = (
+    "text/turtle, application/rdf+xml;q=0.9, application/n-triples;q=0.9, application/ld+json;q=0.8, "
+    "text/n3;q=0.8, */*;q=0.1"
+)
+
+_REDIRECTS = (301, 302, 303, 307, 308)
+
+
+class HTTPPool:
+    """
+    Minimal pool of persistent HTTP(S) connections, one per host, used to issue (conditional) GET requests.
+
+    :param timeout: Socket timeout, in seconds.
+    :type timeout: float
+    :param max_redirects: Maximum number of redirections followed for a request.
+    :type max_redirects: int
+    """
+
+    def __init__(self, timeout: float = 60, max_redirects: int = 5):
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self._connections: Dict[Tuple[str, str], http.client.HTTPConnection] = {}
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        try:
+            return self._connections[(scheme, netloc)]
+        except KeyError:
+            if scheme == "https":
+                connection = http.client.HTTPSConnection(netloc, timeout=self.timeout)
+            else:
+                connection = http.client.HTTPConnection(netloc, timeout=self.timeout)
+            self._connections[(scheme, netloc)] = connection
+            return connection
+
+    def _request(self, url: str, headers: Dict[str, str]) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        for attempt in (0, 1):
+            connection = self._connection(parts.scheme, parts.netloc)
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, ConnectionError):
+                # the server may have closed an idle connection; retry once on a new one
+                connection.close()
+                del self._connections[(parts.scheme, parts.netloc)]
+                if attempt:
+                    raise
+                continue
+            if response.will_close:
+                connection.close()
+                del self._connections[(parts.scheme, parts.netloc)]
+            return response.status, response.headers, body
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        Issue a GET request, following the redirections.
+
+        :param url: The URL.
+        :type url: str
+        :param headers: Extra request headers.
+        :type headers: dict
+        :return: The status, headers and body of the (final) response.
+        :raises IOError: If the server answers with an error, or redirects too often.
+        """
+        headers = dict(headers or {})
+        headers.setdefault("Accept", _ACCEPT)
+        for _ in range(self.max_redirects + 1):
+            status, response_headers, body = self._request(url, headers)
+            if status in _REDIRECTS and response_headers.get("Location"):
+                url = urljoin(url, response_headers["Location"])
+                continue
+            if status >= 400:
+                raise IOError("HTTP error %d for %s" % (status, url))
+            return status, response_headers, body
+        raise IOError("Too many redirections for %s" % url)
+
+    def close(self):
+        """Close all the connections."""
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
+
+
+class ImportCache:
+    """
+    On-disk cache of parsed documents (see the module description).
+
+    An instance can be sent to worker processes: the connection pool is not pickled, every process opens its own.
+
+    :param directory: The cache directory; it is created if needed.
+    :type directory: str
+    :ivar hits: Number of documents loaded from the cache.
+    :ivar misses: Number of documents that had to be parsed.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._pool = None
+        os.makedirs(os.path.join(directory, "data"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "meta"), exist_ok=True)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        return state
+
+    @property
+    def pool(self) -> HTTPPool:
+        """The HTTP connection pool of this process."""
+        if self._pool is None:
+            self._pool = HTTPPool()
+        return self._pool
+
+    @staticmethod
+    def is_cacheable(location: str) -> bool:
+        """
+        Whether the location can be cached: a local file, or an HTTP(S) URI.
+
+        :param location: A file name or URI.
+        :type location: str
+        :rtype: bool
+        """
+        scheme = urlsplit(location).scheme.lower()
+        return scheme in ("http", "https") or (len(scheme) <= 1 and os.path.isfile(location))
+
+    def _meta_path(self, location: str) -> str:
+        digest = hashlib.sha256(location.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "meta", digest + ".json")
+
+    def _data_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "data", digest + ".tt")
+
+    def _read_meta(self, location: str) -> dict:
+        try:
+            with open(self._meta_path(location), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # a meta file without its data is useless
+        if meta.get("location") != location or not os.path.exists(self._data_path(meta.get("content", ""))):
+            return {}
+        return meta
+
+    def _write(self, path: str, data: bytes):
+        # write to a temporary file first, so that concurrent readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _load_data(self, digest: str) -> List[Tuple[Node, Node, Node]]:
+        with open(self._data_path(digest), "rb") as f:
+            table = TripleTable(f.read())
+        self.hits += 1
+        return list(table.triples((None, None, None)))
+
+    def _store(self, location: str, raw: bytes, format: str, meta: dict) -> List[Tuple[Node, Node, Node]]:
+        key = raw + b"\x00" + format.encode("utf-8")
+        if format not in ("nt", "nquads"):
+            # the relative IRIs of the document are resolved against its location
+            key += b"\x00" + location.encode("utf-8")
+        digest = hashlib.sha256(key).hexdigest()
+        meta.update(location=location, content=digest, format=format)
+        if os.path.exists(self._data_path(digest)):
+            # same content under a new location, or changed validators only
+            triples = self._load_data(digest)
+        else:
+            graph = Graph()
+            if format in ("nt", "nquads"):
+                load_ntriples(io.StringIO(raw.decode("utf-8")), graph, quads=(format == "nquads"))
+            else:
+                graph.parse(data=raw, format=format, publicID=location)
+            self.misses += 1
+            triples = list(graph)
+            self._write(self._data_path(digest), TripleTable.build(triples))
+        self._write(self._meta_path(location), json.dumps(meta).encode("utf-8"))
+        return triples
+
+    def triples(self, location: str, format: str) -> List[Tuple[Node, Node, Node]]:
+        """
+        Get the triples of a document, from the cache if it has not changed, parsing (and caching) it otherwise.
+
+        :param location: A local file name, or an HTTP(S) URI (see :meth:`is_cacheable`).
+        :type location: str
+        :param format: The RDFLib parser name used for the document. For an HTTP resource, the media type of the
+            response takes precedence, if it is a known RDF one.
+        :type format: str
+        :return: The triples.
+        :rtype: list
+        """
+        meta = self._read_meta(location)
+        scheme = urlsplit(location).scheme.lower()
+
+        if scheme in ("http", "https"):
+            headers = {}
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+            status, response_headers, body = self.pool.get(location, headers)
+            if status == 304 and meta:
+                return self._load_data(meta["content"])
+            media_type = (response_headers.get("Content-Type") or "").split(";")[0].strip().lower()
+            format = _MEDIA_TYPES.get(media_type, format)
+            validators = {"etag": response_headers.get("ETag"), "last_modified": response_headers.get("Last-Modified")}
+            return self._store(location, body, format, validators)
+
+        stat = os.stat(location)
+        if meta and meta.get("mtime") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+            if meta.get("format") == format:
+                return self._load_data(meta["content"])
+        with open(location, "rb") as f:
+            raw = f.read()
+        return self._store(location, raw, format, {"mtime": stat.st_mtime_ns, "size": stat.st_size})
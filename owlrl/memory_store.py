@@ -0,0 +1,206 @@
+"""
+In-memory RDFLib store tuned for the access patterns of the closures.
+
+The rules keep looking up the same few patterns: the instances of a class (:code:`subjects(RDF.type, C)`), the pairs
+linked by a property (:code:`subject_objects(p)`), and whether a triple is already in the graph. :class:`ReasonerMemory`
+is organised around the predicates for that:
+
+- the terms are interned: every term gets an integer id, and the indexes only hold ids, which are cheaper to hash and
+  compare than RDFLib terms (whose hashing and equality are written in Python);
+- there are two hash indexes per predicate, from the subjects to the sets of objects and from the objects to the sets of
+  subjects; the same sets are also reachable from the subjects and the objects, for the patterns without a predicate,
+  without being stored twice;
+- checking whether a triple is in the store is a single set lookup;
+- the triples can be iterated while the store is being modified: every level of an index is copied as it is reached,
+  which is much cheaper than copying the triples. All the triples that are in the store when the iteration starts, and
+  are not removed in the meantime, are returned; those added during the iteration may or may not be.
+
+The store is registered as the :code:`"owlrl-memory"` RDFLib store plugin, so that it can be used as a drop-in
+replacement of the default one::
+
+    graph = Graph(store="owlrl-memory")
+    graph.parse("ontology.ttl")
+    DeductiveClosure(OWLRL_Semantics).expand(graph)
+
+It is not context aware: all the triples belong to the graph using the store. The ids of the terms are not reused
+when the triples using a term are removed.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from rdflib import plugin
+from rdflib.plugins.stores.memory import SimpleMemory
+from rdflib.store import Store
+from rdflib.term import Node
+
+STORE_PLUGIN = "owlrl-memory"
+
+_Index = Dict[int, Dict[int, Set[int]]]
+
+
+def _insert(index: _Index, mirror: _Index, key: int, first: int, second: int) -> bool:
+    # index[key][first] and mirror[first][key] are the same set
+    try:
+        values = index[key][first]
+    except KeyError:
+        values = set()
+        index.setdefault(key, {})[first] = values
+        mirror.setdefault(first, {})[key] = values
+    if second in values:
+        return False
+    values.add(second)
+    return True
+
+
+def _delete(index: _Index, mirror: _Index, key: int, first: int, second: int):
+    values = index[key][first]
+    values.discard(second)
+    if not values:
+        del index[key][first]
+        if not index[key]:
+            del index[key]
+        del mirror[first][key]
+        if not mirror[first]:
+            del mirror[first]
+
+
+class ReasonerMemory(Store):
+    """
+    RDFLib store on interned terms and per-predicate hash indexes (see the module description).
+    """
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(self, configuration=None, identifier=None):
+        super().__init__(configuration)
+        self.identifier = identifier
+        self._ids: Dict[Node, int] = {}
+        self._terms: List[Node] = []
+        # predicate -> subject -> objects, and subject -> predicate -> (the same) objects
+        self._pso: _Index = {}
+        self._spo: _Index = {}
+        # predicate -> object -> subjects, and object -> predicate -> (the same) subjects
+        self._pos: _Index = {}
+        self._ops: _Index = {}
+        self._size = 0
+        # the namespace bindings
+        self._prefixes = SimpleMemory()
+
+    def _intern(self, term: Node) -> int:
+        try:
+            return self._ids[term]
+        except KeyError:
+            i = self._ids[term] = len(self._terms)
+            self._terms.append(term)
+            return i
+
+    def _add_ids(self, s: int, p: int, o: int):
+        if _insert(self._pso, self._spo, p, s, o):
+            _insert(self._pos, self._ops, p, o, s)
+            self._size += 1
+
+    def add(self, triple, context, quoted=False):
+        intern = self._intern
+        s, p, o = triple
+        self._add_ids(intern(s), intern(p), intern(o))
+
+    def addN(self, quads: Iterable[Tuple[Node, Node, Node, object]]):
+        intern = self._intern
+        add = self._add_ids
+        for s, p, o, _c in quads:
+            add(intern(s), intern(p), intern(o))
+
+    def remove(self, triple_pattern, context=None):
+        for s, p, o in list(self._match(triple_pattern)):
+            _delete(self._pso, self._spo, p, s, o)
+            _delete(self._pos, self._ops, p, o, s)
+            self._size -= 1
+
+    def _match(self, triple_pattern) -> Iterator[Tuple[int, int, int]]:
+        s, p, o = triple_pattern
+        ids = self._ids
+        # -1 for a term that is not in the store: it matches nothing
+        if s is not None:
+            s = ids.get(s, -1)
+        if p is not None:
+            p = ids.get(p, -1)
+        if o is not None:
+            o = ids.get(o, -1)
+        if p is not None:
+            if s is not None:
+                objects = self._pso.get(p, {}).get(s, ())
+                if o is not None:
+                    if o in objects:
+                        yield s, p, o
+                else:
+                    for oi in tuple(objects):
+                        yield s, p, oi
+            elif o is not None:
+                for si in tuple(self._pos.get(p, {}).get(o, ())):
+                    yield si, p, o
+            else:
+                by_subject = self._pso.get(p, {})
+                for si in list(by_subject):
+                    for oi in tuple(by_subject.get(si, ())):
+                        yield si, p, oi
+        elif s is not None:
+            by_predicate = self._spo.get(s, {})
+            for pi in list(by_predicate):
+                objects = by_predicate.get(pi, ())
+                if o is not None:
+                    if o in objects:
+                        yield s, pi, o
+                else:
+                    for oi in tuple(objects):
+                        yield s, pi, oi
+        elif o is not None:
+            by_predicate = self._ops.get(o, {})
+            for pi in list(by_predicate):
+                for si in tuple(by_predicate.get(pi, ())):
+                    yield si, pi, o
+        else:
+            for pi in list(self._pso):
+                by_subject = self._pso.get(pi, {})
+                for si in list(by_subject):
+                    for oi in tuple(by_subject.get(si, ())):
+                        yield si, pi, oi
+
+    def triples(self, triple_pattern, context=None):
+        s, p, o = triple_pattern
+        if s is not None and p is not None and o is not None:
+            # membership: a single set lookup
+            ids = self._ids
+            try:
+                found = ids[o] in self._pso[ids[p]][ids[s]]
+            except KeyError:
+                found = False
+            if found:
+                yield triple_pattern, iter(())
+            return
+        terms = self._terms
+        for s, p, o in self._match(triple_pattern):
+            yield (terms[s], terms[p], terms[o]), iter(())
+
+    def __len__(self, context=None) -> int:
+        return self._size
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def bind(self, prefix, namespace, override=True):
+        self._prefixes.bind(prefix, namespace, override=override)
+
+    def prefix(self, namespace):
+        return self._prefixes.prefix(namespace)
+
+    def namespace(self, prefix):
+        return self._prefixes.namespace(prefix)
+
+    def namespaces(self):
+        return self._prefixes.namespaces()
+
+
+plugin.register(STORE_PLUGIN, Store, "owlrl.memory_store", "ReasonerMemory")
@@ -0,0 +1,215 @@
+"""
+Fast, line oriented loading of N-Triples and N-Quads.
+
+Large data sets are usually exchanged as N-Triples (or N-Quads) dumps. RDFLib's generic parser handles these through
+its full parser machinery, adding the triples one by one; for a format with one statement per line, a single regular
+expression per line is enough. :func:`load_ntriples` parses a file (or any stream) that way and adds the terms to a
+graph in bulk. A local file can also be cut into byte ranges, at line boundaries, and each range parsed in a separate
+process.
+
+Blank node labels are only meaningful within one document; they are turned into blank nodes that are unique to the
+document (but shared by all of its chunks), so that loading several documents into the same graph does not merge
+their blank nodes by accident.
+"""
+
+import os
+import re
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.graph import ConjunctiveGraph
+from rdflib.term import Node
+
+_IRI = r"<([^>]*)>"
+_BNODE = r"_:(\S*[^\s.])"
+_LITERAL = r'"((?:[^"\\]|\\.)*)"(?:@([A-Za-z]+(?:-[A-Za-z0-9]+)*)|\^\^<([^>]*)>)?'
+
+# One statement per line; groups: subject (IRI or blank node), predicate, object (IRI, blank node, or lexical form,
+# language tag and datatype of a literal), and the optional graph name (IRI or blank node)
+_STATEMENT = re.compile(
+    r"^[ \t]*(?:%(iri)s|%(bnode)s)[ \t]*%(iri)s[ \t]*(?:%(iri)s|%(bnode)s|%(literal)s)[ \t]*"
+    r"(?:(?:%(iri)s|%(bnode)s)[ \t]*)?\.[ \t]*(?:#[^\r\n]*)?\r?$" % {"iri": _IRI, "bnode": _BNODE, "literal": _LITERAL}
+)
+_EMPTY = re.compile(r"^[ \t]*(?:#[^\r\n]*)?\r?$")
+
+_ESCAPE = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))")
+_ESCAPED_CHARS = {"t": "\t", "b": "\b", "n": "\n", "r": "\r", "f": "\f", '"': '"', "'": "'", "\\": "\\"}
+
+Quad = Tuple[Node, Node, Node, Optional[Node]]
+
+
+def _unescape_match(m) -> str:
+    if m.group(1) is not None:
+        return chr(int(m.group(1), 16))
+    elif m.group(2) is not None:
+        return chr(int(m.group(2), 16))
+    try:
+        return _ESCAPED_CHARS[m.group(3)]
+    except KeyError:
+        raise ValueError("Invalid escape sequence: \\%s" % m.group(3))
+
+
+def _unescape(value: str) -> str:
+    return _ESCAPE.sub(_unescape_match, value) if "\\" in value else value
+
+
+class _Terms:
+    """Turns the matched strings into RDFLib terms, reusing the most frequent IRIs."""
+
+    def __init__(self, bnode_prefix: str):
+        self.bnode_prefix = bnode_prefix
+        self.iri = lru_cache(maxsize=1 << 16)(self._iri)
+
+    @staticmethod
+    def _iri(value: str) -> URIRef:
+        return URIRef(_unescape(value))
+
+    def bnode(self, label: str) -> BNode:
+        return BNode(self.bnode_prefix + label)
+
+    def statement(self, line: str, quads: bool) -> Optional[Quad]:
+        m = _STATEMENT.match(line)
+        if m is None:
+            if _EMPTY.match(line):
+                return None
+            raise ValueError("Invalid %s line: %r" % ("N-Quads" if quads else "N-Triples", line.rstrip("\r\n")))
+        (s_iri, s_bnode, p, o_iri, o_bnode, lexical, lang, datatype, g_iri, g_bnode) = m.groups()
+
+        s = self.iri(s_iri) if s_iri is not None else self.bnode(s_bnode)
+        if o_iri is not None:
+            o = self.iri(o_iri)
+        elif o_bnode is not None:
+            o = self.bnode(o_bnode)
+        elif lang is not None:
+            o = Literal(_unescape(lexical), lang=lang)
+        elif datatype is not None:
+            o = Literal(_unescape(lexical), datatype=self.iri(datatype))
+        else:
+            o = Literal(_unescape(lexical))
+
+        if g_iri is not None:
+            g = self.iri(g_iri)
+        elif g_bnode is not None:
+            g = self.bnode(g_bnode)
+        else:
+            g = None
+        if g is not None and not quads:
+            raise ValueError("Graph name in an N-Triples line: %r" % line.rstrip("\r\n"))
+        return s, self.iri(p), o, g
+
+
+def parse_lines(lines: Iterable[str], quads: bool = False, bnode_prefix: str = "") -> Iterator[Quad]:
+    """
+    Parse N-Triples (or N-Quads) lines.
+
+    :param lines: The lines to parse; empty and comment lines are skipped.
+    :type lines: iterable of str
+    :param quads: Whether the lines are N-Quads (i.e., may include a graph name).
+    :type quads: bool
+    :param bnode_prefix: Prefix added to the blank node labels.
+    :type bnode_prefix: str
+    :return: :code:`(s, p, o, g)` tuples, :code:`g` is None for the default graph.
+    :raises ValueError: On a syntax error.
+    """
+    terms = _Terms(bnode_prefix)
+    for line in lines:
+        statement = terms.statement(line, quads)
+        if statement is not None:
+            yield statement
+
+
+def chunk_ranges(path: str, chunks: int) -> List[Tuple[int, int]]:
+    """
+    Cut a file into (at most) :code:`chunks` byte ranges of roughly equal size, each of them ending at a line boundary.
+
+    :param path: The file name.
+    :type path: str
+    :param chunks: Number of ranges.
+    :type chunks: int
+    :return: A list of :code:`(start, end)` byte offsets.
+    """
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, "rb") as f:
+        for i in range(1, chunks):
+            position = max(size * i // chunks, boundaries[-1])
+            if position >= size:
+                break
+            f.seek(position)
+            f.readline()
+            position = f.tell()
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    if boundaries[-1] < size:
+        boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _parse_chunk(path: str, start: int, end: int, quads: bool, bnode_prefix: str) -> List[Quad]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start).decode("utf-8")
+    # str.splitlines would also split on characters allowed, unescaped, in the literals (e.g., U+2028 or U+0085)
+    return list(parse_lines(data.split("\n"), quads, bnode_prefix))
+
+
+def _add_statements(graph: Graph, statements: Iterable[Quad]) -> None:
+    if isinstance(graph, ConjunctiveGraph):
+        contexts = {None: graph.default_context}
+
+        def context(g):
+            try:
+                return contexts[g]
+            except KeyError:
+                contexts[g] = c = graph.get_context(g)
+                return c
+
+        graph.addN((s, p, o, context(g)) for (s, p, o, g) in statements)
+    else:
+        # graph names are dropped: everything is merged into the graph
+        graph.addN((s, p, o, graph) for (s, p, o, _) in statements)
+
+
+def load_ntriples(
+    source: Union[str, IO],
+    graph: Graph,
+    quads: bool = False,
+    workers: Optional[int] = None,
+) -> Graph:
+    """
+    Load an N-Triples (or N-Quads) document into a graph.
+
+    :param source: A file name, or a text stream.
+    :type source: str or file object
+    :param graph: The graph to add the triples to. With N-Quads, if the graph is a :class:`rdflib.ConjunctiveGraph`
+        (or :class:`rdflib.Dataset`), the statements are added to their named graphs; otherwise all the statements are
+        merged into the graph.
+    :type graph: :class:`rdflib.Graph`
+    :param quads: Whether the document is N-Quads.
+    :type quads: bool
+    :param workers: If larger than 1 (and the source is a file name), the file is cut into that many chunks, parsed in
+        as many processes. Default: None, i.e., the file is parsed in the calling process.
+    :type workers: int
+    :return: The graph.
+    :raises ValueError: On a syntax error.
+    """
+    bnode_prefix = uuid.uuid4().hex[:12]
+    if isinstance(source, str):
+        if workers is not None and workers > 1:
+            ranges = chunk_ranges(source, workers)
+            with ProcessPoolExecutor(max_workers=min(workers, len(ranges) or 1)) as executor:
+                futures = [
+                    executor.submit(_parse_chunk, source, start, end, quads, bnode_prefix) for (start, end) in ranges
+                ]
+                # the chunks are added in order, while the others are still being parsed
+                for future in futures:
+                    _add_statements(graph, future.result())
+        else:
+            with open(source, encoding="utf-8") as f:
+                _add_statements(graph, parse_lines(f, quads, bnode_prefix))
+    else:
+        _add_statements(graph, parse_lines(source, quads, bnode_prefix))
+    return graph
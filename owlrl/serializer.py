@@ -0,0 +1,179 @@
+"""
+Streaming serialization of (possibly very large) graphs.
+
+RDFLib's serializers build the whole output in memory and, for Turtle or RDF/XML, sort the triples to produce a pretty
+output; both are costly for the large graphs an OWL 2 RL closure produces. The functions in this module write the
+triples directly to a file or a stream, in chunks of lines, without sorting them:
+
+- N-Triples (:data:`NTRIPLES`) and N-Quads (:data:`NQUADS`), one triple (or quad) per line;
+- a fast Turtle (:data:`TURTLE_STREAM`): prefixed names for the bound namespaces, the triples of a subject grouped with
+  :code:`;`, but no sorting, no nested blank nodes or lists.
+
+The output can also be compressed with gzip.
+"""
+
+import gzip
+import re
+import sys
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import IO, Iterator, Union
+
+from rdflib import Graph, Literal, URIRef
+from rdflib.graph import ConjunctiveGraph
+from rdflib.plugins.serializers.nt import _nt_row, _quote_encode, _quoteLiteral
+
+NTRIPLES = "nt"
+NQUADS = "nq"
+TURTLE_STREAM = "turtle-stream"
+
+STREAMING_FORMATS = (NTRIPLES, NQUADS, TURTLE_STREAM)
+
+# Local names that can be safely written in a prefixed name (a conservative subset of the Turtle PN_LOCAL)
+_LOCAL_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_\-]*$")
+
+
+@contextmanager
+def open_output(output: Union[str, IO], compress: bool = False) -> Iterator[IO]:
+    """
+    Open an output for writing text.
+
+    :param output: A file name, :code:`"-"` for the standard output, or a stream opened for writing (text or binary).
+    :type output: str or file object
+    :param compress: Whether the output is compressed with gzip. It is also compressed if the file name ends with
+        :code:`.gz`.
+    :type compress: bool
+    :return: A text stream; it is closed (but the standard output or an explicitly given stream is only flushed) at
+        the end of the :code:`with` block.
+    """
+    if isinstance(output, str) and output != "-":
+        if compress or output.endswith(".gz"):
+            stream = gzip.open(output, "wt", encoding="utf-8")
+        else:
+            stream = open(output, "w", encoding="utf-8")
+        try:
+            yield stream
+        finally:
+            stream.close()
+        return
+
+    if output == "-":
+        output = sys.stdout
+    if compress:
+        binary = output.buffer if hasattr(output, "buffer") else output
+        stream = gzip.open(binary, "wt", encoding="utf-8")
+        try:
+            yield stream
+        finally:
+            # closing the gzip stream writes the trailer, but leaves the underlying stream open
+            stream.close()
+            binary.flush()
+    else:
+        try:
+            yield output
+        finally:
+            output.flush()
+
+
+def stream_serialize(
+    graph: Graph,
+    output: Union[str, IO],
+    format: str = NTRIPLES,
+    compress: bool = False,
+    chunk_size: int = 10000,
+) -> None:
+    """
+    Write a graph to an output without building the serialization in memory.
+
+    :param graph: The graph to serialize. For N-Quads, the quads of a :class:`rdflib.ConjunctiveGraph` (or
+        :class:`rdflib.Dataset`) are written with their graph names; for any other graph the triples are written in
+        the default graph.
+    :type graph: :class:`rdflib.Graph`
+    :param output: A file name, :code:`"-"` for the standard output, or a (text) stream.
+    :type output: str or file object
+    :param format: One of :data:`NTRIPLES`, :data:`NQUADS` or :data:`TURTLE_STREAM`.
+    :type format: str
+    :param compress: Whether the output is compressed with gzip (see :func:`open_output`).
+    :type compress: bool
+    :param chunk_size: Number of lines collected before they are written out in one go.
+    :type chunk_size: int
+    """
+    if format == NTRIPLES:
+        lines = _nt_lines(graph)
+    elif format == NQUADS:
+        lines = _nq_lines(graph)
+    elif format == TURTLE_STREAM:
+        lines = _turtle_lines(graph)
+    else:
+        raise ValueError("Unknown streaming serialization format: %s" % format)
+
+    with open_output(output, compress) as stream:
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                stream.write("".join(chunk))
+                chunk = []
+        if chunk:
+            stream.write("".join(chunk))
+
+
+def _nt_lines(graph: Graph) -> Iterator[str]:
+    for t in graph.triples((None, None, None)):
+        yield _nt_row(t)
+
+
+def _nq_lines(graph: Graph) -> Iterator[str]:
+    if not isinstance(graph, ConjunctiveGraph):
+        yield from _nt_lines(graph)
+        return
+    default = graph.default_context.identifier
+    for s, p, o, context in graph.quads((None, None, None, None)):
+        name = context.identifier if isinstance(context, Graph) else context
+        if name is None or name == default:
+            yield _nt_row((s, p, o))
+        else:
+            yield "%s %s %s %s .\n" % (s.n3(), p.n3(), _term(o), name.n3())
+
+
+def _term(term) -> str:
+    return _quoteLiteral(term) if isinstance(term, Literal) else term.n3()
+
+
+def _turtle_lines(graph: Graph) -> Iterator[str]:
+    namespaces = sorted(
+        ((prefix, str(namespace)) for (prefix, namespace) in graph.namespaces()),
+        key=lambda pn: len(pn[1]),
+        reverse=True,
+    )
+    for prefix, namespace in reversed(namespaces):
+        yield "@prefix %s: <%s> .\n" % (prefix, namespace)
+    yield "\n"
+
+    @lru_cache(maxsize=1 << 16)
+    def uri_name(uri: URIRef) -> str:
+        for prefix, namespace in namespaces:
+            if uri.startswith(namespace) and _LOCAL_NAME.match(uri[len(namespace):]):
+                return "%s:%s" % (prefix, uri[len(namespace):])
+        return uri.n3()
+
+    def name(term) -> str:
+        if isinstance(term, URIRef):
+            return uri_name(term)
+        elif isinstance(term, Literal):
+            if term.language:
+                return "%s@%s" % (_quote_encode(term), term.language)
+            elif term.datatype:
+                return "%s^^%s" % (_quote_encode(term), name(term.datatype))
+            return _quote_encode(term)
+        else:
+            return term.n3()
+
+    # The subjects come from the store in no particular order; each of them is followed by its triples
+    for s in graph.subjects(unique=True):
+        lines = [name(s)]
+        for p, o in graph.predicate_objects(s):
+            lines.append(" %s %s ;\n   " % (name(p), name(o)))
+        if len(lines) > 1:
+            lines[-1] = lines[-1][:-6] + " .\n\n"
+            yield "".join(lines)
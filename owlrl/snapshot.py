@@ -0,0 +1,105 @@
+"""
+Binary snapshots of graphs, opened through a memory map.
+
+A snapshot is a file holding a graph in the binary form of an :class:`.encoded_store.TripleTable`: a sorted term
+dictionary and the triples as integer ids, sorted in three orders. Opening a snapshot does not deserialize it: the file
+is mapped in memory (see :mod:`mmap`), the indexes are searched in place, and only the terms actually read are decoded.
+Opening even a very large snapshot is therefore immediate, and its pages are shared by all the processes that open it.
+
+A snapshot can be used as a source graph, read-only or with a writable overlay (see
+:class:`.encoded_store.OverlayStore`); a typical use is to keep the closure of a large graph, and expand it again, later,
+with a few new triples, without parsing anything::
+
+    save_snapshot(closed_graph, "closure.tt")
+    ...
+    with Snapshot("closure.tt") as snapshot:
+        graph = snapshot.graph()
+        graph.parse("new_data.ttl")
+        DeductiveClosure(OWLRL_Semantics).expand(graph)
+        save_snapshot(graph, "closure-2.tt")
+
+On the command line, :code:`-o snapshot` writes the result as a snapshot, and files with the :code:`.tt` suffix (or
+:code:`-i snapshot`) are read as snapshots.
+"""
+
+import mmap
+import os
+import tempfile
+from typing import Iterable, Tuple
+
+from rdflib import Graph
+from rdflib.term import Node
+
+from .encoded_store import EncodedStore, OverlayStore, TripleTable
+
+SNAPSHOT = "snapshot"
+
+
+def save_snapshot(triples: Iterable[Tuple[Node, Node, Node]], path: str):
+    """
+    Write a snapshot. The file is replaced atomically, so that a snapshot being read is never seen half written.
+
+    :param triples: The triples (e.g., a :class:`rdflib.Graph`).
+    :param path: The file name.
+    :type path: str
+    """
+    data = TripleTable.build(triples)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class Snapshot:
+    """
+    A snapshot file, mapped in memory. It should be closed (or used as a context manager) once the graphs on it are no
+    longer used.
+
+    :param path: The file name.
+    :type path: str
+    :ivar table: The :class:`.encoded_store.TripleTable` on the mapped file.
+    :raises ValueError: If the file is not a snapshot.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.table = TripleTable(self._mmap)
+        except BaseException:
+            self._mmap.close()
+            raise
+
+    def graph(self, writable: bool = True) -> Graph:
+        """
+        A graph on the snapshot.
+
+        :param writable: Whether the graph can be modified; the changes are kept in memory, the file is never
+            modified. Default: True.
+        :type writable: bool
+        :return: The graph; a read-only graph raises :class:`rdflib.graph.ModificationException` when modified.
+        :rtype: :class:`rdflib.Graph`
+        """
+        store = EncodedStore(self.table)
+        return Graph(store=OverlayStore(store) if writable else store)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def close(self):
+        """Unmap the file; the graphs on the snapshot can no longer be used."""
+        if self._mmap is not None:
+            self.table.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,519 @@
+"""
+Evaluation of the RDFS and OWL 2 RL rules inside an Oxigraph store, as SPARQL updates.
+
+With a `PyOxigraph`_ :code:`Store`, the default engine pulls every triple into Python, converts it to RDFLib terms, and
+pushes the inferred triples back one by one. The :class:`SPARQLClosure` engine expresses each rule as a SPARQL
+:code:`INSERT { ... } WHERE { ... }` update instead, and runs the updates in the store, round after round, until a
+round does not change the size of the store any more. The hierarchies (:code:`rdfs:subClassOf`,
+:code:`rdfs:subPropertyOf`, transitive properties) are closed with property paths, and the members of
+:code:`rdf:List`-s are reached with :code:`rdf:rest*/rdf:first`. Only the rules depending on the ontology in a way that
+cannot be written as a fixed query (property chains, keys, transitive properties) are generated, at every round, from
+the axioms found in the store.
+
+The rules read the union of all the graphs of the store (as the default engine does). If the store has named graphs,
+or the inferred triples go to a separate named graph (the :code:`destination`), the rules are run as
+:code:`CONSTRUCT` queries on that union, and their results added to the destination in bulk.
+
+It is used via :code:`DeductiveClosure(...).expand(store, engine="sparql")`, for the :class:`.RDFSClosure.RDFS_Semantics`,
+:class:`.OWLRL.OWLRL_Semantics` and :class:`.CombinedClosure.RDFS_OWLRL_Semantics` closures. The results are the same as
+those of the default engine with an Oxigraph store, with a few differences:
+
+- the RDFS rules rdfs4a and rdfs4b (typing as :code:`rdfs:Resource`) are applied to every triple, not only to those of
+  the first cycle;
+- the RDFS equality of literals with the same value but a different lexical form is not taken into account;
+- the generalized triples (with a literal subject, or a blank node or literal predicate) cannot be stored in Oxigraph.
+  The default engine keeps them in an in-memory side table, and derives regular triples from them (e.g.,
+  :code:`p0 a rdf:Property` from a triple with a literal subject and the predicate :code:`p0`). The rules run as
+  SPARQL updates never see such triples, so these conclusions are missing;
+- the inconsistency checks are done once, on the final result.
+
+.. _PyOxigraph: https://pyoxigraph.readthedocs.io/
+"""
+
+import time
+from typing import Iterator, List, Optional, Union
+
+from rdflib import Literal, URIRef
+from rdflib.namespace import OWL, RDF, RDFS
+
+from .AxiomaticTriples import (
+    OWLRL_Axiomatic_Triples,
+    OWLRL_D_Axiomatic_Triples,
+    OWLRL_Datatypes_Disjointness,
+    RDFS_Axiomatic_Triples,
+    RDFS_D_Axiomatic_Triples,
+)
+from .Closure import ClosureCancelled, ClosureProgress
+from .CombinedClosure import RDFS_OWLRL_Semantics
+from .DatatypeHandling import AltXSDToPYTHON
+from .graph_abstraction import (
+    DataGraph,
+    has_oxigraph,
+    ox_BlankNode,
+    ox_Store,
+    ox_DefaultGraph,
+    ox_Literal,
+    ox_NamedNode,
+    ox_Quad,
+)
+from .Namespaces import ERRNS
+from .OWLRL import OWLRL_Annotation_properties, OWLRL_Semantics
+from .RDFSClosure import RDFS_Semantics
+from .XsdDatatypes import OWL_Datatype_Subsumptions, OWL_RL_Datatypes
+
+_PREFIXES = """PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX owl: <http://www.w3.org/2002/07/owl#>
+PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+"""
+
+# Members of a list, in order: ?zi comes before ?zj in the list ?l
+_LIST_PAIRS = "?l rdf:rest* ?ni . ?ni rdf:first ?zi . ?ni rdf:rest+ ?nj . ?nj rdf:first ?zj ."
+
+# The rules, as (name, template, pattern) triples; the comments follow the names of the rules in the specifications.
+_RDFS_RULES = [
+    ("rdf1", "?p a rdf:Property", "?s ?p ?o"),
+    ("rdfs4", "?s a rdfs:Resource . ?o a rdfs:Resource", "?s ?p ?o"),
+    ("rdfs2", "?x a ?c", "?p rdfs:domain ?c . ?x ?p ?y"),
+    ("rdfs3", "?y a ?c", "?p rdfs:range ?c . ?x ?p ?y"),
+    ("rdfs5", "?p1 rdfs:subPropertyOf ?p3", "?p1 rdfs:subPropertyOf/rdfs:subPropertyOf+ ?p3"),
+    ("rdfs6", "?p rdfs:subPropertyOf ?p", "?p a rdf:Property"),
+    ("rdfs7", "?x ?p2 ?y", "?p1 rdfs:subPropertyOf ?p2 . FILTER(?p1 != ?p2) ?x ?p1 ?y"),
+    ("rdfs8-10", "?c rdfs:subClassOf rdfs:Resource , ?c", "?c a rdfs:Class"),
+    ("rdfs9", "?x a ?c2", "?c1 rdfs:subClassOf ?c2 . FILTER(?c1 != ?c2) ?x a ?c1"),
+    ("rdfs11", "?c1 rdfs:subClassOf ?c3", "?c1 rdfs:subClassOf/rdfs:subClassOf+ ?c3"),
+    ("rdfs12", "?p rdfs:subPropertyOf rdfs:member", "?p a rdfs:ContainerMembershipProperty"),
+    ("rdfs13", "?d rdfs:subClassOf rdfs:Literal", "?d a rdfs:Datatype"),
+]
+
+_OWLRL_RULES = [
+    # Table 4: equality
+    ("eq-ref", "?s owl:sameAs ?s . ?p owl:sameAs ?p . ?o owl:sameAs ?o", "?s ?p ?o"),
+    ("eq-sym", "?y owl:sameAs ?x", "?x owl:sameAs ?y"),
+    ("eq-trans", "?x owl:sameAs ?z", "?x owl:sameAs ?y . ?y owl:sameAs ?z"),
+    ("eq-rep-s", "?o ?p ?v", "?s owl:sameAs ?o . FILTER(?s != ?o) ?s ?p ?v"),
+    ("eq-rep-p", "?x ?o ?y", "?s owl:sameAs ?o . FILTER(?s != ?o) ?x ?s ?y"),
+    ("eq-rep-o", "?x ?p ?s", "?s owl:sameAs ?o . FILTER(?s != ?o) ?x ?p ?o"),
+    # Table 5: properties
+    ("prp-dom", "?x a ?c", "?p rdfs:domain ?c . ?x ?p ?y"),
+    ("prp-rng", "?y a ?c", "?p rdfs:range ?c . ?x ?p ?y"),
+    ("prp-fp", "?y1 owl:sameAs ?y2", "?p a owl:FunctionalProperty . ?x ?p ?y1 , ?y2 . FILTER(?y1 != ?y2)"),
+    ("prp-ifp", "?x1 owl:sameAs ?x2", "?p a owl:InverseFunctionalProperty . ?x1 ?p ?y . ?x2 ?p ?y . FILTER(?x1 != ?x2)"),
+    ("prp-symp", "?y ?p ?x", "?p a owl:SymmetricProperty . ?x ?p ?y"),
+    ("prp-spo1", "?x ?p2 ?y", "?p1 rdfs:subPropertyOf ?p2 . FILTER(?p1 != ?p2) ?x ?p1 ?y"),
+    ("prp-eqp1", "?x ?p2 ?y", "?p1 owl:equivalentProperty ?p2 . FILTER(?p1 != ?p2) ?x ?p1 ?y"),
+    ("prp-eqp2", "?x ?p1 ?y", "?p1 owl:equivalentProperty ?p2 . FILTER(?p1 != ?p2) ?x ?p2 ?y"),
+    ("prp-inv1", "?y ?p2 ?x", "?p1 owl:inverseOf ?p2 . ?x ?p1 ?y"),
+    ("prp-inv2", "?y ?p1 ?x", "?p1 owl:inverseOf ?p2 . ?x ?p2 ?y"),
+    # Table 6: classes
+    (
+        "cls-int1",
+        "?y a ?c",
+        "?c owl:intersectionOf ?l . ?l rdf:first ?c1 . ?y a ?c1 . "
+        "FILTER NOT EXISTS { ?l rdf:rest*/rdf:first ?ci . FILTER NOT EXISTS { ?y a ?ci } }",
+    ),
+    ("cls-int2", "?y a ?ci", "?c owl:intersectionOf ?l . ?y a ?c . ?l rdf:rest*/rdf:first ?ci"),
+    ("cls-uni", "?y a ?c", "?c owl:unionOf ?l . ?l rdf:rest*/rdf:first ?ci . ?y a ?ci"),
+    ("cls-svf1", "?u a ?x", "?x owl:someValuesFrom ?y ; owl:onProperty ?p . ?u ?p ?v . ?v a ?y"),
+    ("cls-svf2", "?u a ?x", "?x owl:someValuesFrom owl:Thing ; owl:onProperty ?p . ?u ?p ?v"),
+    ("cls-avf", "?v a ?y", "?x owl:allValuesFrom ?y ; owl:onProperty ?p . ?u a ?x . ?u ?p ?v"),
+    ("cls-hv1", "?u ?p ?y", "?x owl:hasValue ?y ; owl:onProperty ?p . ?u a ?x"),
+    ("cls-hv2", "?u a ?x", "?x owl:hasValue ?y ; owl:onProperty ?p . ?u ?p ?y"),
+    (
+        "cls-maxc2",
+        "?y1 owl:sameAs ?y2",
+        "?x owl:maxCardinality ?n ; owl:onProperty ?p . FILTER(xsd:integer(STR(?n)) = 1) "
+        "?u a ?x . ?u ?p ?y1 , ?y2 . FILTER(?y1 != ?y2)",
+    ),
+    (
+        "cls-maxqc3",
+        "?y1 owl:sameAs ?y2",
+        "?x owl:maxQualifiedCardinality ?n ; owl:onProperty ?p ; owl:onClass ?c . "
+        "FILTER(xsd:integer(STR(?n)) = 1 && ?c != owl:Thing) "
+        "?u a ?x . ?u ?p ?y1 , ?y2 . FILTER(?y1 != ?y2) ?y1 a ?c . ?y2 a ?c",
+    ),
+    (
+        "cls-maxqc4",
+        "?y1 owl:sameAs ?y2",
+        "?x owl:maxQualifiedCardinality ?n ; owl:onProperty ?p ; owl:onClass owl:Thing . "
+        "FILTER(xsd:integer(STR(?n)) = 1) ?u a ?x . ?u ?p ?y1 , ?y2 . FILTER(?y1 != ?y2)",
+    ),
+    ("cls-oo", "?y a ?c", "?c owl:oneOf ?l . ?l rdf:rest*/rdf:first ?y"),
+    # Table 7: class axioms
+    ("cax-sco", "?x a ?c2", "?c1 rdfs:subClassOf ?c2 . FILTER(?c1 != ?c2) ?x a ?c1"),
+    ("cax-eqc1", "?x a ?c2", "?c1 owl:equivalentClass ?c2 . FILTER(?c1 != ?c2) ?x a ?c1"),
+    ("cax-eqc2", "?x a ?c1", "?c1 owl:equivalentClass ?c2 . FILTER(?c1 != ?c2) ?x a ?c2"),
+    # Table 9: schema vocabulary
+    (
+        "scm-cls",
+        "?c rdfs:subClassOf ?c , owl:Thing ; owl:equivalentClass ?c . owl:Nothing rdfs:subClassOf ?c",
+        "?c a owl:Class",
+    ),
+    ("scm-sco", "?c1 rdfs:subClassOf ?c3", "?c1 rdfs:subClassOf/rdfs:subClassOf+ ?c3 . FILTER(?c1 != ?c3)"),
+    ("scm-eqc1", "?c1 rdfs:subClassOf ?c2 . ?c2 rdfs:subClassOf ?c1", "?c1 owl:equivalentClass ?c2 . FILTER(?c1 != ?c2)"),
+    ("scm-eqc2", "?c1 owl:equivalentClass ?c2", "?c1 rdfs:subClassOf ?c2 . ?c2 rdfs:subClassOf ?c1"),
+    (
+        "scm-op-dp",
+        "?p rdfs:subPropertyOf ?p ; owl:equivalentProperty ?p",
+        "VALUES ?t { owl:ObjectProperty owl:DatatypeProperty rdf:Property } ?p a ?t",
+    ),
+    ("scm-spo", "?p1 rdfs:subPropertyOf ?p3", "?p1 rdfs:subPropertyOf/rdfs:subPropertyOf+ ?p3 . FILTER(?p1 != ?p3)"),
+    (
+        "scm-eqp1",
+        "?p1 rdfs:subPropertyOf ?p2 . ?p2 rdfs:subPropertyOf ?p1",
+        "?p1 owl:equivalentProperty ?p2 . FILTER(?p1 != ?p2)",
+    ),
+    (
+        "scm-eqp2",
+        "?p1 owl:equivalentProperty ?p2",
+        "?p1 rdfs:subPropertyOf ?p2 . ?p2 rdfs:subPropertyOf ?p1 . FILTER(?p1 != ?p2)",
+    ),
+    ("scm-dom1", "?p rdfs:domain ?c2", "?p rdfs:domain ?c1 . ?c1 rdfs:subClassOf ?c2 . FILTER(?c1 != ?c2)"),
+    ("scm-dom2", "?p1 rdfs:domain ?c", "?p2 rdfs:domain ?c . ?p1 rdfs:subPropertyOf ?p2 . FILTER(?p1 != ?p2)"),
+    ("scm-rng1", "?p rdfs:range ?c2", "?p rdfs:range ?c1 . ?c1 rdfs:subClassOf ?c2 . FILTER(?c1 != ?c2)"),
+    ("scm-rng2", "?p1 rdfs:range ?c", "?p2 rdfs:range ?c . ?p1 rdfs:subPropertyOf ?p2 . FILTER(?p1 != ?p2)"),
+    (
+        "scm-hv",
+        "?c1 rdfs:subClassOf ?c2",
+        "?c1 owl:hasValue ?i ; owl:onProperty ?p1 . ?c2 owl:hasValue ?i ; owl:onProperty ?p2 . "
+        "?p1 rdfs:subPropertyOf ?p2",
+    ),
+    (
+        "scm-svf1",
+        "?c1 rdfs:subClassOf ?c2",
+        "?c1 owl:someValuesFrom ?y1 ; owl:onProperty ?p . ?c2 owl:someValuesFrom ?y2 ; owl:onProperty ?p . "
+        "?y1 rdfs:subClassOf ?y2",
+    ),
+    (
+        "scm-svf2",
+        "?c1 rdfs:subClassOf ?c2",
+        "?c1 owl:someValuesFrom ?y ; owl:onProperty ?p1 . ?c2 owl:someValuesFrom ?y ; owl:onProperty ?p2 . "
+        "?p1 rdfs:subPropertyOf ?p2",
+    ),
+    (
+        "scm-avf1",
+        "?c1 rdfs:subClassOf ?c2",
+        "?c1 owl:allValuesFrom ?y1 ; owl:onProperty ?p . ?c2 owl:allValuesFrom ?y2 ; owl:onProperty ?p . "
+        "?y1 rdfs:subClassOf ?y2",
+    ),
+    (
+        "scm-avf2",
+        "?c2 rdfs:subClassOf ?c1",
+        "?c1 owl:allValuesFrom ?y ; owl:onProperty ?p1 . ?c2 owl:allValuesFrom ?y ; owl:onProperty ?p2 . "
+        "?p1 rdfs:subPropertyOf ?p2",
+    ),
+    ("scm-int", "?c rdfs:subClassOf ?ci", "?c owl:intersectionOf ?l . ?l rdf:rest*/rdf:first ?ci"),
+    ("scm-uni", "?ci rdfs:subClassOf ?c", "?c owl:unionOf ?l . ?l rdf:rest*/rdf:first ?ci"),
+]
+
+# The inconsistency checks, as (message, variables, pattern) triples; the messages are those of OWLRL_Semantics
+_OWLRL_CHECKS = [
+    # eq-diff1
+    (
+        "'sameAs' and 'differentFrom' cannot be used on the same subject-object pair: (%s, %s)",
+        ("s", "o"),
+        "?s owl:sameAs ?o . { ?s owl:differentFrom ?o } UNION { ?o owl:differentFrom ?s }",
+    ),
+    # eq-diff2, eq-diff3
+    (
+        "'sameAs' and 'AllDifferent' cannot be used on the same subject-object pair: (%s, %s)",
+        ("zi", "zj"),
+        "?x a owl:AllDifferent ; owl:members|owl:distinctMembers ?l . " + _LIST_PAIRS + " ?zi owl:sameAs ?zj . "
+        "FILTER(?zi != ?zj)",
+    ),
+    # prp-irp
+    ("Irreflexive property used on %s with %s", ("x", "p"), "?p a owl:IrreflexiveProperty . ?x ?p ?x"),
+    # prp-asyp
+    (
+        "Erroneous usage of asymmetric property %s on %s and %s",
+        ("p", "x", "y"),
+        "?p a owl:AsymmetricProperty . ?x ?p ?y . ?y ?p ?x",
+    ),
+    # prp-pdw
+    (
+        "Erroneous usage of disjoint properties %s and %s on %s and %s",
+        ("p1", "p2", "x", "y"),
+        "?p1 owl:propertyDisjointWith ?p2 . ?x ?p1 ?y . ?x ?p2 ?y",
+    ),
+    # prp-adp
+    (
+        "Disjoint properties in an 'AllDisjointProperties' are not really disjoint: (%s, %s,%s) and (%s,%s,%s)",
+        ("x", "zi", "y", "x", "zj", "y"),
+        "?a a owl:AllDisjointProperties ; owl:members ?l . " + _LIST_PAIRS + " ?x ?zi ?y . ?x ?zj ?y",
+    ),
+    # prp-npa1
+    (
+        "Negative (object) property assertion violated for: (%s, %s, %s)",
+        ("i1", "p", "i2"),
+        "?x owl:sourceIndividual ?i1 ; owl:assertionProperty ?p ; owl:targetIndividual ?i2 . ?i1 ?p ?i2",
+    ),
+    # prp-npa2
+    (
+        "Negative (datatype) property assertion violated for: (%s, %s, %s)",
+        ("i1", "p", "i2"),
+        "?x owl:sourceIndividual ?i1 ; owl:assertionProperty ?p ; owl:targetValue ?i2 . ?i1 ?p ?i2",
+    ),
+    # cls-nothing2
+    ("%s is defined of type 'Nothing'", ("x",), "?x a owl:Nothing"),
+    # cls-com
+    (
+        "Violation of complementarity for classes %s and %s on element %s",
+        ("c1", "c2", "x"),
+        "?c1 owl:complementOf ?c2 . ?x a ?c1 , ?c2",
+    ),
+    # cls-maxc1
+    (
+        "Erroneous usage of maximum cardinality with %s and %s",
+        ("x", "y"),
+        "?x owl:maxCardinality ?n ; owl:onProperty ?p . FILTER(xsd:integer(STR(?n)) = 0) ?u a ?x ; ?p ?y",
+    ),
+    # cls-maxqc1, cls-maxqc2
+    (
+        "Erroneous usage of maximum qualified cardinality with %s, %s and %s",
+        ("x", "c", "y"),
+        "?x owl:maxQualifiedCardinality ?n ; owl:onProperty ?p ; owl:onClass ?c . "
+        "FILTER(xsd:integer(STR(?n)) = 0) ?u a ?x ; ?p ?y . FILTER(?c = owl:Thing || EXISTS { ?y a ?c })",
+    ),
+    # cax-dw
+    (
+        "Disjoint classes %s and %s have a common individual %s",
+        ("c1", "c2", "x"),
+        "?c1 owl:disjointWith ?c2 . ?x a ?c1 , ?c2",
+    ),
+    # cax-adc
+    (
+        "Disjoint classes %s and %s have a common individual %s",
+        ("zi", "zj", "x"),
+        "?a a owl:AllDisjointClasses ; owl:members ?l . " + _LIST_PAIRS + " ?x a ?zi , ?zj",
+    ),
+]
+
+
+def _value(term) -> str:
+    # the string form of the corresponding RDFLib term, as used in the error messages
+    return term.value
+
+
+class SPARQLClosure:
+    """
+    Closure of an Oxigraph store, evaluated with SPARQL updates (see the module description).
+
+    :param store: The Oxigraph store.
+    :type store: :class:`pyoxigraph.Store`
+    :param closure_class: The closure to compute: :class:`.RDFSClosure.RDFS_Semantics`, :class:`.OWLRL.OWLRL_Semantics`
+        or :class:`.CombinedClosure.RDFS_OWLRL_Semantics`.
+    :param axioms: Whether the (non-datatype) axiomatic triples are added.
+    :type axioms: bool
+    :param daxioms: Whether the datatype axiomatic triples are added.
+    :type daxioms: bool
+    :param destination: The named graph to which the inferred triples are written. Default: None, i.e., the default
+        graph.
+    :type destination: str or :class:`rdflib.URIRef`
+    :raises ValueError: If there are no SPARQL rules for the closure class.
+    """
+
+    def __init__(
+        self,
+        store,
+        closure_class,
+        axioms: bool = False,
+        daxioms: bool = False,
+        destination: Union[None, str, URIRef] = None,
+    ):
+        if not has_oxigraph:
+            raise ImportError('The SPARQL engine requires pyoxigraph; install it with: pip install "owlrl[oxigraph]"')
+        if not isinstance(store, ox_Store):
+            raise ValueError("The SPARQL engine can only be used with an Oxigraph store")
+        if closure_class is RDFS_Semantics:
+            self.rdfs, self.owl = True, False
+        elif closure_class is OWLRL_Semantics:
+            self.rdfs, self.owl = False, True
+        elif closure_class is RDFS_OWLRL_Semantics:
+            self.rdfs, self.owl = True, True
+        else:
+            raise ValueError("There are no SPARQL rules for %s" % closure_class.__name__)
+        self.store = store
+        self.axioms = axioms
+        self.daxioms = daxioms
+        self.destination = ox_DefaultGraph() if destination is None else ox_NamedNode(str(destination))
+        self.error_messages: List[str] = []
+
+    def add_error(self, message: str):
+        if message not in self.error_messages:
+            self.error_messages.append(message)
+
+    def _add(self, triples):
+        # RDFLib triples; only used for the (small) sets of axiomatic triples
+        destination = self.destination
+        quads = []
+        for t in triples:
+            # Oxigraph cannot store generalized triples
+            if isinstance(t[0], Literal) or not isinstance(t[1], URIRef):
+                continue
+            s, p, o = DataGraph.convert_triple_to_oxigraph(t)
+            quads.append(ox_Quad(s, p, o, destination))
+        self.store.extend(quads)
+
+    def _select(self, pattern: str, variables) -> Iterator[tuple]:
+        query = _PREFIXES + "SELECT DISTINCT %s WHERE { %s }" % (
+            " ".join("?" + v for v in dict.fromkeys(variables)),
+            pattern,
+        )
+        for solution in self.store.query(query, use_default_graph_as_union=True):
+            yield tuple(solution[v] for v in variables)
+
+    def _run(self, template: str, pattern: str):
+        if self._in_place:
+            self.store.update(_PREFIXES + "INSERT { %s } WHERE { %s }" % (template, pattern))
+        else:
+            destination = self.destination
+            triples = self.store.query(
+                _PREFIXES + "CONSTRUCT { %s } WHERE { %s }" % (template, pattern), use_default_graph_as_union=True
+            )
+            store = self.store
+            # as in the default engine, a triple already in any of the graphs is not added to the destination
+            self.store.extend(
+                [
+                    ox_Quad(t.subject, t.predicate, t.object, destination)
+                    for t in triples
+                    if next(store.quads_for_pattern(t.subject, t.predicate, t.object, None), None) is None
+                ]
+            )
+
+    def _list(self, head) -> Optional[list]:
+        # the members of an rdf:List, or None if it is malformed
+        first, rest, nil = ox_NamedNode(str(RDF.first)), ox_NamedNode(str(RDF.rest)), ox_NamedNode(str(RDF.nil))
+        members = []
+        seen = set()
+        while head != nil:
+            if head in seen:
+                return None
+            seen.add(head)
+            firsts = list(self.store.quads_for_pattern(head, first, None, None))
+            rests = list(self.store.quads_for_pattern(head, rest, None, None))
+            if not firsts or not rests:
+                return None
+            members.append(firsts[0].object)
+            head = rests[0].object
+        return members
+
+    def _generated_rules(self) -> Iterator[tuple]:
+        """The rules depending on the axioms of the ontology (prp-trp, prp-spo2, prp-key)."""
+        # RULE prp-trp
+        for (p,) in self._select("?p a owl:TransitiveProperty . FILTER(isIRI(?p))", ("p",)):
+            yield "?x %s ?z" % p, "?x %s/%s+ ?z" % (p, p)
+        # RULE prp-spo2
+        for p, head in self._select("?p owl:propertyChainAxiom ?l . FILTER(isIRI(?p))", ("p", "l")):
+            chain = self._list(head)
+            if chain and all(isinstance(pi, ox_NamedNode) for pi in chain):
+                steps = " . ".join("?u%d %s ?u%d" % (i, pi, i + 1) for (i, pi) in enumerate(chain))
+                yield "?u0 %s ?u%d" % (p, len(chain)), steps
+        # RULE prp-key
+        for c, head in self._select("?c owl:hasKey ?l", ("c", "l")):
+            keys = self._list(head)
+            if keys and all(isinstance(pi, ox_NamedNode) for pi in keys):
+                values = " . ".join("?x %s ?z%d . ?y %s ?z%d" % (pi, i, pi, i) for (i, pi) in enumerate(keys))
+                yield "?x owl:sameAs ?y", "?x a %s . ?y a %s . %s . FILTER(?x != ?y)" % (c, c, values)
+
+    def one_time_rules(self):
+        """
+        The axiomatic triples, and the one time rules of the closures (cls-thing, cls-nothing1, prp-ap, dt-type1,
+        dt-not-type, the datatype subsumptions and disjointness).
+        """
+        if self.axioms:
+            if self.rdfs:
+                self._add(RDFS_Axiomatic_Triples)
+            if self.owl:
+                self._add(OWLRL_Axiomatic_Triples)
+        if self.daxioms:
+            if self.rdfs:
+                self._add(RDFS_D_Axiomatic_Triples)
+            if self.owl:
+                self._add(OWLRL_D_Axiomatic_Triples)
+        if not self.owl:
+            return
+        if self.rdfs:
+            self._add(RDFS_OWLRL_Semantics.full_binding_triples)
+
+        # RULES cls-thing, cls-nothing1, prp-ap, dt-type1
+        triples = [(OWL.Thing, RDF.type, OWL.Class), (OWL.Nothing, RDF.type, OWL.Class)]
+        triples += [(an, RDF.type, OWL.AnnotationProperty) for an in OWLRL_Annotation_properties]
+        triples += [(dt, RDF.type, RDFS.Datatype) for dt in OWL_RL_Datatypes]
+
+        datatypes = {ox_NamedNode(str(dt)): dt for dt in OWL_RL_Datatypes}
+        used = set()
+        # RULE dt-not-type: the literals are checked in Python, but only once, and only the distinct ones
+        for (lt,) in self._select("?s ?p ?lt . FILTER(isLiteral(?lt))", ("lt",)):
+            dt = datatypes.get(lt.datatype)
+            if dt is not None:
+                used.add(dt)
+                try:
+                    AltXSDToPYTHON.get(dt, lambda v: v)(lt.value)
+                except ValueError:
+                    self.add_error("Lexical value of the literal '%s' does not match its datatype (%s)" % (lt.value, dt))
+        # resources explicitly typed with a datatype
+        values = " ".join(str(t) for t in datatypes)
+        for r, t in self._select("VALUES ?t { %s } ?r a ?t" % values, ("r", "t")):
+            dt = datatypes[t]
+            used.add(dt)
+            for new_dt in OWL_Datatype_Subsumptions.get(dt, ()):
+                triples.append((DataGraph.to_rdf(r), RDF.type, new_dt))
+        for dt in list(used):
+            for new_dt in OWL_Datatype_Subsumptions.get(dt, ()):
+                triples.append((new_dt, RDF.type, RDFS.Datatype))
+                used.add(new_dt)
+        triples += [t for t in OWLRL_Datatypes_Disjointness if t[0] in used and t[2] in used]
+        self._add(triples)
+
+    def consistency_checks(self):
+        """Run the inconsistency checks of OWL 2 RL on the closure, and collect the error messages."""
+        if not self.owl:
+            return
+        for message, variables, pattern in _OWLRL_CHECKS:
+            for values in self._select(pattern, variables):
+                self.add_error(message % tuple(_value(v) for v in values))
+
+    def closure(self, progress=None, cancel=None):
+        """
+        Compute the closure: run all the rules until the store does not change any more, then the inconsistency
+        checks, and add the error messages to the destination (as in :func:`.Closure.Core.closure`).
+
+        :param progress: Callback invoked with a :class:`.Closure.ClosureProgress` at the end of every round (the
+            :code:`scanned` field is always 0). Default: None.
+        :type progress: callable
+        :param cancel: Cancellation token, checked at the end of every round. Default: None.
+        :raises ClosureCancelled: If the closure has been cancelled.
+        """
+        start = time.perf_counter()
+        # the INSERT updates only read the default graph: they can be used if there is nothing else to read
+        self._in_place = isinstance(self.destination, ox_DefaultGraph) and next(self.store.named_graphs(), None) is None
+
+        self.one_time_rules()
+        rules = (_RDFS_RULES if self.rdfs else []) + (_OWLRL_RULES if self.owl else [])
+        size = len(self.store)
+        cycle_num = 0
+        while True:
+            cycle_num += 1
+            for _name, template, pattern in rules:
+                self._run(template, pattern)
+            if self.owl:
+                for template, pattern in list(self._generated_rules()):
+                    self._run(template, pattern)
+            new_size = len(self.store)
+            if progress is not None:
+                progress(ClosureProgress(cycle_num, 0, new_size - size, time.perf_counter() - start))
+            if new_size == size:
+                break
+            size = new_size
+            if cancel is not None and cancel.is_set():
+                raise ClosureCancelled(cycle_num)
+
+        self.consistency_checks()
+        if self.error_messages:
+            error_type, error_property = ox_NamedNode(str(ERRNS.ErrorMessage)), ox_NamedNode(str(ERRNS.error))
+            quads = []
+            for m in self.error_messages:
+                message = ox_BlankNode()
+                quads.append(ox_Quad(message, ox_NamedNode(str(RDF.type)), error_type, self.destination))
+                quads.append(ox_Quad(message, error_property, ox_Literal(m), self.destination))
+            self.store.extend(quads)
@@ -0,0 +1,119 @@
+"""
+Collection of the new triples of a closure cycle within a memory budget.
+
+The triples found in a cycle of the closure are collected in a set (see :func:`.Closure.Core.store_triple`) before
+being added to the destination at the end of the cycle. On a large graph this set can become very large; a
+:class:`SpilledTripleSet` keeps at most a given number of triples in memory: beyond that, the triples are encoded,
+sorted, and written to a temporary file (a *run*). At the end of the cycle the runs, read through :mod:`mmap`, and the
+triples still in memory are merged (an external merge sort), which also removes the duplicates, and handed over to the
+destination as a stream.
+"""
+
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+from typing import Iterator, List, Optional, Tuple
+
+from rdflib.term import Node
+
+from .encoded_store import decode_term, encode_term
+
+_LENGTH = struct.Struct("<I")
+_FIELDS = struct.Struct("<III")
+
+
+def _encode(t: Tuple[Node, Node, Node]) -> bytes:
+    s, p, o = (encode_term(r).encode("utf-8") for r in t)
+    return _FIELDS.pack(len(s), len(p), len(o)) + s + p + o
+
+
+def _decode(record: bytes) -> Tuple[Node, Node, Node]:
+    ls, lp, lo = _FIELDS.unpack_from(record)
+    start = _FIELDS.size
+    s = record[start : start + ls]
+    p = record[start + ls : start + ls + lp]
+    o = record[start + ls + lp : start + ls + lp + lo]
+    return decode_term(s.decode("utf-8")), decode_term(p.decode("utf-8")), decode_term(o.decode("utf-8"))
+
+
+def _read_run(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            position = 0
+            end = len(data)
+            while position < end:
+                (length,) = _LENGTH.unpack_from(data, position)
+                position += _LENGTH.size
+                yield data[position : position + length]
+                position += length
+
+
+class SpilledTripleSet:
+    """
+    Set of triples that spills to disk beyond a memory budget. Only adding triples, counting and iterating over them
+    are supported; iterating yields every triple once, in no particular order.
+
+    :param budget: Maximum number of triples kept in memory.
+    :type budget: int
+    :param directory: Directory of the temporary files. Default: None, i.e., the system default.
+    :type directory: str
+    """
+
+    def __init__(self, budget: int, directory: Optional[str] = None):
+        self.budget = max(1, budget)
+        self.directory = directory
+        self._memory = set()
+        self._runs: List[str] = []
+        self._spilled = 0
+
+    def add(self, t: Tuple[Node, Node, Node]):
+        self._memory.add(t)
+        if len(self._memory) >= self.budget:
+            self._spill()
+
+    def _spill(self):
+        records = sorted(_encode(t) for t in self._memory)
+        fd, path = tempfile.mkstemp(prefix="owlrl-run-", dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            for record in records:
+                f.write(_LENGTH.pack(len(record)))
+                f.write(record)
+        self._runs.append(path)
+        self._spilled += len(records)
+        self._memory = set()
+
+    @property
+    def runs(self) -> int:
+        """Number of runs written to disk so far."""
+        return len(self._runs)
+
+    def __len__(self) -> int:
+        # the triples spilled in different runs may be the same: this is an upper bound
+        return len(self._memory) + self._spilled
+
+    def __bool__(self) -> bool:
+        return bool(self._memory) or self._spilled > 0
+
+    def __iter__(self) -> Iterator[Tuple[Node, Node, Node]]:
+        if not self._runs:
+            yield from self._memory
+            return
+        memory = sorted(_encode(t) for t in self._memory)
+        previous = None
+        for record in heapq.merge(memory, *(_read_run(path) for path in self._runs)):
+            if record != previous:
+                yield _decode(record)
+                previous = record
+
+    def close(self):
+        """Remove the temporary files, and empty the set."""
+        for path in self._runs:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self._runs = []
+        self._spilled = 0
+        self._memory = set()
@@ -0,0 +1,700 @@
+"""
+Evaluation of the RDFS and OWL 2 RL rules inside an SQLite database, for graphs that are too large for the default
+engine.
+
+The :class:`SQLiteClosure` engine loads the graph into an SQLite table of triples, with every term replaced by an
+integer id (the terms themselves are kept in a separate dictionary table), and covering indexes in the three orders a
+rule may need to look up triples by (subject-predicate-object, predicate-object-subject, object-subject-predicate). Each
+rule is compiled into an :code:`INSERT OR IGNORE ... SELECT` join over that table; the hierarchies
+(:code:`rdfs:subClassOf`, :code:`rdfs:subPropertyOf`, :code:`owl:sameAs`, transitive properties) and the members of the
+:code:`rdf:List`-s are computed with recursive common table expressions. The rules are run, round after round, until a
+round does not add any triple; the inferred triples are then streamed back, in batches, to the destination graph (an
+RDFLib graph, or an Oxigraph store).
+
+The joins are done by SQLite, on disk if the database does not fit in its page cache: by default, the engine uses a
+private temporary database, which SQLite keeps in memory as long as it is small, and spills to a temporary file beyond
+that. A file name can also be given (e.g., on a disk with more room than the temporary directory).
+
+The axiomatic triples, the one time rules (datatypes, in particular) and the post-processing are those of the closure
+class, run in Python before and after the rules. The results are the same as those of the default engine, with a few
+differences:
+
+- a violation of :code:`owl:complementOf` (rule cls-com) gives one error message per individual in both classes; the
+  default engine gives a single message for the two classes, which names the second class as the element;
+- for an :code:`owl:hasKey` axiom, the default engine does not compare the values of the last key property: with a
+  single key property, for example, every instance of the class is made :code:`owl:sameAs` an instance with a key
+  value, even if it has no value itself. The SQLite engine follows rule prp-key, and compares all of them;
+- the inconsistency checks are done once, on the final result.
+
+It is used via :code:`DeductiveClosure(...).expand(graph, engine="sqlite")`, for the
+:class:`.RDFSClosure.RDFS_Semantics`, :class:`.OWLRL.OWLRL_Semantics` and :class:`.CombinedClosure.RDFS_OWLRL_Semantics`
+closures.
+"""
+
+import sqlite3
+import time
+from functools import lru_cache
+from itertools import combinations
+from typing import Iterator, List, Optional, Tuple
+
+from rdflib import BNode, Literal, URIRef
+from rdflib.namespace import OWL, RDF, RDFS
+from rdflib.term import Node
+
+from .Closure import ClosureCancelled, ClosureProgress, InferenceRecorder, add_triples
+from .CombinedClosure import RDFS_OWLRL_Semantics
+from .OWLRL import OWLRL_Semantics
+from .RDFSClosure import RDFS_Semantics
+
+_IRI, _BNODE, _LITERAL = 0, 1, 2
+
+TERM_CACHE_SIZE = 1 << 16
+BATCH_SIZE = 10000
+
+_SCHEMA = """
+DROP TABLE IF EXISTS terms;
+DROP TABLE IF EXISTS triples;
+DROP TABLE IF EXISTS members;
+CREATE TABLE terms (
+    id INTEGER PRIMARY KEY,
+    kind INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    datatype TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    UNIQUE (kind, value, datatype, lang)
+);
+CREATE TABLE triples (
+    s INTEGER NOT NULL,
+    p INTEGER NOT NULL,
+    o INTEGER NOT NULL,
+    inferred INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (s, p, o)
+) WITHOUT ROWID;
+CREATE INDEX triples_pos ON triples (p, o, s);
+CREATE INDEX triples_osp ON triples (o, s, p);
+CREATE TABLE members (
+    s INTEGER NOT NULL,
+    o INTEGER NOT NULL,
+    PRIMARY KEY (s, o)
+) WITHOUT ROWID;
+"""
+
+_NAMESPACES = {"rdf": RDF, "rdfs": RDFS, "owl": OWL}
+
+# The rules, as (name, template, pattern, filters) tuples. The patterns are triple patterns separated by " . ", whose
+# terms are variables (?x), prefixed names, "a", or term ids (#12); the pseudo-predicate MEMBER matches a list and any
+# of its members. The filters are "?x != ?y", "?x = owl:Thing" or "int(?n) = 1" comparisons.
+_RDFS_RULES = [
+    ("rdf1", "?p a rdf:Property", "?s ?p ?o", ()),
+    ("rdfs2", "?x a ?c", "?p rdfs:domain ?c . ?x ?p ?y", ()),
+    ("rdfs3", "?y a ?c", "?p rdfs:range ?c . ?x ?p ?y", ()),
+    ("rdfs6", "?p rdfs:subPropertyOf ?p", "?p a rdf:Property", ()),
+    ("rdfs7", "?x ?p2 ?y", "?p1 rdfs:subPropertyOf ?p2 . ?x ?p1 ?y", ("?p1 != ?p2",)),
+    ("rdfs8-10", "?c rdfs:subClassOf rdfs:Resource . ?c rdfs:subClassOf ?c", "?c a rdfs:Class", ()),
+    ("rdfs9", "?x a ?c2", "?c1 rdfs:subClassOf ?c2 . ?x a ?c1", ("?c1 != ?c2",)),
+    ("rdfs12", "?p rdfs:subPropertyOf rdfs:member", "?p a rdfs:ContainerMembershipProperty", ()),
+    ("rdfs13", "?d rdfs:subClassOf rdfs:Literal", "?d a rdfs:Datatype", ()),
+]
+
+# RULES rdfs4a, rdfs4b: in the first round only, as in RDFS_Semantics; in one statement, so that they do not see the
+# triples they add
+_RDFS4 = """
+INSERT OR IGNORE INTO triples (s, p, o)
+SELECT x, %(type)d, %(resource)d FROM (SELECT s AS x FROM triples UNION SELECT o FROM triples)
+"""
+
+# The transitive hierarchies, as (name, property, reflexive) tuples; reflexive is whether x P x can be inferred
+_RDFS_TRANSITIVE = [("rdfs5", "rdfs:subPropertyOf", True), ("rdfs11", "rdfs:subClassOf", True)]
+
+_OWLRL_RULES = [
+    # Table 4: equality
+    ("eq-ref", "?s owl:sameAs ?s . ?p owl:sameAs ?p . ?o owl:sameAs ?o", "?s ?p ?o", ()),
+    ("eq-sym", "?y owl:sameAs ?x", "?x owl:sameAs ?y", ()),
+    ("eq-rep-s", "?o ?p ?v", "?s owl:sameAs ?o . ?s ?p ?v", ("?s != ?o",)),
+    ("eq-rep-p", "?x ?o ?y", "?s owl:sameAs ?o . ?x ?s ?y", ("?s != ?o",)),
+    ("eq-rep-o", "?x ?p ?o", "?s owl:sameAs ?o . ?x ?p ?s", ("?s != ?o",)),
+    # Table 5: properties
+    ("prp-dom", "?x a ?c", "?p rdfs:domain ?c . ?x ?p ?y", ()),
+    ("prp-rng", "?y a ?c", "?p rdfs:range ?c . ?x ?p ?y", ()),
+    ("prp-fp", "?y1 owl:sameAs ?y2", "?p a owl:FunctionalProperty . ?x ?p ?y1 . ?x ?p ?y2", ("?y1 != ?y2",)),
+    (
+        "prp-ifp",
+        "?x1 owl:sameAs ?x2",
+        "?p a owl:InverseFunctionalProperty . ?x1 ?p ?y . ?x2 ?p ?y",
+        ("?x1 != ?x2",),
+    ),
+    ("prp-symp", "?y ?p ?x", "?p a owl:SymmetricProperty . ?x ?p ?y", ()),
+    ("prp-spo1", "?x ?p2 ?y", "?p1 rdfs:subPropertyOf ?p2 . ?x ?p1 ?y", ("?p1 != ?p2",)),
+    ("prp-eqp1", "?x ?p2 ?y", "?p1 owl:equivalentProperty ?p2 . ?x ?p1 ?y", ("?p1 != ?p2",)),
+    ("prp-eqp2", "?x ?p1 ?y", "?p1 owl:equivalentProperty ?p2 . ?x ?p2 ?y", ("?p1 != ?p2",)),
+    ("prp-inv1", "?y ?p2 ?x", "?p1 owl:inverseOf ?p2 . ?x ?p1 ?y", ()),
+    ("prp-inv2", "?y ?p1 ?x", "?p1 owl:inverseOf ?p2 . ?x ?p2 ?y", ()),
+    # Table 6: classes (cls-int1 needs a nested negation, see _CLS_INT1)
+    ("cls-int2", "?y a ?ci", "?c owl:intersectionOf ?l . ?y a ?c . ?l MEMBER ?ci", ()),
+    ("cls-uni", "?y a ?c", "?c owl:unionOf ?l . ?l MEMBER ?ci . ?y a ?ci", ()),
+    ("cls-svf1", "?u a ?x", "?x owl:someValuesFrom ?y . ?x owl:onProperty ?p . ?u ?p ?v . ?v a ?y", ()),
+    ("cls-svf2", "?u a ?x", "?x owl:someValuesFrom owl:Thing . ?x owl:onProperty ?p . ?u ?p ?v", ()),
+    ("cls-avf", "?v a ?y", "?x owl:allValuesFrom ?y . ?x owl:onProperty ?p . ?u a ?x . ?u ?p ?v", ()),
+    ("cls-hv1", "?u ?p ?y", "?x owl:hasValue ?y . ?x owl:onProperty ?p . ?u a ?x", ()),
+    ("cls-hv2", "?u a ?x", "?x owl:hasValue ?y . ?x owl:onProperty ?p . ?u ?p ?y", ()),
+    (
+        "cls-maxc2",
+        "?y1 owl:sameAs ?y2",
+        "?x owl:maxCardinality ?n . ?x owl:onProperty ?p . ?u a ?x . ?u ?p ?y1 . ?u ?p ?y2",
+        ("int(?n) = 1", "?y1 != ?y2"),
+    ),
+    (
+        "cls-maxqc3",
+        "?y1 owl:sameAs ?y2",
+        "?x owl:maxQualifiedCardinality ?n . ?x owl:onProperty ?p . ?x owl:onClass ?c . ?u a ?x . "
+        "?u ?p ?y1 . ?u ?p ?y2 . ?y1 a ?c . ?y2 a ?c",
+        ("int(?n) = 1", "?c != owl:Thing", "?y1 != ?y2"),
+    ),
+    (
+        "cls-maxqc4",
+        "?y1 owl:sameAs ?y2",
+        "?x owl:maxQualifiedCardinality ?n . ?x owl:onProperty ?p . ?x owl:onClass owl:Thing . ?u a ?x . "
+        "?u ?p ?y1 . ?u ?p ?y2",
+        ("int(?n) = 1", "?y1 != ?y2"),
+    ),
+    ("cls-oo", "?y a ?c", "?c owl:oneOf ?l . ?l MEMBER ?y", ()),
+    # Table 7: class axioms
+    ("cax-sco", "?x a ?c2", "?c1 rdfs:subClassOf ?c2 . ?x a ?c1", ("?c1 != ?c2",)),
+    ("cax-eqc1", "?x a ?c2", "?c1 owl:equivalentClass ?c2 . ?x a ?c1", ("?c1 != ?c2",)),
+    ("cax-eqc2", "?x a ?c1", "?c1 owl:equivalentClass ?c2 . ?x a ?c2", ("?c1 != ?c2",)),
+    # Table 9: schema vocabulary
+    (
+        "scm-cls",
+        "?c rdfs:subClassOf ?c . ?c owl:equivalentClass ?c . ?c rdfs:subClassOf owl:Thing . "
+        "owl:Nothing rdfs:subClassOf ?c",
+        "?c a owl:Class",
+        (),
+    ),
+    (
+        "scm-eqc1",
+        "?c1 rdfs:subClassOf ?c2 . ?c2 rdfs:subClassOf ?c1",
+        "?c1 owl:equivalentClass ?c2",
+        ("?c1 != ?c2",),
+    ),
+    ("scm-eqc2", "?c1 owl:equivalentClass ?c2", "?c1 rdfs:subClassOf ?c2 . ?c2 rdfs:subClassOf ?c1", ()),
+    ("scm-op", "?p rdfs:subPropertyOf ?p . ?p owl:equivalentProperty ?p", "?p a owl:ObjectProperty", ()),
+    ("scm-dp", "?p rdfs:subPropertyOf ?p . ?p owl:equivalentProperty ?p", "?p a owl:DatatypeProperty", ()),
+    ("scm-op-dp", "?p rdfs:subPropertyOf ?p . ?p owl:equivalentProperty ?p", "?p a rdf:Property", ()),
+    (
+        "scm-eqp1",
+        "?p1 rdfs:subPropertyOf ?p2 . ?p2 rdfs:subPropertyOf ?p1",
+        "?p1 owl:equivalentProperty ?p2",
+        ("?p1 != ?p2",),
+    ),
+    (
+        "scm-eqp2",
+        "?p1 owl:equivalentProperty ?p2",
+        "?p1 rdfs:subPropertyOf ?p2 . ?p2 rdfs:subPropertyOf ?p1",
+        ("?p1 != ?p2",),
+    ),
+    ("scm-dom1", "?p rdfs:domain ?c2", "?p rdfs:domain ?c1 . ?c1 rdfs:subClassOf ?c2", ("?c1 != ?c2",)),
+    ("scm-dom2", "?p1 rdfs:domain ?c", "?p2 rdfs:domain ?c . ?p1 rdfs:subPropertyOf ?p2", ("?p1 != ?p2",)),
+    ("scm-rng1", "?p rdfs:range ?c2", "?p rdfs:range ?c1 . ?c1 rdfs:subClassOf ?c2", ("?c1 != ?c2",)),
+    ("scm-rng2", "?p1 rdfs:range ?c", "?p2 rdfs:range ?c . ?p1 rdfs:subPropertyOf ?p2", ("?p1 != ?p2",)),
+    (
+        "scm-hv",
+        "?c1 rdfs:subClassOf ?c2",
+        "?c1 owl:hasValue ?i . ?c1 owl:onProperty ?p1 . ?c2 owl:hasValue ?i . ?c2 owl:onProperty ?p2 . "
+        "?p1 rdfs:subPropertyOf ?p2",
+        (),
+    ),
+    (
+        "scm-svf1",
+        "?c1 rdfs:subClassOf ?c2",
+        "?c1 owl:someValuesFrom ?y1 . ?c1 owl:onProperty ?p . ?c2 owl:someValuesFrom ?y2 . ?c2 owl:onProperty ?p . "
+        "?y1 rdfs:subClassOf ?y2",
+        (),
+    ),
+    (
+        "scm-svf2",
+        "?c1 rdfs:subClassOf ?c2",
+        "?c1 owl:someValuesFrom ?y . ?c1 owl:onProperty ?p1 . ?c2 owl:someValuesFrom ?y . ?c2 owl:onProperty ?p2 . "
+        "?p1 rdfs:subPropertyOf ?p2",
+        (),
+    ),
+    (
+        "scm-avf1",
+        "?c1 rdfs:subClassOf ?c2",
+        "?c1 owl:allValuesFrom ?y1 . ?c1 owl:onProperty ?p . ?c2 owl:allValuesFrom ?y2 . ?c2 owl:onProperty ?p . "
+        "?y1 rdfs:subClassOf ?y2",
+        (),
+    ),
+    (
+        "scm-avf2",
+        "?c2 rdfs:subClassOf ?c1",
+        "?c1 owl:allValuesFrom ?y . ?c1 owl:onProperty ?p1 . ?c2 owl:allValuesFrom ?y . ?c2 owl:onProperty ?p2 . "
+        "?p1 rdfs:subPropertyOf ?p2",
+        (),
+    ),
+    ("scm-int", "?c rdfs:subClassOf ?ci", "?c owl:intersectionOf ?l . ?l MEMBER ?ci", ()),
+    ("scm-uni", "?ci rdfs:subClassOf ?c", "?c owl:unionOf ?l . ?l MEMBER ?ci", ()),
+]
+
+_OWLRL_TRANSITIVE = [
+    ("eq-trans", "owl:sameAs", True),
+    ("scm-sco", "rdfs:subClassOf", False),
+    ("scm-spo", "rdfs:subPropertyOf", False),
+]
+
+# RULE cls-int1: an individual is in an intersection if it is in all the classes of the list
+_CLS_INT1 = """
+INSERT OR IGNORE INTO triples (s, p, o)
+SELECT y.s, %(type)d, c.s FROM triples c, triples f, triples y
+WHERE c.p = %(intersectionOf)d AND f.s = c.o AND f.p = %(first)d AND y.p = %(type)d AND y.o = f.o
+AND NOT EXISTS (
+    SELECT 1 FROM members m WHERE m.s = c.o
+    AND NOT EXISTS (SELECT 1 FROM triples t WHERE t.s = y.s AND t.p = %(type)d AND t.o = m.o)
+)
+"""
+
+# The members of all the lists, from any of their nodes
+_MEMBERS = """
+INSERT OR IGNORE INTO members (s, o)
+WITH RECURSIVE walk(head, node) AS (
+    SELECT s, s FROM triples WHERE p = %(first)d
+    UNION SELECT walk.head, triples.o FROM walk JOIN triples ON triples.s = walk.node AND triples.p = %(rest)d
+)
+SELECT walk.head, triples.o FROM walk JOIN triples ON triples.s = walk.node AND triples.p = %(first)d
+"""
+
+# The closure of a transitive property
+_TRANSITIVE = """
+WITH RECURSIVE closure(s, o) AS (
+    SELECT s, o FROM triples WHERE p = %(p)d
+    UNION SELECT closure.s, triples.o FROM closure JOIN triples ON triples.s = closure.o AND triples.p = %(p)d
+)
+INSERT OR IGNORE INTO triples (s, p, o) SELECT s, %(p)d, o FROM closure
+"""
+
+# The inconsistency checks, as (message, variables, pattern, filters) tuples; the messages are those of OWLRL_Semantics.
+# The checks on the pairs of members of a list (eq-diff2, eq-diff3, prp-adp, cax-adc) are generated from the lists.
+_OWLRL_CHECKS = [
+    # eq-diff1
+    (
+        "'sameAs' and 'differentFrom' cannot be used on the same subject-object pair: (%s, %s)",
+        ("s", "o"),
+        "?s owl:sameAs ?o . ?s owl:differentFrom ?o",
+        (),
+    ),
+    (
+        "'sameAs' and 'differentFrom' cannot be used on the same subject-object pair: (%s, %s)",
+        ("s", "o"),
+        "?s owl:sameAs ?o . ?o owl:differentFrom ?s",
+        (),
+    ),
+    # prp-irp
+    ("Irreflexive property used on %s with %s", ("x", "p"), "?p a owl:IrreflexiveProperty . ?x ?p ?x", ()),
+    # prp-asyp
+    (
+        "Erroneous usage of asymmetric property %s on %s and %s",
+        ("p", "x", "y"),
+        "?p a owl:AsymmetricProperty . ?x ?p ?y . ?y ?p ?x",
+        (),
+    ),
+    # prp-pdw
+    (
+        "Erroneous usage of disjoint properties %s and %s on %s and %s",
+        ("p1", "p2", "x", "y"),
+        "?p1 owl:propertyDisjointWith ?p2 . ?x ?p1 ?y . ?x ?p2 ?y",
+        (),
+    ),
+    # prp-npa1
+    (
+        "Negative (object) property assertion violated for: (%s, %s, %s)",
+        ("i1", "p", "i2"),
+        "?x owl:sourceIndividual ?i1 . ?x owl:assertionProperty ?p . ?x owl:targetIndividual ?i2 . ?i1 ?p ?i2",
+        (),
+    ),
+    # prp-npa2
+    (
+        "Negative (datatype) property assertion violated for: (%s, %s, %s)",
+        ("i1", "p", "i2"),
+        "?x owl:sourceIndividual ?i1 . ?x owl:assertionProperty ?p . ?x owl:targetValue ?i2 . ?i1 ?p ?i2",
+        (),
+    ),
+    # cls-nothing2
+    ("%s is defined of type 'Nothing'", ("x",), "?x a owl:Nothing", ()),
+    # cls-com
+    (
+        "Violation of complementarity for classes %s and %s on element %s",
+        ("c1", "c2", "x"),
+        "?c1 owl:complementOf ?c2 . ?x a ?c1 . ?x a ?c2",
+        (),
+    ),
+    # cls-maxc1
+    (
+        "Erroneous usage of maximum cardinality with %s and %s",
+        ("x", "y"),
+        "?x owl:maxCardinality ?n . ?x owl:onProperty ?p . ?u a ?x . ?u ?p ?y",
+        ("int(?n) = 0",),
+    ),
+    # cls-maxqc1
+    (
+        "Erroneous usage of maximum qualified cardinality with %s, %s and %s",
+        ("x", "c", "y"),
+        "?x owl:maxQualifiedCardinality ?n . ?x owl:onProperty ?p . ?x owl:onClass ?c . ?u a ?x . ?u ?p ?y . "
+        "?y a ?c",
+        ("int(?n) = 0",),
+    ),
+    # cls-maxqc2
+    (
+        "Erroneous usage of maximum qualified cardinality with %s, %s and %s",
+        ("x", "c", "y"),
+        "?x owl:maxQualifiedCardinality ?n . ?x owl:onProperty ?p . ?x owl:onClass ?c . ?u a ?x . ?u ?p ?y",
+        ("int(?n) = 0", "?c = owl:Thing"),
+    ),
+    # cax-dw
+    (
+        "Disjoint classes %s and %s have a common individual %s",
+        ("c1", "c2", "x"),
+        "?c1 owl:disjointWith ?c2 . ?x a ?c1 . ?x a ?c2",
+        (),
+    ),
+]
+
+
+def _encode(term: Node) -> Tuple[int, str, str, str]:
+    if isinstance(term, Literal):
+        return _LITERAL, str(term), str(term.datatype) if term.datatype else "", term.language or ""
+    elif isinstance(term, BNode):
+        return _BNODE, str(term), "", ""
+    else:
+        return _IRI, str(term), "", ""
+
+
+def _decode(kind: int, value: str, datatype: str, lang: str) -> Node:
+    if kind == _LITERAL:
+        return Literal(value, lang=lang or None, datatype=URIRef(datatype) if datatype else None)
+    elif kind == _BNODE:
+        return BNode(value)
+    else:
+        return URIRef(value)
+
+
+class SQLiteClosure:
+    """
+    Closure of a graph, evaluated in an SQLite database (see the module description).
+
+    The term ids are given by the engine: literals get negative ids, the other terms positive ones, so that the rules
+    can leave out the triples with a literal predicate without looking at the terms.
+
+    :param closure: The closure to compute, set up on the graph and the destination: an instance of
+        :class:`.RDFSClosure.RDFS_Semantics`, :class:`.OWLRL.OWLRL_Semantics` or
+        :class:`.CombinedClosure.RDFS_OWLRL_Semantics`.
+    :param database: The SQLite database file; its tables are created anew. Default: "", i.e., a private temporary
+        database, deleted when the closure is done.
+    :type database: str
+    :raises ValueError: If there are no SQL rules for the closure class.
+    """
+
+    def __init__(self, closure, database: str = ""):
+        if type(closure) is RDFS_Semantics:
+            self.rdfs, self.owl = True, False
+        elif type(closure) is OWLRL_Semantics:
+            self.rdfs, self.owl = False, True
+        elif type(closure) is RDFS_OWLRL_Semantics:
+            self.rdfs, self.owl = closure.rdfs, True
+        else:
+            raise ValueError("There are no SQL rules for %s" % type(closure).__name__)
+        self.core = closure
+        self.database = database
+        self.connection: Optional[sqlite3.Connection] = None
+
+    # --------------------------------------------------------------------------------------------------------------
+    # Terms
+    def _lookup(self, term: Node) -> int:
+        key = _encode(term)
+        row = self.connection.execute(
+            "SELECT id FROM terms WHERE kind = ? AND value = ? AND datatype = ? AND lang = ?", key
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        self._n_terms += 1
+        i = -self._n_terms if key[0] == _LITERAL else self._n_terms
+        self.connection.execute(
+            "INSERT INTO terms (id, kind, value, datatype, lang) VALUES (?, ?, ?, ?, ?)", (i,) + key
+        )
+        return i
+
+    def _find(self, i: int) -> Node:
+        row = self.connection.execute("SELECT kind, value, datatype, lang FROM terms WHERE id = ?", (i,)).fetchone()
+        return _decode(*row)
+
+    def _constant(self, token: str) -> int:
+        if token.startswith("#"):
+            return int(token[1:])
+        elif token == "a":
+            return self.id(RDF.type)
+        prefix, name = token.split(":")
+        return self.id(_NAMESPACES[prefix][name])
+
+    # --------------------------------------------------------------------------------------------------------------
+    # Rules
+    def _join(self, pattern: str, filters) -> Tuple[dict, str]:
+        """
+        Compile a pattern into an SQL join.
+
+        :return: The columns bound to the variables, and the FROM and WHERE clauses.
+        :rtype: tuple
+        """
+        tables, conditions, columns = [], [], {}
+        for i, triple in enumerate(pattern.split(" . ")):
+            s, p, o = triple.split()
+            alias = "t%d" % i
+            if p == "MEMBER":
+                tables.append("members " + alias)
+                positions = (("s", s), ("o", o))
+            else:
+                tables.append("triples " + alias)
+                positions = (("s", s), ("p", p), ("o", o))
+            for column, token in positions:
+                column = "%s.%s" % (alias, column)
+                if not token.startswith("?"):
+                    conditions.append("%s = %d" % (column, self._constant(token)))
+                elif token in columns:
+                    conditions.append("%s = %s" % (column, columns[token]))
+                else:
+                    columns[token] = column
+        for f in filters:
+            left, operator, right = f.split()
+            if left.startswith("int("):
+                left = "(SELECT CAST(value AS INTEGER) FROM terms WHERE id = %s)" % columns[left[4:-1]]
+            else:
+                left = columns[left]
+            if right.startswith("?"):
+                right = columns[right]
+            elif not right.isdigit():
+                right = str(self._constant(right))
+            conditions.append("%s %s %s" % (left, operator, right))
+        return columns, "FROM %s WHERE %s" % (", ".join(tables), " AND ".join(conditions) or "1")
+
+    def _compile(self, template: str, pattern: str, filters=()) -> List[str]:
+        """Compile a rule into INSERT statements, one per triple of the template."""
+        columns, join = self._join(pattern, filters)
+        statements = []
+        for triple in template.split(" . "):
+            values = [columns[t] if t.startswith("?") else str(self._constant(t)) for t in triple.split()]
+            # a literal cannot be a predicate
+            condition = " AND %s > 0" % values[1] if triple.split()[1].startswith("?") else ""
+            statements.append(
+                "INSERT OR IGNORE INTO triples (s, p, o) SELECT %s %s%s" % (", ".join(values), join, condition)
+            )
+        return statements
+
+    def _select(self, variables, pattern: str, filters=()) -> List[tuple]:
+        columns, join = self._join(pattern, filters)
+        query = "SELECT DISTINCT %s %s" % (", ".join(columns["?" + v] for v in variables), join)
+        return self.connection.execute(query).fetchall()
+
+    def _transitive(self, p: int, reflexive: bool) -> str:
+        return _TRANSITIVE % {"p": p} + ("" if reflexive else " WHERE s != o")
+
+    def _contains(self, s: int, p: int, o: int) -> bool:
+        row = self.connection.execute("SELECT 1 FROM triples WHERE s = ? AND p = ? AND o = ?", (s, p, o)).fetchone()
+        return row is not None
+
+    def _list(self, head: int) -> Optional[List[int]]:
+        # the members of an rdf:List, or None if it is malformed
+        first, rest, nil = self.id(RDF.first), self.id(RDF.rest), self.id(RDF.nil)
+        members = []
+        seen = set()
+        while head != nil:
+            if head in seen:
+                return None
+            seen.add(head)
+            firsts = self.connection.execute("SELECT o FROM triples WHERE s = ? AND p = ?", (head, first)).fetchall()
+            rests = self.connection.execute("SELECT o FROM triples WHERE s = ? AND p = ?", (head, rest)).fetchall()
+            if not firsts or not rests:
+                return None
+            members.append(firsts[0][0])
+            head = rests[0][0]
+        return members
+
+    def _generated_rules(self) -> Iterator[str]:
+        """The statements depending on the axioms of the ontology (prp-trp, prp-spo2, prp-key)."""
+        # RULE prp-trp
+        for (p,) in self._select(("p",), "?p a owl:TransitiveProperty"):
+            if p > 0:
+                yield self._transitive(p, True)
+        # RULE prp-spo2
+        for p, head in self._select(("p", "l"), "?p owl:propertyChainAxiom ?l"):
+            chain = self._list(head)
+            if p > 0 and chain and all(pi > 0 for pi in chain):
+                steps = " . ".join("?u%d #%d ?u%d" % (i, pi, i + 1) for (i, pi) in enumerate(chain))
+                yield from self._compile("?u0 #%d ?u%d" % (p, len(chain)), steps)
+        # RULE prp-key
+        for c, head in self._select(("c", "l"), "?c owl:hasKey ?l"):
+            keys = self._list(head)
+            if keys and all(pi > 0 for pi in keys):
+                values = " . ".join("?x #%d ?z%d . ?y #%d ?z%d" % (pi, i, pi, i) for (i, pi) in enumerate(keys))
+                pattern = "?x a #%d . ?y a #%d . %s" % (c, c, values)
+                yield from self._compile("?x owl:sameAs ?y", pattern, ("?x != ?y",))
+
+    def _statements(self) -> Tuple[List[str], List[str]]:
+        """The statements of the rules of the first round only, and those of every round."""
+        first, every = [], []
+        if self.rdfs:
+            first.append(_RDFS4 % {"type": self.id(RDF.type), "resource": self.id(RDFS.Resource)})
+            for _name, template, pattern, filters in _RDFS_RULES:
+                every += self._compile(template, pattern, filters)
+            every += [self._transitive(self._constant(p), reflexive) for (_name, p, reflexive) in _RDFS_TRANSITIVE]
+        if self.owl:
+            for _name, template, pattern, filters in _OWLRL_RULES:
+                every += self._compile(template, pattern, filters)
+            every += [self._transitive(self._constant(p), reflexive) for (_name, p, reflexive) in _OWLRL_TRANSITIVE]
+            every.append(
+                _CLS_INT1
+                % {
+                    "type": self.id(RDF.type),
+                    "intersectionOf": self.id(OWL.intersectionOf),
+                    "first": self.id(RDF.first),
+                }
+            )
+        return first, every
+
+    def _update_members(self):
+        # the members are only computed again if the lists have changed
+        first, rest = self.id(RDF.first), self.id(RDF.rest)
+        (size,) = self.connection.execute("SELECT count(*) FROM triples WHERE p IN (?, ?)", (first, rest)).fetchone()
+        if size != self._list_size:
+            self._list_size = size
+            self.connection.execute("DELETE FROM members")
+            self.connection.execute(_MEMBERS % {"first": first, "rest": rest})
+
+    # --------------------------------------------------------------------------------------------------------------
+    def consistency_checks(self):
+        """Run the inconsistency checks of OWL 2 RL on the closure, and add the error messages to the closure."""
+        if not self.owl:
+            return
+        find = self.term
+        for message, variables, pattern, filters in _OWLRL_CHECKS:
+            for values in self._select(variables, pattern, filters):
+                self.core.add_error(message % tuple(find(v) for v in values))
+
+        # eq-diff2, eq-diff3
+        same_as = self.id(OWL.sameAs)
+        heads = self._select(("l",), "?x a owl:AllDifferent . ?x owl:members ?l")
+        heads += self._select(("l",), "?x a owl:AllDifferent . ?x owl:distinctMembers ?l")
+        for (head,) in heads:
+            for zi, zj in combinations(self._list(head) or (), 2):
+                if zi != zj and self._contains(zi, same_as, zj):
+                    self.core.add_error(
+                        "'sameAs' and 'AllDifferent' cannot be used on the same subject-object pair: (%s, %s)"
+                        % (find(zi), find(zj))
+                    )
+        # prp-adp
+        for (head,) in self._select(("l",), "?a a owl:AllDisjointProperties . ?a owl:members ?l"):
+            for zi, zj in combinations(self._list(head) or (), 2):
+                for x, y in self._select(("x", "y"), "?x #%d ?y . ?x #%d ?y" % (zi, zj)):
+                    self.core.add_error(
+                        "Disjoint properties in an 'AllDisjointProperties' are not really disjoint: "
+                        "(%s, %s,%s) and (%s,%s,%s)" % (find(x), find(zi), find(y), find(x), find(zj), find(y))
+                    )
+        # cax-adc
+        for (head,) in self._select(("l",), "?a a owl:AllDisjointClasses . ?a owl:members ?l"):
+            for zi, zj in combinations(self._list(head) or (), 2):
+                for (x,) in self._select(("x",), "?x a #%d . ?x a #%d" % (zi, zj)):
+                    self.core.add_error(
+                        "Disjoint classes %s and %s have a common individual %s" % (find(zi), find(zj), find(x))
+                    )
+
+    def _inferred(self) -> Iterator[List[Tuple[Node, Node, Node]]]:
+        find = self.term
+        cursor = self.connection.execute("SELECT s, p, o FROM triples WHERE inferred = 1")
+        while True:
+            rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+            yield [(find(s), find(p), find(o)) for (s, p, o) in rows]
+
+    def closure(self, progress=None, cancel=None, inferred=None):
+        """
+        Compute the closure: the axiomatic triples and the one time rules of the closure class, then the rules in the
+        database until a round does not add any triple, the post-processing of the closure class, and the inconsistency
+        checks; the inferred triples and the error messages are added to the destination (as in
+        :func:`.Closure.Core.closure`).
+
+        :param progress: Callback invoked with a :class:`.Closure.ClosureProgress` at the end of every round (the
+            :code:`scanned` field is always 0). Default: None.
+        :type progress: callable
+        :param cancel: Cancellation token, checked at the end of every round. Default: None.
+        :param inferred: A graph (or any object with :code:`add` and :code:`remove` methods) collecting the triples
+            that are really new. Default: None.
+        :raises ClosureCancelled: If the closure has been cancelled.
+        """
+        core = self.core
+        start = time.perf_counter()
+        destination = core.destination
+        if inferred is not None:
+            core.destination = InferenceRecorder(destination, core.graph, inferred)
+        self.connection = sqlite3.connect(self.database)
+        try:
+            self.connection.executescript(_SCHEMA)
+            for pragma in ("journal_mode = OFF", "synchronous = OFF", "temp_store = MEMORY"):
+                self.connection.execute("PRAGMA " + pragma)
+            self._n_terms = 0
+            self._list_size = -1
+            self.id = lru_cache(maxsize=TERM_CACHE_SIZE)(self._lookup)
+            self.term = lru_cache(maxsize=TERM_CACHE_SIZE)(self._find)
+
+            core.pre_process()
+            if core.axioms:
+                core.add_axioms()
+            if core.daxioms:
+                core.add_d_axioms()
+            core.flush_stored_triples()
+            core.one_time_rules()
+            core.flush_stored_triples()
+
+            i = self.id
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO triples (s, p, o, inferred) VALUES (?, ?, ?, 0)",
+                    ((i(s), i(p), i(o)) for (s, p, o) in core.graph.triples((None, None, None))),
+                )
+                self.connection.execute("ANALYZE")
+            first, every = self._statements()
+
+            cycle_num = 0
+            cancelled = False
+            while True:
+                cycle_num += 1
+                with self.connection:
+                    self._update_members()
+                    changes = self.connection.total_changes
+                    for statement in (first if cycle_num == 1 else []) + every:
+                        self.connection.execute(statement)
+                    if self.owl:
+                        for statement in list(self._generated_rules()):
+                            self.connection.execute(statement)
+                    new = self.connection.total_changes - changes
+                if progress is not None:
+                    progress(ClosureProgress(cycle_num, 0, new, time.perf_counter() - start))
+                if new == 0:
+                    break
+                if cancel is not None and cancel.is_set():
+                    cancelled = True
+                    break
+
+            for batch in self._inferred():
+                add_triples(core.destination, batch)
+            if hasattr(core, "bnodes"):
+                # the bnodes used as predicates, which are removed by the post-processing
+                query = "SELECT DISTINCT p FROM triples JOIN terms ON terms.id = triples.p WHERE terms.kind = ?"
+                core.bnodes = [self.term(p) for (p,) in self.connection.execute(query, (_BNODE,))]
+            core.post_process()
+            core.flush_stored_triples()
+            self.consistency_checks()
+            core.finish()
+        finally:
+            self.connection.close()
+            self.connection = None
+            core.destination = destination
+
+        if cancelled:
+            raise ClosureCancelled(cycle_num)
@@ -0,0 +1,77 @@
+"""
+Tests for the export of graphs and closures as NumPy arrays.
+"""
+
+import pytest
+from rdflib import Graph, Namespace, RDF, RDFS
+from rdflib.compare import isomorphic
+
+np = pytest.importorskip("numpy")
+
+import owlrl
+from owlrl.arrays import closure_arrays, table_arrays
+from owlrl.encoded_store import TripleTable
+
+RELATIVES = Namespace("http://example.org/relatives#")
+
+
+def _graph():
+    g = Graph()
+    try:
+        g.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        g.parse("test/relatives.ttl", format="turtle")
+    return g
+
+
+def _decode(array, dictionary):
+    return {tuple(dictionary[int(i)] for i in row) for row in array}
+
+
+def _graph_of(array, dictionary):
+    g = Graph()
+    for t in _decode(array, dictionary):
+        g.add(t)
+    return g
+
+
+def test_closure_arrays():
+    expected = _graph()
+    source = set(expected)
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected)
+
+    array, dictionary = closure_arrays(owlrl.DeductiveClosure(owlrl.OWLRL_Semantics), _graph())
+    assert array.shape == (len(expected), 3)
+    # blank nodes are different in every parse
+    assert isomorphic(_graph_of(array, dictionary), expected)
+    assert dictionary[dictionary.id(RELATIVES.Person)] == RELATIVES.Person
+
+    array, dictionary = closure_arrays(owlrl.DeductiveClosure(owlrl.OWLRL_Semantics), _graph(), inferred_only=True)
+    assert len(array) == len(expected) - len(source)
+
+    array, dictionary = closure_arrays(
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics), _graph(), predicates=[RDF.type, RDFS.subClassOf]
+    )
+    selected = Graph()
+    for p in (RDF.type, RDFS.subClassOf):
+        for t in expected.triples((None, p, None)):
+            selected.add(t)
+    assert isomorphic(_graph_of(array, dictionary), selected)
+
+
+def test_table_arrays():
+    closed = _graph()
+    source = set(closed)
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(closed)
+    table = TripleTable(TripleTable.build(closed))
+
+    array, dictionary = table_arrays(table)
+    assert array.shape == (len(closed), 3)
+    assert _decode(array, dictionary) == set(closed)
+
+    array, dictionary = table_arrays(table, predicates=[RDF.type, RELATIVES.missing])
+    assert _decode(array, dictionary) == set(closed.triples((None, RDF.type, None)))
+
+    array, dictionary = table_arrays(table, exclude=TripleTable(TripleTable.build(source)))
+    assert _decode(array, dictionary) == set(closed) - set(source)
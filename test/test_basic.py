@@ -1,5 +1,7 @@
+import pytest
 from rdflib import Graph, Namespace
-from rdflib.namespace import RDF
+from rdflib.collection import Collection
+from rdflib.namespace import OWL, RDF, RDFS
 
 import owlrl
 
@@ -43,3 +45,171 @@ def test_basic():
     for _ in g.subject_objects(predicate=RELS.hasGrandparent):
         cnt += 1
     assert cnt == 7
+
+
+def test_extent_cache():
+    from owlrl.Closure import ExtentCache
+
+    g = Graph()
+    g.add((RELS.a, RDF.type, RELS.C))
+    g.add((RELS.a, RELS.p, RELS.b))
+    extents = ExtentCache(g)
+    assert extents.instances(RELS.C) == [RELS.a]
+    assert extents.pairs(RELS.p) == [(RELS.a, RELS.b)]
+
+    # only the new triples that are in the graph are added to the extents read so far
+    new = [(RELS.b, RDF.type, RELS.C), (RELS.b, RELS.p, RELS.a), (RELS.c, RDF.type, RELS.D)]
+    for t in new[:2]:
+        g.add(t)
+    extents.update(new)
+    assert sorted(extents.instances(RELS.C)) == [RELS.a, RELS.b]
+    assert sorted(extents.pairs(RELS.p)) == [(RELS.a, RELS.b), (RELS.b, RELS.a)]
+    assert extents.instances(RELS.D) == []
+
+    assert sorted(ExtentCache(g, enabled=False).instances(RELS.C)) == [RELS.a, RELS.b]
+
+
+def test_restriction_index():
+    from owlrl.OWLRL import RestrictionIndex
+
+    g = Graph()
+    g.add((RELS.R, OWL.onProperty, RELS.p))
+    g.add((RELS.R, OWL.someValuesFrom, RELS.C))
+    g.add((RELS.a, RELS.p, RELS.b))
+    index = RestrictionIndex(g)
+    assert index.objects(RELS.R, OWL.onProperty) == [RELS.p]
+    assert index.subjects(OWL.onProperty, RELS.p) == [RELS.R]
+    assert index.subjects(OWL.someValuesFrom, RELS.C) == [RELS.R]
+    assert index.objects(RELS.a, OWL.onProperty) == []
+
+    # only the new restriction triples that are in the graph are added
+    new = [(RELS.S, OWL.onProperty, RELS.p), (RELS.S, OWL.hasValue, RELS.b), (RELS.T, OWL.onProperty, RELS.p)]
+    for t in new[:2]:
+        g.add(t)
+    index.update(new + [(RELS.b, RELS.p, RELS.a)])
+    assert sorted(index.subjects(OWL.onProperty, RELS.p)) == [RELS.R, RELS.S]
+    assert index.objects(RELS.S, OWL.hasValue) == [RELS.b]
+
+
+def test_restriction_in_later_cycle():
+    # the property of the restriction is only known after the first cycle
+    g = Graph()
+    g.add((RELS.restrictedOn, RDFS.subPropertyOf, OWL.onProperty))
+    g.add((RELS.R, RELS.restrictedOn, RELS.hasChild))
+    g.add((RELS.R, OWL.someValuesFrom, RELS.Person))
+    g.add((RELS.a, RELS.hasChild, RELS.b))
+    g.add((RELS.b, RDF.type, RELS.Person))
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g)
+    assert (RELS.a, RDF.type, RELS.R) in g
+
+
+def test_list_cache():
+    from owlrl.OWLRL import ListCache
+
+    g = Graph()
+    g.add((RELS.l1, RDF.first, RELS.a))
+    g.add((RELS.l1, RDF.rest, RELS.l2))
+    g.add((RELS.l2, RDF.first, RELS.b))
+    g.add((RELS.l2, RDF.rest, RDF.nil))
+    lists = ListCache(g)
+    assert lists.items(RELS.l1) == (RELS.a, RELS.b)
+    assert lists.items(RDF.nil) == ()
+    assert lists.problems == {}
+
+    # the list is decoded again once a node is changed
+    g.remove((RELS.l2, RDF.rest, RDF.nil))
+    new = [(RELS.l2, RDF.rest, RELS.l3), (RELS.l3, RDF.first, RELS.c), (RELS.l3, RDF.rest, RDF.nil)]
+    for t in new:
+        g.add(t)
+    lists.update(new)
+    assert lists.items(RELS.l1) == (RELS.a, RELS.b, RELS.c)
+
+    # malformed lists give what could be decoded, and what is wrong with them
+    g.add((RELS.m, RDF.first, RELS.a))
+    g.add((RELS.m, RDF.rest, RELS.m))
+    assert lists.items(RELS.m) == (RELS.a,)
+    assert "cyclic" in lists.problems[RELS.m]
+    g.add((RELS.n, RDF.first, RELS.a))
+    assert lists.items(RELS.n) == (RELS.a,)
+    assert "rdf:nil" in lists.problems[RELS.n]
+
+
+def test_malformed_list():
+    g = Graph()
+    g.add((RELS.C, OWL.unionOf, RELS.m))
+    g.add((RELS.m, RDF.first, RELS.D))
+    g.add((RELS.m, RDF.rest, RELS.m))
+    g.add((RELS.x, RDF.type, RELS.D))
+    with pytest.warns(UserWarning, match="cyclic"):
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g)
+    assert (RELS.x, RDF.type, RELS.C) in g
+
+
+def test_property_chains():
+    from owlrl.OWLRL import PropertyChains
+
+    g = Graph()
+    g.add((RELS.a, RELS.p, RELS.b))
+    g.add((RELS.b, RELS.q, RELS.c))
+    g.add((RELS.b, RELS.q, RELS.d))
+    g.add((RELS.c, RELS.r, RELS.e))
+    chains = PropertyChains(g)
+    assert sorted(chains.links(RELS.c1, (RELS.p, RELS.q), 1)) == [(RELS.a, RELS.c), (RELS.a, RELS.d)]
+    # the prefix (p, q) is shared
+    assert chains.links(RELS.c2, (RELS.p, RELS.q, RELS.r), 1) == [(RELS.a, RELS.e)]
+    assert chains.evaluate((RELS.p, RELS.q, RELS.r)) == [(RELS.a, RELS.e)]
+
+    # in the next cycles, only the new links are given
+    new = [(RELS.d, RELS.r, RELS.f), (RELS.x, RELS.p, RELS.b)]
+    for t in new:
+        g.add(t)
+    chains.update(new)
+    links = chains.links(RELS.c2, (RELS.p, RELS.q, RELS.r), 2)
+    assert sorted(links) == [(RELS.a, RELS.f), (RELS.x, RELS.e), (RELS.x, RELS.f)]
+    assert sorted(chains.links(RELS.c1, (RELS.p, RELS.q), 2)) == [(RELS.x, RELS.c), (RELS.x, RELS.d)]
+    chains.update([])
+    assert chains.links(RELS.c1, (RELS.p, RELS.q), 3) == []
+
+
+def test_same_chain_in_later_cycle():
+    # the second axiom, with the same chain, is only known after the first cycle
+    g = Graph()
+    Collection(g, RELS.l1, [RELS.hasParent, RELS.hasBrother])
+    Collection(g, RELS.l2, [RELS.hasParent, RELS.hasBrother])
+    g.add((RELS.hasUncle, OWL.propertyChainAxiom, RELS.l1))
+    g.add((RELS.myChain, RDFS.subPropertyOf, OWL.propertyChainAxiom))
+    g.add((RELS.hasUncle2, RELS.myChain, RELS.l2))
+    g.add((RELS.a, RELS.hasParent, RELS.b))
+    g.add((RELS.b, RELS.hasBrother, RELS.c))
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g)
+    assert (RELS.a, RELS.hasUncle, RELS.c) in g
+    assert (RELS.a, RELS.hasUncle2, RELS.c) in g
+
+
+def test_recursive_property_chain():
+    # hasAncestor is hasParent o hasAncestor: every cycle makes the chain one step longer
+    g = Graph()
+    Collection(g, RELS.l1, [RELS.hasParent, RELS.hasAncestor])
+    Collection(g, RELS.l2, [RELS.hasParent])
+    g.add((RELS.hasAncestor, OWL.propertyChainAxiom, RELS.l1))
+    g.add((RELS.hasAncestor, OWL.propertyChainAxiom, RELS.l2))
+    people = [RELS["p%d" % i] for i in range(6)]
+    for child, parent in zip(people, people[1:]):
+        g.add((child, RELS.hasParent, parent))
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g)
+    for i, person in enumerate(people):
+        assert set(g.objects(person, RELS.hasAncestor)) == set(people[i + 1 :])
+
+
+def test_class_hierarchy():
+    # the extents are kept from one cycle to the next, along a hierarchy that takes several cycles to close
+    g = Graph()
+    classes = [RELS["C%d" % i] for i in range(6)]
+    for sub, sup in zip(classes[1:], classes):
+        g.add((sub, RDFS.subClassOf, sup))
+    g.add((RELS.x, RDF.type, classes[-1]))
+    g.add((RELS.y, RDF.type, classes[2]))
+    owlrl.DeductiveClosure(owlrl.RDFS_OWLRL_Semantics).expand(g)
+    assert set(g.objects(RELS.x, RDF.type)) >= set(classes)
+    assert set(g.objects(RELS.y, RDF.type)) >= set(classes[:3])
+    assert (RELS.y, RDF.type, classes[3]) not in g
@@ -0,0 +1,152 @@
+"""
+Tests for the checkpoints of a closure, and the resumption of an interrupted closure.
+"""
+
+import os
+
+import pytest
+from rdflib import BNode, Graph, Literal, Namespace, OWL, RDF
+from rdflib.compare import isomorphic
+
+import owlrl
+from owlrl.checkpoint import ClosureCheckpoint
+from owlrl.Namespaces import ERRNS
+
+RELS = Namespace("http://example.org/relatives#")
+
+
+def _graph():
+    g = Graph()
+    try:
+        g.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        g.parse("test/relatives.ttl", format="turtle")
+    return g
+
+
+class _StopAfter:
+    """Progress callback and cancellation token at the same time: cancels the closure at the end of a cycle."""
+
+    def __init__(self, cycle):
+        self.cycle = cycle
+        self.cycles = []
+        self.stop = False
+
+    def __call__(self, report):
+        self.cycles.append(report.cycle)
+        self.stop = report.cycle >= self.cycle
+
+    def is_set(self):
+        return self.stop
+
+
+def _expected():
+    g = _graph()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g)
+    return g
+
+
+def test_resume(tmp_path):
+    directory = str(tmp_path / "checkpoint")
+    stop = _StopAfter(1)
+    with pytest.raises(owlrl.ClosureCancelled):
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(
+            _graph(), progress=stop, cancel=stop, progress_interval=1 << 30, checkpoint=directory
+        )
+    assert "state.json" in os.listdir(directory)
+
+    # a new run, on the graph parsed anew, goes on with the second cycle
+    g = _graph()
+    reports = []
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g, progress=reports.append, checkpoint=directory)
+    assert reports[0].cycle == 1
+    assert isomorphic(g, _expected())
+    assert not os.path.exists(directory)
+
+
+def test_resume_durable(tmp_path):
+    checkpoint = ClosureCheckpoint(str(tmp_path / "checkpoint"), durable=True)
+    g = _graph()
+    stop = _StopAfter(2)
+    with pytest.raises(owlrl.ClosureCancelled):
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(
+            g, progress=stop, cancel=stop, progress_interval=1 << 30, checkpoint=checkpoint
+        )
+
+    # the graph still holds the triples of the first cycles
+    reports = []
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g, progress=reports.append, checkpoint=checkpoint)
+    assert reports[0].cycle == 2
+    assert isomorphic(g, _expected())
+
+
+def test_resume_durable_with_error(tmp_path):
+    # the error messages are only added by the run that completes the closure: the rules never see them
+    def graph():
+        g = _graph()
+        g.add((RELS.Person, OWL.disjointWith, RELS.Machine))
+        g.add((RELS.Ann, RDF.type, RELS.Machine))
+        return g
+
+    expected = graph()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected)
+    assert len(list(expected.subjects(RDF.type, ERRNS.ErrorMessage))) == 1
+
+    checkpoint = ClosureCheckpoint(str(tmp_path / "checkpoint"), durable=True)
+    g = graph()
+    stop = _StopAfter(1)
+    with pytest.raises(owlrl.ClosureCancelled):
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(
+            g, progress=stop, cancel=stop, progress_interval=1 << 30, checkpoint=checkpoint
+        )
+    assert (None, RDF.type, ERRNS.ErrorMessage) not in g
+
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g, checkpoint=checkpoint)
+    assert isomorphic(g, expected)
+
+
+def test_resume_symmetric_bnodes(tmp_path):
+    # the two blank nodes cannot be told apart by their neighbourhoods: one of them gets a label of its own
+    def graph():
+        g = _graph()
+        g.parse(data="@prefix : <http://example.org/relatives#> . :Ann :p [ :q 1 ] , [ :q 1 ] .", format="turtle")
+        return g
+
+    directory = str(tmp_path / "checkpoint")
+    stop = _StopAfter(1)
+    with pytest.raises(owlrl.ClosureCancelled):
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(
+            graph(), progress=stop, cancel=stop, progress_interval=1 << 30, checkpoint=directory
+        )
+
+    g = graph()
+    expected = graph()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g, checkpoint=directory)
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected)
+    assert isomorphic(g, expected)
+
+
+def test_no_canonical_labels(tmp_path):
+    # a long chain of blank nodes takes too many rounds of refinement
+    g = Graph()
+    chain = [BNode() for _ in range(100)]
+    for b, following in zip(chain, chain[1:]):
+        g.add((b, RELS.next, following))
+    g.add((chain[-1], RELS.value, Literal(1)))
+    with pytest.raises(ValueError, match="canonical labels"):
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g, checkpoint=str(tmp_path / "checkpoint"))
+
+    checkpoint = ClosureCheckpoint(str(tmp_path / "durable"), durable=True)
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g, checkpoint=checkpoint)
+
+
+def test_different_graph(tmp_path):
+    directory = str(tmp_path / "checkpoint")
+    stop = _StopAfter(1)
+    with pytest.raises(owlrl.ClosureCancelled):
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(
+            _graph(), progress=stop, cancel=stop, progress_interval=1 << 30, checkpoint=directory
+        )
+    with pytest.raises(ValueError):
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(Graph(), checkpoint=directory)
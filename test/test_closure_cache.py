@@ -0,0 +1,91 @@
+"""
+Tests for the cache of closure results.
+"""
+
+import os
+
+from rdflib import BNode, Graph, Literal, RDF, RDFS
+from rdflib.compare import isomorphic
+
+import owlrl
+from owlrl.closure_cache import ClosureCache, graph_hash
+from owlrl.Namespaces import T
+
+
+def _graph():
+    g = Graph()
+    try:
+        g.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        g.parse("test/relatives.ttl", format="turtle")
+    return g
+
+
+def test_graph_hash():
+    triples = list(_graph())
+    assert graph_hash(triples) == graph_hash(reversed(triples))
+    assert graph_hash(triples) != graph_hash(triples[1:])
+    assert graph_hash([(T.a, T.p, Literal("1"))]) != graph_hash([(T.a, T.p, Literal(1))])
+
+
+def test_expand_with_cache(tmp_path):
+    directory = str(tmp_path / "cache")
+    expected = _graph()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected)
+
+    cache = ClosureCache(directory)
+    for _ in range(2):
+        g = _graph()
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g, cache=cache)
+        # the graphs are parsed anew, with different blank nodes
+        assert isomorphic(g, expected)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # the inferred triples are also reported on a hit, with the blank nodes of the graph
+    g = _graph()
+    original = set(g)
+    bnodes = {r for t in g for r in t if isinstance(r, BNode)}
+    inferred = owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g, inferred_only=True, cache=cache)
+    assert cache.hits == 2
+    assert set(inferred) == set(g) - original
+    assert len(inferred) == len(expected) - len(original)
+    assert {r for t in g for r in t if isinstance(r, BNode)} == bnodes
+
+    # different settings, different results
+    g = _graph()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics, axiomatic_triples=True).expand(g, cache=directory)
+    assert len(g) > len(expected)
+    assert len(os.listdir(directory)) == 2
+
+
+def test_symmetric_bnodes(tmp_path):
+    # the blank nodes cannot be told apart by their neighbourhoods: one of them gets a canonical label of its own
+    a, b = BNode(), BNode()
+    source = [(a, RDF.type, T.C), (b, RDF.type, T.C), (T.C, RDFS.subClassOf, T.D)]
+    cache = ClosureCache(str(tmp_path))
+    for _ in range(2):
+        g = Graph()
+        for t in source:
+            g.add(t)
+        owlrl.DeductiveClosure(owlrl.RDFS_Semantics).expand(g, cache=cache)
+        assert all(t in g for t in source)
+        assert (a, RDF.type, T.D) in g and (b, RDF.type, T.D) in g
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_eviction(tmp_path):
+    cache = ClosureCache(str(tmp_path), max_size=1)
+    cache.put("a", [(T.a, T.p, T.b)])
+    assert os.listdir(str(tmp_path)) == []
+
+    cache.max_size = 1 << 20
+    cache.put("a", [(T.a, T.p, T.b)])
+    cache.put("b", [(T.a, T.p, T.c)])
+    os.utime(os.path.join(str(tmp_path), "a.closure"), ns=(0, 0))
+    assert cache.get("b") is not None
+    size = os.path.getsize(os.path.join(str(tmp_path), "b.closure"))
+
+    cache.max_size = size
+    cache.evict()
+    assert os.listdir(str(tmp_path)) == ["b.closure"]
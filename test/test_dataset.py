@@ -129,4 +129,24 @@ def test_conjunctive_graph():
     cnt = 0
     for _ in g.subject_objects(predicate=RELS.hasGrandparent):
         cnt += 1
-    assert cnt == 0
\ No newline at end of file
+    assert cnt == 0
+
+def test_separate_store_destination():
+    from rdflib import Graph
+
+    source = Graph()
+    try:
+        source.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        source.parse("test/relatives.ttl", format="turtle")
+    n = len(source)
+    dest = Graph()
+
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(source, destination=dest)
+
+    # the source is untouched, the inferred triples, including those inferred from other inferred ones, are in dest
+    assert len(source) == n
+    assert len(list(dest.subjects(RDF.type, RELS.Person))) == 1
+    assert len(list(dest.subject_objects(RELS.hasGrandparent))) == 7
+    assert not set(source) & set(dest)
@@ -6,7 +6,7 @@ from pathlib import Path
 import pytest
 
 pytest.importorskip("pyoxigraph")
-from pyoxigraph import Store, DefaultGraph, NamedNode, RdfFormat
+from pyoxigraph import BlankNode, Store, DefaultGraph, NamedNode, Quad, RdfFormat
 
 
 sys.path.append(str(Path(__file__).parent.parent))
@@ -82,3 +82,207 @@ def test_dataset():
     for _ in has_grandparent_predicates:
         cnt += 1
     assert cnt == 0
+
+
+def test_term_conversion():
+    from rdflib import BNode, Literal
+    from rdflib.namespace import XSD
+    from owlrl import graph_abstraction
+    from owlrl.graph_abstraction import DataGraph
+
+    # the conversions are cached, and give equal terms in both directions
+    for term in (RELS.Person, BNode("b0"), Literal("x", lang="en"), Literal(3), Literal("a")):
+        ox_term = DataGraph.to_ox(term)
+        assert DataGraph.to_ox(term) is ox_term
+        assert DataGraph.to_rdf(ox_term) == (Literal("a", datatype=XSD.string) if term == Literal("a") else term)
+    assert DataGraph.to_ox(None) is None
+
+    DataGraph.set_term_cache_size(2)
+    try:
+        s = Store()
+        # more results than a batch
+        n = graph_abstraction.BATCH_SIZE + 10
+        g = DataGraph(s)
+        for i in range(n):
+            g.add((URIRef(RELS["p%d" % i]), RDF.type, RELS.Person))
+        assert len(set(g.subjects(RDF.type, RELS.Person))) == n
+        assert len(list(g.triples((None, RDF.type, None)))) == n
+        assert (URIRef(RELS.p3), RDF.type, RELS.Person) in g
+    finally:
+        DataGraph.set_term_cache_size(graph_abstraction.TERM_CACHE_SIZE)
+
+
+def test_bulk_changes():
+    from rdflib import BNode, Literal
+    from owlrl.graph_abstraction import DataGraph
+
+    s = Store()
+    g = DataGraph(s).get_context("urn:test:g")
+    b = BNode()
+    triples = [
+        (RELS.a, RELS.name, Literal('say "hi"\n', lang="en")),
+        (RELS.a, RELS.hasParent, b),
+        (b, RDF.type, RELS.Person),
+        (RELS.a, RDF.type, RELS.Person),
+    ]
+    g.add_many(triples)
+    assert len(s) == 4
+    assert all(t in g for t in triples)
+
+    g.remove_many(triples[:3])
+    assert len(s) == 1
+    assert triples[3] in g
+
+    # the removals of a union go to all the graphs
+    DataGraph(s).add_many([triples[3]])
+    union = DataGraph(s)
+    union.default_union = True
+    union.remove_many([triples[3]])
+    assert len(s) == 0
+
+
+def test_union_contains():
+    from owlrl.graph_abstraction import DataGraph
+
+    s = Store()
+    DataGraph(s).get_context("urn:test:g").add((RELS.a, RDF.type, RELS.Person))
+    union = DataGraph(s)
+    assert (RELS.a, RDF.type, RELS.Person) not in union
+    # the union of the graphs also looks in the named graphs
+    union.default_union = True
+    assert (RELS.a, RDF.type, RELS.Person) in union
+    assert (RELS.b, RDF.type, RELS.Person) not in union
+
+
+def test_named_destination_same_closure():
+    # a hierarchy that takes several cycles to close: the rules must see what has been inferred into the destination
+    from rdflib.namespace import RDFS
+
+    def store():
+        s = Store()
+        classes = [NamedNode(RELS["C%d" % i]) for i in range(6)]
+        for sub, sup in zip(classes[1:], classes):
+            s.add(Quad(sub, NamedNode(RDFS.subClassOf), sup))
+        s.add(Quad(NamedNode(RELS.x), NamedNode(RDF.type), classes[-1]))
+        return s
+
+    def triples(s):
+        return {(q.subject, q.predicate, q.object) for q in s if not isinstance(q.subject, BlankNode)}
+
+    expected = store()
+    owlrl.DeductiveClosure(owlrl.RDFS_OWLRL_Semantics).expand(expected)
+    s = store()
+    owlrl.DeductiveClosure(owlrl.RDFS_OWLRL_Semantics).expand(s, destination=URIRef("urn:test:dest"))
+    assert triples(s) == triples(expected)
+
+
+def test_extension_trimming():
+    from rdflib import Dataset
+
+    expected = Dataset()
+    try:
+        expected.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        expected.parse("test/relatives.ttl", format="turtle")
+    owlrl.DeductiveClosure(owlrl.OWLRL_Extension_Trimming).expand(expected)
+
+    s = Store()
+    try:
+        s.bulk_load(None, path="relatives.ttl", format=RdfFormat.TURTLE)
+    except FileNotFoundError:
+        s.bulk_load(None, path="test/relatives.ttl", format=RdfFormat.TURTLE)
+    owlrl.DeductiveClosure(owlrl.OWLRL_Extension_Trimming).expand(s)
+    assert len(s) == len(expected)
+
+
+def test_generalized_triples():
+    import warnings
+    from rdflib import BNode, Literal
+    from rdflib.namespace import XSD
+    from owlrl.graph_abstraction import DataGraph
+
+    s = Store()
+    g = DataGraph(s)
+    dest = g.get_context("urn:test:dest")
+    b = BNode()
+    literal_subject = (Literal(3), RDF.type, XSD.integer)
+    bnode_predicate = (RELS.a, b, RELS.c)
+    dest.add_many([literal_subject, bnode_predicate, (RELS.a, RELS.hasParent, RELS.c)])
+    # only the regular triple is in the store; the others are in the side table, shared with the other contexts
+    assert len(s) == 1
+    assert len(g.generalized) == 2
+    assert literal_subject in dest and bnode_predicate in dest
+    assert literal_subject not in g
+    g.default_union = True
+    assert literal_subject in g
+    assert set(g.triples((None, None, RELS.c))) == {bnode_predicate, (RELS.a, RELS.hasParent, RELS.c)}
+    assert list(g.subjects(RDF.type, XSD.integer)) == [Literal(3)]
+    assert list(g.objects(Literal(3), RDF.type)) == [XSD.integer]
+    assert list(g.subject_objects(b)) == [(RELS.a, RELS.c)]
+    g.remove(literal_subject)
+    assert literal_subject not in dest
+
+    # a closure inferring generalized triples reports them once
+    s = Store()
+    s.add(Quad(NamedNode(RELS.a), NamedNode(RELS.age), DataGraph.to_ox(Literal(3))))
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        owlrl.DeductiveClosure(owlrl.RDFS_OWLRL_Semantics).expand(s)
+    assert len([w for w in caught if "generalized" in str(w.message)]) == 1
+
+
+def test_parallel_scan():
+    def store():
+        s = Store()
+        try:
+            s.bulk_load(None, path="relatives.ttl", format=RdfFormat.TURTLE)
+        except FileNotFoundError:
+            s.bulk_load(None, path="test/relatives.ttl", format=RdfFormat.TURTLE)
+        return s
+
+    expected = store()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected, destination=URIRef("urn:test:dest"))
+
+    s = store()
+    reports = []
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(
+        s, destination=URIRef("urn:test:dest"), threads=3, progress=reports.append, progress_interval=10
+    )
+    assert len(s) == len(expected)
+    dest = NamedNode("urn:test:dest")
+    assert set(s.quads_for_pattern(None, None, None, dest)) >= set(
+        q for q in expected.quads_for_pattern(None, None, None, dest) if not any(str(t).startswith("_:") for t in q)
+    )
+    assert reports[-1].new_triples == 0
+
+
+def test_separate_store_destination():
+    from rdflib import Graph
+
+    expected = Graph()
+    try:
+        expected.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        expected.parse("test/relatives.ttl", format="turtle")
+    source = Graph()
+    source += expected
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected)
+
+    # an RDFLib source, the inferred triples in an Oxigraph store
+    s = Store()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(source, destination=s)
+    assert len(source) + len(s) == len(expected)
+    assert len(list(s.quads_for_pattern(None, NamedNode(RELS.hasGrandparent), None, None))) == 7
+
+    # an Oxigraph source, the inferred triples in an RDFLib graph
+    s = Store()
+    try:
+        s.bulk_load(None, path="relatives.ttl", format=RdfFormat.TURTLE)
+    except FileNotFoundError:
+        s.bulk_load(None, path="test/relatives.ttl", format=RdfFormat.TURTLE)
+    n = len(s)
+    dest = Graph()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(s, destination=dest)
+    assert len(s) == n
+    assert len(list(dest.subject_objects(RELS.hasGrandparent))) == 7
+    assert n + len(dest) == len(expected)
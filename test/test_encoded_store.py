@@ -0,0 +1,75 @@
+"""
+Tests for the dictionary-encoded triple table and the stores built on it.
+"""
+
+from itertools import product
+
+from rdflib import BNode, Graph, Literal, RDF, XSD
+
+from owlrl.encoded_store import (
+    EncodedStore,
+    OverlayStore,
+    SharedTripleTable,
+    TripleTable,
+    decode_term,
+    encode_term,
+)
+from owlrl.Namespaces import T
+
+
+def _graph():
+    g = Graph()
+    b = BNode()
+    g.add((T.a, RDF.type, T.C))
+    g.add((T.b, RDF.type, T.C))
+    g.add((T.a, T.p, T.b))
+    g.add((T.a, T.p, Literal("x\x00y", lang="en")))
+    g.add((T.b, T.q, Literal(42)))
+    g.add((T.b, T.q, Literal("plain")))
+    g.add((b, T.p, Literal("1.5", datatype=XSD.decimal)))
+    return g
+
+
+def test_term_encoding():
+    for t in _graph():
+        for r in t:
+            assert decode_term(encode_term(r)) == r
+
+
+def test_triple_table_patterns():
+    g = _graph()
+    table = TripleTable(TripleTable.build(g))
+    assert len(table) == len(g)
+
+    terms = {r for t in g for r in t} | {T.missing}
+    for s, p, o in product([None, T.a, T.b, T.missing], [None, RDF.type, T.p, T.q], [None, T.C, T.b]):
+        assert set(table.triples((s, p, o))) == set(g.triples((s, p, o)))
+    for o in terms:
+        assert set(table.triples((None, None, o))) == set(g.triples((None, None, o)))
+
+
+def test_overlay_store():
+    g = _graph()
+    graph = Graph(store=OverlayStore(EncodedStore(TripleTable(TripleTable.build(g)))))
+
+    graph.add((T.a, RDF.type, T.C))
+    graph.add((T.c, RDF.type, T.C))
+    graph.remove((T.b, RDF.type, T.C))
+    assert len(graph) == len(g)
+    assert set(graph.subjects(RDF.type, T.C)) == {T.a, T.c}
+    assert set(graph.store.overlay_triples()) == {(T.c, RDF.type, T.C)}
+
+    graph.add((T.b, RDF.type, T.C))
+    assert (T.b, RDF.type, T.C) in graph
+    assert set(graph.store.overlay_triples()) == {(T.c, RDF.type, T.C)}
+
+
+def test_shared_triple_table():
+    g = _graph()
+    shared = SharedTripleTable.create(g)
+    try:
+        attached = SharedTripleTable.attach(shared.name)
+        assert set(attached.table.triples((None, None, None))) == set(g)
+        attached.close()
+    finally:
+        shared.close()
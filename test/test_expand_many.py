@@ -0,0 +1,104 @@
+"""
+Tests for the batch expansion of several graphs against a common ontology.
+"""
+
+import os
+import pickle
+
+from rdflib import Graph, Namespace, RDF, RDFS, XSD
+
+import owlrl
+from owlrl.RestrictedDatatype import RestrictedDatatype
+from owlrl.Namespaces import T
+
+RELS = Namespace("http://example.org/relatives#")
+
+
+def _ontology():
+    g = Graph()
+    try:
+        g.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        g.parse("test/relatives.ttl", format="turtle")
+    return g
+
+
+def _documents():
+    documents = []
+    for i in range(4):
+        g = Graph()
+        g.add((T["x%d" % i], RELS.hasParent, T["y%d" % i]))
+        g.add((T["y%d" % i], RELS.hasParent, T["z%d" % i]))
+        documents.append(g)
+    return documents
+
+
+def test_restricted_datatype_pickle():
+    dt = RestrictedDatatype(T.t, XSD.integer, [(XSD.minInclusive, 1)])
+    copy = pickle.loads(pickle.dumps(dt))
+    assert copy.toPython("3") == 3
+    assert copy.checkValue(3) and not copy.checkValue(0)
+
+
+def test_expand_many_in_process():
+    closure = owlrl.DeductiveClosure(owlrl.OWLRL_Semantics)
+    results = list(closure.expand_many(_documents(), ontology=_ontology(), workers=0))
+
+    assert [index for (index, _) in results] == [0, 1, 2, 3]
+    for index, g in results:
+        assert (T["x%d" % index], RELS.hasGrandparent, T["z%d" % index]) in g
+        # the ontology itself is not copied into the results
+        assert (RELS.hasParent, RDF.type, RELS.Person) not in g
+        assert (RELS.Person, RDF.type, RDF.Property) not in g
+
+
+def test_expand_many_process_pool():
+    closure = owlrl.DeductiveClosure(owlrl.OWLRL_Semantics)
+    expected = {
+        index: set(g)
+        for (index, g) in closure.expand_many(_documents(), ontology=_ontology(), workers=0)
+    }
+
+    ordered = list(closure.expand_many(_documents(), ontology=_ontology(), workers=2))
+    assert [index for (index, _) in ordered] == [0, 1, 2, 3]
+    assert all(set(g) == expected[index] for (index, g) in ordered)
+
+    unordered = list(
+        closure.expand_many(
+            _documents(), ontology=_ontology(), workers=2, ordered=False, shared_ontology=False
+        )
+    )
+    assert sorted(index for (index, _) in unordered) == [0, 1, 2, 3]
+    assert all(set(g) == expected[index] for (index, g) in unordered)
+
+
+def test_expand_many_ontology_file():
+    # the ontology is parsed, and closed, in the parent process
+    ontology = "relatives.ttl" if os.path.exists("relatives.ttl") else "test/relatives.ttl"
+    closure = owlrl.DeductiveClosure(owlrl.OWLRL_Semantics)
+    results = list(closure.expand_many(_documents(), ontology=ontology, workers=2))
+    assert [index for (index, _) in results] == [0, 1, 2, 3]
+    for index, g in results:
+        assert (T["x%d" % index], RELS.hasGrandparent, T["z%d" % index]) in g
+
+
+def test_expand_many_source_in_ontology(tmp_path):
+    # a source triple that is also in the ontology is in the result all the same
+    ontology = Graph()
+    ontology.add((T.C, RDFS.subClassOf, T.D))
+    ontology.add((T.x, RDF.type, T.C))
+    source = Graph()
+    source.add((T.x, RDF.type, T.C))
+    source.add((T.y, RDF.type, T.C))
+    source_file = str(tmp_path / "source.ttl")
+    source.serialize(source_file, format="turtle")
+
+    closure = owlrl.DeductiveClosure(owlrl.RDFS_Semantics)
+    for workers, shared in [(0, True), (2, True), (2, False)]:
+        for source_ in [source, source_file]:
+            [(_, g)] = closure.expand_many([source_], ontology=ontology, workers=workers, shared_ontology=shared)
+            assert set(source) <= set(g)
+            assert (T.y, RDF.type, T.D) in g
+            # the inferred triples already in the closed ontology are not copied
+            assert (T.x, RDF.type, T.D) not in g
@@ -0,0 +1,131 @@
+"""
+Tests for the persistent cache of the imported ontologies, with a local HTTP server standing in for the web.
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from rdflib import Graph, OWL, URIRef
+
+import owlrl
+from owlrl.import_cache import ImportCache
+from owlrl.Namespaces import T
+
+VOCABULARY = ("@prefix t: <%s> . t:v t:p t:w ." % T).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+    body = VOCABULARY
+
+    def do_GET(self):
+        etag = '"%d"' % hash(self.body)
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/moved":
+            self.send_response(301)
+            self.send_header("Location", "/vocabulary")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/turtle; charset=utf-8")
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(self.body)))
+            self.end_headers()
+            self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.requests = []
+    _Handler.body = VOCABULARY
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%d" % httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_http_conditional_requests(server, tmp_path):
+    cache = ImportCache(str(tmp_path / "cache"))
+    url = server + "/vocabulary"
+
+    assert set(cache.triples(url, "xml")) == {(T.v, T.p, T.w)}
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # a new instance (i.e., a new run) revalidates the cached copy
+    cache = ImportCache(str(tmp_path / "cache"))
+    assert set(cache.triples(url, "xml")) == {(T.v, T.p, T.w)}
+    assert (cache.hits, cache.misses) == (1, 0)
+    # the second request was a conditional one
+    assert _Handler.requests[0][1] is None
+    assert _Handler.requests[1][1] is not None
+
+    # a changed resource is parsed again
+    _Handler.body = VOCABULARY + (" t:v t:p t:x .").encode("utf-8")
+    assert len(cache.triples(url, "xml")) == 2
+    assert cache.misses == 1
+
+
+def test_redirect(server, tmp_path):
+    cache = ImportCache(str(tmp_path / "cache"))
+    assert set(cache.triples(server + "/moved", "xml")) == {(T.v, T.p, T.w)}
+    assert [path for (path, _) in _Handler.requests] == ["/moved", "/vocabulary"]
+
+
+def test_local_file(tmp_path):
+    path = tmp_path / "vocabulary.ttl"
+    path.write_bytes(VOCABULARY)
+    cache = ImportCache(str(tmp_path / "cache"))
+
+    assert set(cache.triples(str(path), "turtle")) == {(T.v, T.p, T.w)}
+    assert set(cache.triples(str(path), "turtle")) == {(T.v, T.p, T.w)}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # only the modification time changes: the content is not parsed again
+    os.utime(str(path), ns=(0, 0))
+    cache.triples(str(path), "turtle")
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_relative_iris(tmp_path):
+    # identical documents in different directories: their relative IRIs are resolved against their own location
+    cache = ImportCache(str(tmp_path / "cache"))
+    results = []
+    for directory in ("a", "b"):
+        path = tmp_path / directory / "o.ttl"
+        path.parent.mkdir()
+        path.write_bytes(b"<#X> a <#C> .")
+        results.append(set(cache.triples(str(path), "turtle")))
+    assert all(str(s).endswith("/a/o.ttl#X") for (s, _, _) in results[0])
+    assert all(str(s).endswith("/b/o.ttl#X") for (s, _, _) in results[1])
+
+    # N-Triples have no relative IRIs: the same content is parsed only once
+    for directory in ("a", "b"):
+        path = tmp_path / directory / "o.nt"
+        path.write_bytes(("<%sv> <%sp> <%sw> .\n" % (T, T, T)).encode("utf-8"))
+        assert set(cache.triples(str(path), "nt")) == {(T.v, T.p, T.w)}
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_interpret_owl_imports(server, tmp_path, workers):
+    cache = ImportCache(str(tmp_path / "cache"))
+    for _ in range(2):
+        g = Graph()
+        g.add((T.o, OWL.imports, URIRef(server + "/vocabulary")))
+        owlrl.interpret_owl_imports(owlrl.AUTO, g, workers=workers, cache=cache)
+        assert set(g) == {(T.v, T.p, T.w)}
+    # the second run only revalidates the cached copy
+    assert [etag is None for (_, etag) in _Handler.requests] == [True, False]
@@ -0,0 +1,73 @@
+"""
+Tests for collecting the inferred triples separately from the input.
+"""
+
+from types import SimpleNamespace
+
+from rdflib import Dataset, Graph, RDF, Namespace
+
+import owlrl
+from owlrl.Namespaces import T
+
+RELS = Namespace("http://example.org/relatives#")
+
+
+def _graph():
+    g = Graph()
+    try:
+        g.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        g.parse("test/relatives.ttl", format="turtle")
+    return g
+
+
+def test_inferred_only():
+    g = _graph()
+    original = set(g)
+    inferred = owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g, inferred_only=True)
+
+    assert len(inferred) > 0
+    assert set(inferred) == set(g) - original
+    assert (RELS.Person, RDF.type, RDF.Property) not in inferred
+
+
+def test_inferred_only_destination():
+    ds = Dataset()
+    g = ds.graph(T.source)
+    g += _graph()
+    original = set(g)
+    sink = Graph()
+    result = owlrl.DeductiveClosure(owlrl.RDFS_Semantics).expand(
+        ds, destination=T.inferred, inferred_only=sink
+    )
+
+    assert result is sink
+    assert set(g) == original
+    assert len(sink) > 0
+    assert set(sink) == set(ds.graph(T.inferred))
+    assert not set(sink) & original
+
+
+def test_convert_graph_inferred_only():
+    options = SimpleNamespace(
+        sources=[],
+        text="""
+            @prefix t: <%s> .
+            @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+            t:a rdfs:subClassOf t:b .
+            t:x a t:a .
+        """ % T,
+        owlClosure="no",
+        rdfsClosure="yes",
+        owlExtras="no",
+        axioms="no",
+        daxioms="no",
+        format="turtle",
+        iformat="auto",
+        inferredOnly="yes",
+    )
+    result = Graph().parse(data=owlrl.convert_graph(options), format="turtle")
+
+    assert (T.x, RDF.type, T.b) in result
+    assert (T.x, RDF.type, T.a) not in result
@@ -0,0 +1,52 @@
+"""
+Tests for the loading of several sources and of their imported ontologies.
+"""
+
+import pytest
+from rdflib import BNode, Graph, OWL
+
+import owlrl
+from owlrl.Namespaces import T
+
+PREFIXES = "@prefix t: <%s> . @prefix owl: <http://www.w3.org/2002/07/owl#> .\n" % T
+
+
+@pytest.fixture
+def sources(tmp_path):
+    (tmp_path / "a.ttl").write_text(
+        PREFIXES + "t:a owl:imports <%s>, <%s> . t:a t:p t:a ." % ((tmp_path / "b.ttl").as_uri(), tmp_path / "c.ttl")
+    )
+    (tmp_path / "b.ttl").write_text(PREFIXES + "t:b owl:imports <%s#> . t:b t:p t:b ." % (tmp_path / "c.ttl").as_uri())
+    (tmp_path / "c.ttl").write_text(PREFIXES + "t:c owl:imports <%s> . t:c t:p [] ." % (tmp_path / "a.ttl").as_uri())
+    (tmp_path / "d.ttl").write_text(PREFIXES + "t:d t:p t:d .")
+    return tmp_path
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_load_sources(sources, workers):
+    g = Graph()
+    owlrl.load_sources(
+        owlrl.AUTO, [str(sources / "a.ttl"), str(sources / "d.ttl")], g, owl_imports=True, workers=workers
+    )
+
+    assert {s for s in g.subjects(T.p, None)} == {T.a, T.b, T.c, T.d}
+    assert (None, OWL.imports, None) not in g
+    # every source is parsed only once, even if it is imported several times under different names
+    assert len([o for o in g.objects(T.c, T.p) if isinstance(o, BNode)]) == 1
+    assert len(g) == 4
+
+
+def test_load_sources_without_imports(sources):
+    g = Graph()
+    owlrl.load_sources(owlrl.AUTO, [str(sources / "a.ttl"), str(sources / "a.ttl")], g, workers=2)
+
+    assert len(g) == 3
+    assert (T.a, OWL.imports, None) in g
+
+
+def test_interpret_owl_imports(sources):
+    g = Graph().parse(str(sources / "b.ttl"))
+    owlrl.interpret_owl_imports(owlrl.AUTO, g)
+
+    assert {s for s in g.subjects(T.p, None)} == {T.a, T.b, T.c}
+    assert (None, OWL.imports, None) not in g
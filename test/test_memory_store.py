@@ -0,0 +1,80 @@
+"""
+Tests for the "owlrl-memory" store.
+"""
+
+from itertools import product
+
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDF
+
+import owlrl
+from owlrl.memory_store import ReasonerMemory
+
+RELS = Namespace("http://example.org/relatives#")
+
+
+def _graph(store="default"):
+    g = Graph(store=store)
+    try:
+        g.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        g.parse("test/relatives.ttl", format="turtle")
+    return g
+
+
+def test_patterns():
+    expected = _graph()
+    g = Graph(store="owlrl-memory")
+    g.addN((s, p, o, g) for (s, p, o) in expected)
+    assert isinstance(g.store, ReasonerMemory)
+    assert len(g) == len(expected)
+    assert set(g) == set(expected)
+
+    s, p, o = RELS.Ann, RDF.type, RELS.Person
+    for pattern in product((None, s), (None, p), (None, o)):
+        assert set(g.triples(pattern)) == set(expected.triples(pattern)), pattern
+    assert (s, p, o) in g
+    assert (s, p, RELS.Child) not in g
+    assert (s, p, RELS.missing) not in g
+    assert (RELS.missing, p, o) not in g
+
+    g.add((s, RELS.age, Literal(42)))
+    g.add((s, RELS.age, Literal(42)))
+    assert len(g) == len(expected) + 1
+    g.remove((s, None, None))
+    expected.remove((s, None, None))
+    assert set(g) == set(expected)
+    assert len(g) == len(expected)
+    assert set(g.triples((s, None, None))) == set()
+
+    g.bind("rels", RELS)
+    assert g.store.namespace("rels") == URIRef(RELS)
+
+
+def test_iteration_while_inserting():
+    g = _graph("owlrl-memory")
+    before = set(g)
+    seen = set()
+    for t in g.triples((None, None, None)):
+        seen.add(t)
+        g.add((t[0], RELS.seen, RELS.yes))
+    assert before <= seen
+    assert len(list(g.subjects(RELS.seen, RELS.yes))) == len({t[0] for t in before})
+
+    for s in g.subjects(RDF.type, RELS.Person):
+        g.remove((s, RDF.type, None))
+    assert (None, RDF.type, RELS.Person) not in g
+
+
+def test_closure():
+    expected = _graph()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected)
+
+    g = _graph("owlrl-memory")
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g)
+    # blank nodes are different in every parse
+    assert isomorphic(g, expected)
+    assert len(list(g.subjects(RDF.type, RELS.Person))) == 15
+    assert len(list(g.subject_objects(RELS.hasGrandparent))) == 7
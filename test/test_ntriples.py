@@ -0,0 +1,124 @@
+"""
+Tests for the line oriented N-Triples and N-Quads loading.
+"""
+
+import io
+from types import SimpleNamespace
+
+import pytest
+from rdflib import Dataset, Graph, Literal, RDF, URIRef, XSD
+from rdflib.compare import isomorphic
+
+import owlrl
+from owlrl.Namespaces import T
+from owlrl.ntriples import chunk_ranges, load_ntriples
+
+DOCUMENT = r"""# a comment
+<http://test.org/a> <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://test.org/C> .
+<http://test.org/a> <http://test.org/p> "multi\nline \"quoted\" ét\U0001F600"@en-GB .
+<http://test.org/a> <http://test.org/p> "12"^^<http://www.w3.org/2001/XMLSchema#integer> .
+
+_:b1 <http://test.org/p> _:b2 .   # trailing comment
+_:b2 <http://test.org/p> "plain" .
+<http://test.org/é> <http://test.org/p> _:b1.
+"""
+
+
+def test_load_ntriples():
+    g = load_ntriples(io.StringIO(DOCUMENT), Graph())
+
+    assert len(g) == 6
+    assert (T.a, RDF.type, T.C) in g
+    assert (T.a, T.p, Literal('multi\nline "quoted" ét\U0001F600', lang="en-GB")) in g
+    assert (T.a, T.p, Literal("12", datatype=XSD.integer)) in g
+    assert (URIRef("http://test.org/é"), None, None) in g
+    assert isomorphic(g, Graph().parse(data=DOCUMENT, format="nt"))
+
+
+def test_blank_nodes_per_document():
+    g = Graph()
+    load_ntriples(io.StringIO(DOCUMENT), g)
+    load_ntriples(io.StringIO(DOCUMENT), g)
+    # the triples with blank nodes are not merged
+    assert len(g) == 6 + 3
+
+
+def test_load_chunks(tmp_path):
+    lines = ["_:b%d <http://test.org/p> _:b%d .\n" % (i, i + 1) for i in range(200)]
+    lines += ['<http://test.org/s%d> <http://test.org/p> "%d" .\n' % (i, i) for i in range(200)]
+    path = tmp_path / "data.nt"
+    path.write_text("".join(lines), encoding="utf-8")
+
+    ranges = chunk_ranges(str(path), 3)
+    assert len(ranges) == 3
+    assert ranges[0][0] == 0 and ranges[-1][1] == path.stat().st_size
+    assert all(a[1] == b[0] for (a, b) in zip(ranges, ranges[1:]))
+
+    g = load_ntriples(str(path), Graph(), workers=3)
+    assert len(g) == 400
+    # the chain of blank nodes is preserved across the chunks
+    assert len(set(g.subjects())) == 400
+    assert isomorphic(g, Graph().parse(str(path), format="nt"))
+
+
+def test_load_chunks_line_separators(tmp_path):
+    # characters that are line breaks for str.splitlines, but not for N-Triples
+    lines = ['<http://test.org/s%d> <http://test.org/p> "a\u2028b\x85c\x0cd\x1ce" .\n' % i for i in range(50)]
+    path = tmp_path / "data.nt"
+    path.write_text("".join(lines), encoding="utf-8")
+
+    g = load_ntriples(str(path), Graph(), workers=2)
+    assert len(g) == 50
+    assert (T.s0, T.p, Literal("a\u2028b\x85c\x0cd\x1ce")) in g
+    assert isomorphic(g, load_ntriples(str(path), Graph()))
+
+
+def test_nquads():
+    data = (
+        "<http://test.org/a> <http://test.org/p> <http://test.org/b> .\n"
+        "<http://test.org/a> <http://test.org/p> <http://test.org/c> <http://test.org/g> .\n"
+    )
+    ds = load_ntriples(io.StringIO(data), Dataset(), quads=True)
+    assert (T.a, T.p, T.b) in ds.default_context
+    assert (T.a, T.p, T.c) in ds.graph(T.g)
+    assert (T.a, T.p, T.c) not in ds.default_context
+
+    # merged into a simple graph
+    assert len(load_ntriples(io.StringIO(data), Graph(), quads=True)) == 2
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "<http://test.org/a> <http://test.org/p> <http://test.org/b>\n",
+        "<http://test.org/a> _:p <http://test.org/b> .\n",
+        '<http://test.org/a> <http://test.org/p> "bad \\q escape" .\n',
+        "<http://test.org/a> <http://test.org/p> <http://test.org/b> <http://test.org/g> .\n",
+    ],
+)
+def test_errors(line):
+    with pytest.raises(ValueError):
+        load_ntriples(io.StringIO(line), Graph())
+
+
+def test_convert_graph_nt(tmp_path):
+    path = tmp_path / "data.nt"
+    path.write_text(
+        "<http://test.org/a> <http://www.w3.org/2000/01/rdf-schema#subClassOf> <http://test.org/b> .\n"
+        "<http://test.org/x> <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://test.org/a> .\n",
+        encoding="utf-8",
+    )
+    options = SimpleNamespace(
+        sources=[str(path)],
+        text=None,
+        owlClosure="no",
+        rdfsClosure="yes",
+        owlExtras="no",
+        axioms="no",
+        daxioms="no",
+        format=owlrl.NTRIPLES,
+        iformat=owlrl.NTRIPLES,
+        jobs=2,
+    )
+    result = Graph().parse(data=owlrl.convert_graph(options), format="nt")
+    assert (T.x, RDF.type, T.b) in result
@@ -0,0 +1,81 @@
+"""
+Tests for the progress reports and the cancellation of a closure.
+"""
+
+import threading
+
+import pytest
+from rdflib import Graph, URIRef
+
+import owlrl
+
+
+def _graph():
+    g = Graph()
+    try:
+        g.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        g.parse("test/relatives.ttl", format="turtle")
+    return g
+
+
+def test_progress():
+    reports = []
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(
+        _graph(), progress=reports.append, progress_interval=10
+    )
+
+    assert reports[0].cycle == 0
+    cycles = [r.cycle for r in reports]
+    assert cycles == sorted(cycles)
+    # every cycle is reported at its end, the last one without any new triple
+    assert reports[-1].new_triples == 0
+    assert any(r.scanned % 10 == 0 and r.scanned > 0 for r in reports)
+    assert all(r.elapsed >= 0 for r in reports)
+
+
+def test_cancel():
+    g = _graph()
+    cancel = threading.Event()
+
+    def progress(report):
+        if report.cycle == 1:
+            cancel.set()
+
+    with pytest.raises(owlrl.ClosureCancelled) as cancelled:
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(
+            g, progress=progress, cancel=cancel, progress_interval=10
+        )
+    assert cancelled.value.cycle == 1
+
+    # whatever has been added is part of the full closure (bnodes differ between two parses)
+    full = _graph()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(full)
+    assert len(_graph()) < len(g) < len(full)
+    assert {t for t in g if all(isinstance(r, URIRef) for r in t)} <= set(full)
+
+
+def test_parallel_scan():
+    expected = _graph()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected)
+
+    g = _graph()
+    reports = []
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g, threads=4, progress=reports.append, progress_interval=10)
+    assert len(g) == len(expected)
+    assert reports[-1].new_triples == 0
+
+    g = _graph()
+    cancel = threading.Event()
+
+    def progress(report):
+        if report.cycle == 1:
+            cancel.set()
+
+    with pytest.raises(owlrl.ClosureCancelled) as cancelled:
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(
+            g, threads=4, progress=progress, cancel=cancel, progress_interval=10
+        )
+    assert cancelled.value.cycle == 1
+    assert len(_graph()) < len(g) < len(expected)
@@ -0,0 +1,85 @@
+"""
+Tests for the streaming serialization.
+"""
+
+import gzip
+import io
+from types import SimpleNamespace
+
+from rdflib import Dataset, Graph, Literal, XSD
+from rdflib.compare import isomorphic
+
+import owlrl
+from owlrl.Namespaces import T
+from owlrl.serializer import NQUADS, NTRIPLES, TURTLE_STREAM, stream_serialize
+
+
+def _graph():
+    g = Graph()
+    try:
+        g.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        g.parse("test/relatives.ttl", format="turtle")
+    g.add((T.x, T.label, Literal("multi\nline \"quoted\"", lang="en")))
+    g.add((T.x, T.value, Literal("12", datatype=XSD.integer)))
+    g.add((T.x, T["odd.name."], Literal("plain")))
+    return g
+
+
+def _roundtrip(graph, format, parse_format):
+    stream = io.StringIO()
+    stream_serialize(graph, stream, format, chunk_size=7)
+    return Graph().parse(data=stream.getvalue(), format=parse_format)
+
+
+def test_ntriples():
+    g = _graph()
+    assert isomorphic(_roundtrip(g, NTRIPLES, "nt"), g)
+
+
+def test_turtle_stream():
+    g = _graph()
+    assert isomorphic(_roundtrip(g, TURTLE_STREAM, "turtle"), g)
+
+
+def test_nquads():
+    ds = Dataset()
+    ds.add((T.a, T.p, T.b))
+    ds.graph(T.g).add((T.c, T.p, Literal(1)))
+
+    stream = io.StringIO()
+    stream_serialize(ds, stream, NQUADS)
+    result = Dataset().parse(data=stream.getvalue(), format="nquads")
+
+    assert (T.a, T.p, T.b) in result.default_context
+    assert (T.c, T.p, Literal(1)) in result.graph(T.g)
+    assert (T.c, T.p, Literal(1)) not in result.default_context
+
+
+def test_gzip(tmp_path):
+    g = _graph()
+    path = str(tmp_path / "out.nt.gz")
+    stream_serialize(g, path, NTRIPLES)
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert isomorphic(Graph().parse(data=f.read(), format="nt"), g)
+
+
+def test_convert_graph_output(tmp_path):
+    path = tmp_path / "out.nt"
+    options = SimpleNamespace(
+        sources=[],
+        text="@prefix t: <%s> . t:a t:p t:b ." % T,
+        owlClosure="no",
+        rdfsClosure="no",
+        owlExtras="no",
+        axioms="no",
+        daxioms="no",
+        format=owlrl.NTRIPLES,
+        iformat="auto",
+        output=str(path),
+    )
+
+    assert owlrl.convert_graph(options) is None
+    assert (T.a, T.p, T.b) in Graph().parse(str(path), format="nt")
@@ -0,0 +1,95 @@
+"""
+Tests for the memory mapped snapshots.
+"""
+
+import pytest
+from rdflib import Graph, Namespace, RDF
+from rdflib.compare import isomorphic
+from rdflib.graph import ModificationException
+
+import owlrl
+from owlrl.graph_abstraction import DataGraph
+from owlrl.Namespaces import T
+from owlrl.snapshot import Snapshot, save_snapshot
+
+RELATIVES = Namespace("http://example.org/relatives#")
+
+
+def _graph():
+    g = Graph()
+    try:
+        g.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        g.parse("test/relatives.ttl", format="turtle")
+    return g
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "graph.tt")
+    g = _graph()
+    save_snapshot(g, path)
+
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == len(g)
+        graph = snapshot.graph(writable=False)
+        assert set(graph) == set(g)
+        assert set(graph.subjects(RDF.type, None)) == set(g.subjects(RDF.type, None))
+        with pytest.raises(ModificationException):
+            graph.add((T.a, RDF.type, T.C))
+
+        data = DataGraph(graph)
+        assert set(data.triples((None, RDF.type, None))) == set(g.triples((None, RDF.type, None)))
+
+
+def test_incremental_closure_from_snapshot(tmp_path):
+    path = str(tmp_path / "closure.tt")
+    g = _graph()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g)
+    save_snapshot(g, path)
+
+    new = (RELATIVES.Someone, RDF.type, RELATIVES.Child)
+    expected = _graph()
+    expected.add(new)
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected)
+
+    with Snapshot(path) as snapshot:
+        graph = snapshot.graph()
+        graph.add(new)
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(graph)
+        assert isomorphic(graph, expected)
+        assert (RELATIVES.Someone, RDF.type, RELATIVES.Person) in graph
+        # the snapshot itself is not modified
+        assert new not in snapshot.table
+
+
+def test_convert_graph_snapshot(tmp_path):
+    class Options:
+        sources = []
+        text = None
+        owlClosure = "yes"
+        rdfsClosure = "no"
+        owlExtras = "no"
+        axioms = "no"
+        daxioms = "no"
+        iformat = "auto"
+        format = "snapshot"
+
+    options = Options()
+    options.sources = ["relatives.ttl"]
+    try:
+        open(options.sources[0]).close()
+    except FileNotFoundError:
+        options.sources = ["test/relatives.ttl"]
+    options.output = str(tmp_path / "closure.tt")
+    assert owlrl.convert_graph(options) is None
+
+    expected = _graph()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected)
+
+    options.sources = [options.output]
+    options.output = None
+    options.owlClosure = "no"
+    options.format = "nt"
+    result = Graph().parse(data=owlrl.convert_graph(options), format="nt")
+    assert isomorphic(result, expected)
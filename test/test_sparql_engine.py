@@ -0,0 +1,90 @@
+"""
+Tests for the SPARQL update engine on Oxigraph stores.
+"""
+
+from rdflib import Namespace, URIRef
+from rdflib.namespace import OWL, RDF, RDFS
+
+import pytest
+
+pytest.importorskip("pyoxigraph")
+from pyoxigraph import BlankNode, NamedNode, Quad, RdfFormat, Store
+
+import owlrl
+from owlrl.sparql_engine import SPARQLClosure
+
+RELS = Namespace("http://example.org/relatives#")
+
+
+def _store():
+    s = Store()
+    try:
+        s.bulk_load(None, path="relatives.ttl", format=RdfFormat.TURTLE)
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        s.bulk_load(None, path="test/relatives.ttl", format=RdfFormat.TURTLE)
+    return s
+
+
+def _ground(store):
+    # blank nodes are different in every load
+    return {
+        (q.subject, q.predicate, q.object, q.graph_name)
+        for q in store
+        if not isinstance(q.subject, BlankNode) and not isinstance(q.object, BlankNode)
+    }
+
+
+@pytest.mark.parametrize("destination", [None, URIRef("urn:test:dest")])
+def test_same_closure_as_default_engine(destination):
+    expected = _store()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected, destination=destination)
+
+    s = _store()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(s, destination=destination, engine="sparql")
+    assert len(s) == len(expected)
+    assert _ground(s) == _ground(expected)
+
+    person = s.quads_for_pattern(None, NamedNode(RDF.type), NamedNode(RELS.Person), None)
+    assert len(list(person)) == 15
+    if destination is not None:
+        dest = NamedNode(str(destination))
+        assert len(list(s.quads_for_pattern(None, NamedNode(RELS.hasGrandparent), None, dest))) == 7
+
+
+def test_reflexive_subproperty():
+    # a property that is its own subproperty is not made equivalent to itself
+    def store():
+        s = Store()
+        for t in [
+            (RELS.p, RDFS.subPropertyOf, RELS.p),
+            (RELS.p, RDFS.subPropertyOf, RELS.q),
+            (RELS.q, RDFS.subPropertyOf, RELS.p),
+            (RELS.a, RELS.p, RELS.b),
+        ]:
+            s.add(Quad(*(NamedNode(str(x)) for x in t)))
+        return s
+
+    expected = store()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected)
+    s = store()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(s, engine="sparql")
+    assert _ground(s) == _ground(expected)
+    equivalent = NamedNode(str(OWL.equivalentProperty))
+    assert Quad(NamedNode(str(RELS.p)), equivalent, NamedNode(str(RELS.q))) in s
+
+
+def test_progress():
+    reports = []
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(_store(), engine="sparql", progress=reports.append)
+    assert reports[-1].new_triples == 0
+    assert [r.cycle for r in reports] == list(range(1, len(reports) + 1))
+
+
+def test_unsupported():
+    with pytest.raises(ValueError):
+        SPARQLClosure(_store(), owlrl.OWLRL_Extension)
+    with pytest.raises(ValueError):
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(_store(), engine="sparql", inferred_only=True)
+    with pytest.raises(ValueError):
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(_store(), engine="fast")
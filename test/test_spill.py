@@ -0,0 +1,82 @@
+"""
+Tests for the closure within a memory budget, spilling the new triples to disk.
+"""
+
+import os
+
+from rdflib import RDF, BNode, Graph, Literal, Namespace, XSD
+from rdflib.compare import isomorphic
+
+import owlrl
+from owlrl.Namespaces import T
+from owlrl.spill import SpilledTripleSet
+
+RELS = Namespace("http://example.org/relatives#")
+
+
+def _graph():
+    g = Graph()
+    try:
+        g.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        g.parse("test/relatives.ttl", format="turtle")
+    return g
+
+
+def test_spilled_triple_set(tmp_path):
+    triples = [(T["s%d" % (i % 7)], T.p, Literal(i % 11, datatype=XSD.integer)) for i in range(100)]
+    triples += [(BNode("b"), T.p, Literal("x\ny", lang="en"))] * 3
+
+    spilled = SpilledTripleSet(5, str(tmp_path))
+    for t in triples:
+        spilled.add(t)
+    assert spilled.runs > 1
+    assert len(spilled) >= len(set(triples))
+
+    result = list(spilled)
+    assert len(result) == len(set(result))
+    assert set(result) == set(triples)
+
+    spilled.close()
+    assert os.listdir(str(tmp_path)) == []
+    assert not spilled
+
+
+def test_closure_with_memory_budget(tmp_path):
+    expected = _graph()
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected)
+
+    g = _graph()
+    original = set(g)
+    inferred = owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(
+        g, memory_budget=3, spill_directory=str(tmp_path), inferred_only=True
+    )
+    assert isomorphic(g, expected)
+    assert set(inferred) == set(g) - original
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_closure_with_all_options(tmp_path):
+    g = _graph()
+    original = set(g)
+    inferred = Graph()
+    spill_directory = tmp_path / "spill"
+    spill_directory.mkdir()
+    checkpoint = str(tmp_path / "checkpoint")
+    closure = owlrl.OWLRL_Semantics(g, False, False)
+    closure.closure(
+        inferred=inferred,
+        checkpoint=checkpoint,
+        memory_budget=3,
+        spill_directory=str(spill_directory),
+        threads=2,
+    )
+    assert os.listdir(str(spill_directory)) == []
+    assert not os.path.exists(checkpoint)
+    assert set(inferred) == set(g) - original
+    assert len(list(g.subjects(RDF.type, RELS.Person))) == 15
+    # the options only hold for that closure
+    assert closure._memory_budget is None
+    assert closure.destination is g
+    assert isinstance(closure.added_triples, set)
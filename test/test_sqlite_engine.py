@@ -0,0 +1,218 @@
+"""
+Tests for the SQLite engine.
+"""
+
+import pytest
+from rdflib import BNode, Graph, Literal, Namespace
+from rdflib.compare import isomorphic
+from rdflib.namespace import OWL, RDF, RDFS
+
+import owlrl
+from owlrl.Namespaces import ERRNS
+from owlrl.sqlite_engine import SQLiteClosure
+
+RELS = Namespace("http://example.org/relatives#")
+
+
+def _graph():
+    g = Graph()
+    try:
+        g.parse("relatives.ttl", format="turtle")
+    except FileNotFoundError:
+        # This test might be run from the parent directory root
+        g.parse("test/relatives.ttl", format="turtle")
+    return g
+
+
+@pytest.mark.parametrize(
+    "closure_class", [owlrl.RDFS_Semantics, owlrl.OWLRL_Semantics, owlrl.RDFS_OWLRL_Semantics]
+)
+@pytest.mark.parametrize("axioms", [False, True])
+def test_same_closure_as_default_engine(closure_class, axioms):
+    expected = _graph()
+    owlrl.DeductiveClosure(closure_class, axiomatic_triples=axioms, datatype_axioms=axioms).expand(expected)
+
+    g = _graph()
+    owlrl.DeductiveClosure(closure_class, axiomatic_triples=axioms, datatype_axioms=axioms).expand(g, engine="sqlite")
+    # blank nodes are different in every parse
+    assert isomorphic(g, expected)
+
+
+@pytest.mark.parametrize("closure_class", [owlrl.OWLRL_Semantics, owlrl.RDFS_OWLRL_Semantics])
+def test_reflexive_subproperty(closure_class):
+    # a property that is its own subproperty is not made equivalent to itself
+    def graph():
+        g = Graph()
+        g.add((RELS.p, RDFS.subPropertyOf, RELS.p))
+        g.add((RELS.p, RDFS.subPropertyOf, RELS.q))
+        g.add((RELS.q, RDFS.subPropertyOf, RELS.p))
+        g.add((RELS.a, RELS.p, RELS.b))
+        return g
+
+    expected = graph()
+    owlrl.DeductiveClosure(closure_class).expand(expected)
+    g = graph()
+    owlrl.DeductiveClosure(closure_class).expand(g, engine="sqlite")
+    assert set(g) == set(expected)
+    assert (RELS.p, OWL.equivalentProperty, RELS.q) in g
+
+
+def test_destination_and_inferred_only(tmp_path):
+    g = _graph()
+    source = set(g)
+    destination = Graph()
+    closure = owlrl.OWLRL_Semantics(g, False, False, destination=destination)
+    inferred = Graph()
+    SQLiteClosure(closure, database=str(tmp_path / "closure.db")).closure(inferred=inferred)
+    assert set(g) == source
+    union = g + destination
+    assert len(list(union.subjects(RDF.type, RELS.Person))) == 15
+    assert len(list(destination.triples((None, RELS.hasGrandparent, None)))) == 7
+    assert set(inferred) == set(destination)
+
+
+def test_inconsistency():
+    def errors(engine):
+        g = _graph()
+        g.add((RELS.Child, OWL.disjointWith, RELS.Parent))
+        g.add((RELS.Aaron, RDF.type, RELS.Child))
+        g.add((RELS.Aaron, RDF.type, RELS.Parent))
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g, engine=engine)
+        return set(g.objects(None, ERRNS.error))
+
+    messages = errors("sqlite")
+    assert Literal(
+        "Disjoint classes %s and %s have a common individual %s" % (RELS.Child, RELS.Parent, RELS.Aaron)
+    ) in messages
+    assert messages == errors("python")
+
+
+_PREFIXES = """
+@prefix : <http://example.org/relatives#> .
+@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+"""
+
+# Small ontologies, each with some data, on which both engines must give the same results
+_ONTOLOGIES = [
+    # restrictions
+    """
+    :Parent owl:equivalentClass [ a owl:Restriction ; owl:onProperty :hasChild ; owl:someValuesFrom :Person ] .
+    :Person rdfs:subClassOf [ a owl:Restriction ; owl:onProperty :hasChild ; owl:allValuesFrom :Person ] .
+    :Ann owl:equivalentClass [ a owl:Restriction ; owl:onProperty :name ; owl:hasValue "Ann" ] .
+    :Single rdfs:subClassOf [
+        a owl:Restriction ; owl:onProperty :hasSpouse ; owl:maxCardinality "1"^^xsd:nonNegativeInteger
+    ] .
+    :a a :Person ; :hasChild :b ; :name "Ann" .
+    :b :hasChild :c .
+    :d a :Single ; :hasSpouse :e , :f .
+    """,
+    # property axioms
+    """
+    :hasParent owl:inverseOf :hasChild .
+    :hasSibling a owl:SymmetricProperty .
+    :hasAncestor a owl:TransitiveProperty .
+    :hasParent rdfs:subPropertyOf :hasAncestor .
+    :hasUncle owl:propertyChainAxiom ( :hasParent :hasBrother ) .
+    :hasBrother rdfs:subPropertyOf :hasSibling .
+    :hasMother a owl:FunctionalProperty ; rdfs:domain :Person ; rdfs:range :Woman .
+    :ssn a owl:InverseFunctionalProperty .
+    :kin owl:equivalentProperty :hasSibling .
+    :a :hasParent :b ; :hasMother :m1 , :m2 ; :ssn "1" .
+    :b :hasParent :c ; :hasBrother :u .
+    :x :ssn "1" .
+    """,
+    # class expressions and inconsistencies
+    """
+    :Mother owl:intersectionOf ( :Woman :Parent ) .
+    :Human owl:unionOf ( :Man :Woman ) .
+    :Sex owl:oneOf ( :female :male ) .
+    :Man owl:disjointWith :Woman .
+    :hasFather owl:propertyDisjointWith :hasMother .
+    :marriedTo a owl:AsymmetricProperty , owl:IrreflexiveProperty .
+    :a a :Woman , :Parent ; :hasFather :b ; :hasMother :b .
+    :c a :Man , :Woman ; :marriedTo :c .
+    :d :marriedTo :e .
+    :e :marriedTo :d .
+    """,
+    # equality
+    """
+    :hasMother a owl:FunctionalProperty .
+    :a :hasMother :m1 , :m2 .
+    :m1 a :Woman ; owl:differentFrom :m2 .
+    :m2 :name "M" .
+    :c owl:sameAs :a .
+    """,
+]
+
+
+def _errors(g):
+    return set(g.objects(None, ERRNS.error))
+
+
+def _ground(g):
+    return {t for t in g if not any(isinstance(r, BNode) for r in t)}
+
+
+@pytest.mark.parametrize("closure_class", [owlrl.OWLRL_Semantics, owlrl.RDFS_OWLRL_Semantics])
+@pytest.mark.parametrize("ontology", _ONTOLOGIES)
+def test_same_closure_on_small_ontologies(closure_class, ontology):
+    source = Graph().parse(data=_PREFIXES + ontology, format="turtle")
+    # the copies share the blank nodes of the source
+    expected, g = Graph(), Graph()
+    for t in source:
+        expected.add(t)
+        g.add(t)
+    owlrl.DeductiveClosure(closure_class).expand(expected)
+    owlrl.DeductiveClosure(closure_class).expand(g, engine="sqlite")
+    assert _ground(g) == _ground(expected)
+    assert _errors(g) == _errors(expected)
+    assert len(g) == len(expected)
+
+
+def test_documented_differences():
+    def closures(data):
+        source = Graph().parse(data=_PREFIXES + data, format="turtle")
+        expected, g = Graph(), Graph()
+        for t in source:
+            expected.add(t)
+            g.add(t)
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(expected)
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(g, engine="sqlite")
+        return expected, g
+
+    # one message per individual, instead of a single one
+    expected, g = closures(":Man owl:complementOf :Woman . :a a :Man , :Woman . :b a :Man , :Woman .")
+    assert len(_errors(expected)) == 1
+    assert _errors(g) == {
+        Literal("Violation of complementarity for classes %s and %s on element %s" % (RELS.Man, RELS.Woman, x))
+        for x in (RELS.a, RELS.b)
+    }
+
+    # the default engine does not compare the values of the last key property
+    expected, g = closures(":Person owl:hasKey ( :ssn ) . :a a :Person ; :ssn 1 . :b a :Person .")
+    assert (RELS.b, OWL.sameAs, RELS.a) in expected
+    assert (RELS.b, OWL.sameAs, RELS.a) not in g
+
+
+def test_progress_and_cancel():
+    reports = []
+    owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(_graph(), engine="sqlite", progress=reports.append)
+    assert reports[-1].new_triples == 0
+    assert [r.cycle for r in reports] == list(range(1, len(reports) + 1))
+
+    class Cancelled:
+        def is_set(self):
+            return True
+
+    with pytest.raises(owlrl.ClosureCancelled) as cancelled:
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(_graph(), engine="sqlite", cancel=Cancelled())
+    assert cancelled.value.cycle == 1
+
+
+def test_unsupported():
+    with pytest.raises(ValueError):
+        SQLiteClosure(owlrl.OWLRL_Extension(_graph(), False, False))
+    with pytest.raises(ValueError):
+        owlrl.DeductiveClosure(owlrl.OWLRL_Semantics).expand(_graph(), engine="sqlite", threads=2)